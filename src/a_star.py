@@ -1,6 +1,17 @@
-import heapq
 import math
 
+from bucket_queue import SQRT2, BucketQueue, tie_breaker
+from grid import Grid, as_grid
+from movement import allows, check_movement, move_table, neighbour_masks
+from path_result import PathResult
+from search_context import SearchContext
+
+
+DIRECTIONS = [
+    (-1,0), (1,0), (0,-1), (0,1),
+    (-1,-1), (-1,1), (1,-1), (1,1)
+]
+
 
 def passable(grid, y, x):
     """
@@ -14,22 +25,25 @@ def passable(grid, y, x):
     Returns:
     bool: True if the tile is valid and not blocked.
     """
+    if isinstance(grid, Grid):
+        return grid.passable(y, x)
     return 0 <= y < len(grid) and 0 <= x < len(grid[0]) and grid[y][x] == 0
 
 
-def valid_move(grid,y,x,ny,nx):
+def valid_move(grid,y,x,ny,nx,movement="corner_cutting"):
     """
     Check if moving to a new position allowed.
 
     Parameters:
-    grid (list of list of int): 2D grid
+    grid (Grid or list of list of int): 2D grid
     y, x (int): Current position
     ny, nx (int): New position
+    movement (str): Movement rule, one of movement.MOVEMENTS.
 
     Returns:
     bool: True if the move is valid.
     """
-    return passable(grid,ny,nx)
+    return allows(grid, y, x, ny, nx, movement)
 
 
 def heuristic(a, b):
@@ -41,7 +55,8 @@ def heuristic(a, b):
     return max(dx, dy) + (math.sqrt(2)-1) * min(dx, dy)
 
 
-def find_path(start, goal, grid):
+def find_path(start, goal, grid, goal_bounds=None, context=None, components=None, stats=None,
+              tie_break="lifo", landmarks=None, movement="corner_cutting"):
     """
     Find shortest path from start to goal using the A*.
 
@@ -49,48 +64,143 @@ def find_path(start, goal, grid):
     Straight moves cost 1
     Diagonal moves cost sqrt(2)
 
+    grid may be a Grid or a list of lists; lists are converted first.
+    goal_bounds (GoalBounds, optional): Skip moves whose goal bounding
+    box does not contain the goal.
+    context (SearchContext, optional): Preallocated search state to reuse
+    across queries on the same grid; a fresh one is used if omitted.
+    components (ComponentIndex, optional): Return None at once when start
+    and goal are in different connected components.
+    stats (SearchStats, optional): Counters to add this search's
+    expansions, heap pushes/pops and open list size to.
+    tie_break (str): Order of nodes with equal f, one of
+    bucket_queue.TIE_BREAKS. Does not change the path cost.
+    landmarks (Landmarks, optional): Use the ALT heuristic of these
+    landmarks instead of the octile distance.
+    movement (str): Movement rule, one of movement.MOVEMENTS. goal_bounds
+    and landmarks are only valid with "corner_cutting".
+
     Returns:
-    list of tuple: Ordered list of coordinates from start to goal.
-    Returns None if no path exists.
+    PathResult: Path from start to goal, expanded on demand.
+    Returns None if no path exists (or start or goal is a wall).
     """
+    tie = tie_breaker(tie_break, start, goal)
+    check_movement(movement)
+    if movement != "corner_cutting" and (goal_bounds is not None or landmarks is not None):
+        raise ValueError("goal bounds and landmarks assume corner-cutting movement")
     if start == goal:
-        return [start]
-
-    open_heap = []
-    heapq.heappush(open_heap, (0,start))
-
-    came_from = {}
-    g_score = {start: 0}
-
-    while open_heap:
-        _, current = heapq.heappop(open_heap)
-
-        if current == goal:
-            path = [current]
-            while current in came_from:
-                current = came_from[current]
-                path.append(current)
-            return path[::-1]
-
-        y,x = current
-
-        for dy, dx in [
-            (-1,0), (1,0), (0,-1), (0,1),
-            (-1,-1), (-1,1), (1,-1), (1,1)
-        ]:
-            ny = y+dy
-            nx = x+dx
-
-            if not valid_move(grid,y,x,ny,nx):
+        return PathResult([start])
+
+    grid = as_grid(grid)
+    if not grid.passable(*start) or not grid.passable(*goal):
+        return None
+    if components is not None and not components.connected(start, goal):
+        return None
+
+    if context is None:
+        context = SearchContext(grid)
+    else:
+        context.check(grid)
+    generation = context.reset()
+    g_score = context.g
+    g_straight = context.g_straight
+    g_diagonal = context.g_diagonal
+    came_from = context.parent
+    seen = context.seen
+    closed = context.closed
+
+    stride = grid.stride
+    masks = neighbour_masks(grid)
+    moves = move_table(stride, movement)
+    four = movement == "four_connected"
+
+    boxes = None
+    if goal_bounds is not None:
+        if (goal_bounds.height, goal_bounds.width) != (grid.height, grid.width):
+            raise ValueError("goal bounds were built for a different grid size")
+        boxes = goal_bounds.boxes
+    gy, gx = goal
+
+    alt = None
+    if landmarks is not None:
+        if (landmarks.height, landmarks.width) != (grid.height, grid.width):
+            raise ValueError("landmarks were built for a different grid size")
+        alt = landmarks.heuristic(goal)
+
+    start_i = grid.index(*start)
+    goal_i = grid.index(*goal)
+
+    # Costs are exact (straight, diagonal) step counts, see bucket_queue.py
+    open_list = BucketQueue()
+    open_list.push(start_i, 0.0 if tie is None else tie(0.0, 0.0, *start))
+    if stats is not None:
+        token = stats.start()
+        stats.pushes += 1
+        stats.peak_open = max(stats.peak_open, 1)
+
+    g_score[start_i] = 0
+    g_straight[start_i] = 0
+    g_diagonal[start_i] = 0
+    came_from[start_i] = -1
+    seen[start_i] = generation
+
+    while open_list:
+        _, current = open_list.pop()
+        closed[current] = generation
+        if stats is not None:
+            stats.expanded += 1
+
+        if current == goal_i:
+            if stats is not None:
+                stats.finish(token, len(open_list))
+            return PathResult(context.waypoints_to(grid, current))
+
+        a = g_straight[current]
+        b = g_diagonal[current]
+
+        # Only the moves the rule allows from this cell's free neighbours
+        for d, offset, da, db in moves[masks[current]]:
+            n = current + offset
+            if closed[n] == generation:
                 continue
 
-            step_cost = math.sqrt(2) if dy != 0 and dx != 0 else 1
-            t = g_score[current] + step_cost
-
-            if t < g_score.get((ny, nx), float("inf")):
-                came_from[(ny,nx)] = current
-                g_score[(ny,nx)] = t
-                f = t + heuristic((ny,nx), goal)
-                heapq.heappush(open_heap, (f, (ny,nx)))
-
+            if boxes is not None:
+                k = (current * 8 + d) * 4
+                if not (boxes[k] <= gy <= boxes[k + 1] and boxes[k + 2] <= gx <= boxes[k + 3]):
+                    continue
+
+            ta = a + da
+            tb = b + db
+            t = ta + tb * SQRT2
+
+            if seen[n] != generation or t < g_score[n]:
+                seen[n] = generation
+                came_from[n] = current
+                g_score[n] = t
+                g_straight[n] = ta
+                g_diagonal[n] = tb
+
+                # Heuristic as exact step counts
+                ny, nx = divmod(n, stride)
+                if alt is not None:
+                    ha, hb = alt(n)
+                    f = ta + ha + (tb + hb) * SQRT2
+                else:
+                    hy = abs(ny - 1 - gy)
+                    hx = abs(nx - 1 - gx)
+                    if four:
+                        f = ta + hy + hx + tb * SQRT2
+                    elif hy > hx:
+                        f = ta + hy - hx + (tb + hx) * SQRT2
+                    else:
+                        f = ta + hx - hy + (tb + hy) * SQRT2
+                if tie is not None:
+                    f = tie(f, t, ny - 1, nx - 1)
+                if open_list.push(n, f) and stats is not None:
+                    stats.pushes += 1
+                    if len(open_list) > stats.peak_open:
+                        stats.peak_open = len(open_list)
+
+    if stats is not None:
+        stats.finish(token, 0)
     return None
@@ -0,0 +1,176 @@
+"""
+Anytime Repairing A* (ARA*).
+
+The search starts with the heuristic inflated by a weight w, which finds
+a path quickly whose cost is at most w times the optimum. The weight is
+then lowered step by step. Each step reuses the g-values of the previous
+one and only re-expands the nodes whose cost improved (the INCONS set),
+until w = 1 proves the path optimal or the time or expansion budget
+runs out.
+
+After every improvement the reported bound is
+
+    min(w, cost / min(g + h over OPEN and INCONS))
+
+and the optimal cost is at least cost / bound. The same holds when the
+budget stops the search partway through a step.
+"""
+
+import heapq
+import math
+import time
+from collections import namedtuple
+
+from a_star import DIRECTIONS, heuristic
+from grid import as_grid
+from path_result import PathResult
+from search_context import SearchContext
+
+
+AnytimeResult = namedtuple("AnytimeResult", "path cost bound expansions")
+AnytimeResult.__doc__ = """
+Best path found so far (a PathResult). cost is its length, bound a proven suboptimality
+factor (1.0 = optimal, inf if no path was found yet) and expansions the
+number of nodes expanded up to this point.
+"""
+
+
+def iter_paths(start, goal, grid, weight=2.5, weight_step=0.5, deadline=None,
+               max_expansions=None, context=None):
+    """
+    Yield an AnytimeResult every time ARA* finds a better path or
+    tightens the bound, ending with bound 1.0 unless the budget runs out.
+
+    Parameters:
+    weight (float): Initial heuristic weight (>= 1).
+    weight_step (float): Amount the weight is lowered per step.
+    deadline (float, optional): time.perf_counter() value after which no
+    more nodes are expanded.
+    max_expansions (int, optional): Expansion budget for the whole search.
+    context (SearchContext, optional): Preallocated search state.
+
+    Yields nothing if no path is found within the budget or none exists.
+    """
+    if weight < 1:
+        raise ValueError("weight must be at least 1")
+    if weight_step <= 0:
+        raise ValueError("weight_step must be positive")
+
+    grid = as_grid(grid)
+    if start == goal:
+        yield AnytimeResult(PathResult([start]), 0, 1.0, 0)
+        return
+    if not grid.passable(*start) or not grid.passable(*goal):
+        return
+
+    if context is None:
+        context = SearchContext(grid)
+    else:
+        context.check(grid)
+    generation = context.reset()
+    g_score = context.g
+    came_from = context.parent
+    seen = context.seen
+
+    cells = grid.cells
+    stride = grid.stride
+    moves = [
+        (dy * stride + dx, math.sqrt(2) if dy != 0 and dx != 0 else 1)
+        for dy, dx in DIRECTIONS
+    ]
+
+    def h(index):
+        y, x = divmod(index, stride)
+        return heuristic((y - 1, x - 1), goal)
+
+    start_i = grid.index(*start)
+    goal_i = grid.index(*goal)
+    g_score[start_i] = 0
+    came_from[start_i] = -1
+    seen[start_i] = generation
+
+    expansions = 0
+    opened = {start_i}
+    incons = set()
+    bound = math.inf
+
+    while True:
+        # Rebuild OPEN from OPEN and INCONS with the current weight
+        opened |= incons
+        incons = set()
+        closed = set()
+        open_heap = [(g_score[n] + weight * h(n), n) for n in opened]
+        heapq.heapify(open_heap)
+
+        out_of_budget = False
+        while open_heap:
+            if seen[goal_i] == generation and g_score[goal_i] <= open_heap[0][0]:
+                break
+            if (max_expansions is not None and expansions >= max_expansions) or \
+               (deadline is not None and time.perf_counter() >= deadline):
+                out_of_budget = True
+                break
+
+            _, current = heapq.heappop(open_heap)
+            if current in closed:
+                continue
+            closed.add(current)
+            opened.discard(current)
+            expansions += 1
+
+            g = g_score[current]
+            for offset, step_cost in moves:
+                n = current + offset
+                if cells[n]:
+                    continue
+                t = g + step_cost
+                if seen[n] != generation or t < g_score[n]:
+                    seen[n] = generation
+                    came_from[n] = current
+                    g_score[n] = t
+                    if n in closed:
+                        incons.add(n)
+                    else:
+                        opened.add(n)
+                        heapq.heappush(open_heap, (t + weight * h(n), n))
+
+        if seen[goal_i] != generation:
+            # No path found: either none exists or the budget ran out
+            return
+
+        # Parents may already lead through cells improved after g(goal)
+        # was set, so the path can be cheaper than g(goal)
+        path = PathResult(context.waypoints_to(grid, goal_i))
+        cost = path.cost
+        frontier = opened | incons
+        lower = min((g_score[n] + h(n) for n in frontier), default=math.inf)
+        new_bound = 1.0 if lower >= cost else cost / lower
+        if not out_of_budget:
+            new_bound = min(new_bound, weight)
+        new_bound = max(new_bound, 1.0)
+
+        if new_bound < bound:
+            bound = new_bound
+            yield AnytimeResult(path, cost, bound, expansions)
+
+        if out_of_budget or bound <= 1.0:
+            return
+        weight = max(1.0, weight - weight_step)
+
+
+def find_path(start, goal, grid, weight=2.5, weight_step=0.5, deadline=None,
+              max_expansions=None, context=None):
+    """
+    Run ARA* until the path is optimal or the budget runs out, and return
+    the best path found.
+
+    Same parameters as iter_paths().
+
+    Returns:
+    AnytimeResult: path is None (and bound inf) if no path was found.
+    """
+    result = AnytimeResult(None, None, math.inf, 0)
+    for result in iter_paths(start, goal, grid, weight, weight_step, deadline,
+                             max_expansions, context):
+        pass
+    return result
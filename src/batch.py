@@ -0,0 +1,153 @@
+"""
+Parallel batch queries.
+
+find_paths() and iter_paths() spread (start, goal) pairs over a process
+pool. The grid cells (and the JPS+ table, if used) are copied once into
+multiprocessing.shared_memory blocks that every worker maps directly,
+instead of each worker unpickling its own copy.
+"""
+
+import os
+from array import array
+from multiprocessing import Pool, shared_memory
+
+import a_star
+import jps
+import jps_plus
+from grid import Grid, as_grid
+from search_context import SearchContext
+
+
+ALGORITHMS = ("astar", "jps", "jps_plus")
+
+
+def _solver(algorithm, grid, table):
+    """
+    Return a function (start, goal) -> path for one algorithm on one grid,
+    reusing a single SearchContext.
+    """
+    context = SearchContext(grid)
+    if algorithm == "astar":
+        return lambda start, goal: a_star.find_path(start, goal, grid, context=context)
+    if algorithm == "jps":
+        return lambda start, goal: jps.find_path(start, goal, grid, context=context)
+    if algorithm == "jps_plus":
+        return lambda start, goal: jps.find_path(start, goal, grid, table, context=context)
+    raise ValueError(f"unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+
+
+def _share(data):
+    """
+    Copy bytes-like data into a new shared memory block.
+    """
+    block = shared_memory.SharedMemory(create=True, size=max(1, len(data)))
+    block.buf[:len(data)] = data
+    return block
+
+
+_worker = {}
+
+
+def _init_worker(algorithm, height, width, cells_name, table_spec):
+    cells_block = shared_memory.SharedMemory(name=cells_name)
+    grid = Grid(height, width, cells_block.buf[:(height + 2) * (width + 2)])
+    blocks = [cells_block]
+
+    table = None
+    if table_spec is not None:
+        name, typecode, count, digest = table_spec
+        table_block = shared_memory.SharedMemory(name=name)
+        itemsize = array(typecode).itemsize
+        distances = table_block.buf[:count * itemsize].cast(typecode)
+        table = jps_plus.JumpTable(height, width, digest, distances)
+        blocks.append(table_block)
+
+    # Keep the blocks referenced for the lifetime of the worker
+    _worker["blocks"] = blocks
+    _worker["solve"] = _solver(algorithm, grid, table)
+
+
+def _run_chunk(chunk):
+    solve = _worker["solve"]
+    return [solve(start, goal) for start, goal in chunk]
+
+
+def _run_indexed_chunk(chunk):
+    solve = _worker["solve"]
+    return [(i, solve(start, goal)) for i, (start, goal) in chunk]
+
+
+def iter_paths(queries, grid, algorithm="jps", workers=None, chunksize=16, ordered=True):
+    """
+    Solve (start, goal) queries in parallel, yielding results as they arrive.
+
+    Parameters:
+    queries (iterable of (start, goal)): Queries to solve.
+    grid (Grid or list of list of int): Map shared by all queries.
+    algorithm (str): "astar", "jps" or "jps_plus".
+    workers (int, optional): Number of processes (default: all cores);
+    1 solves everything in the calling process.
+    chunksize (int): Queries sent to a worker at a time.
+    ordered (bool): Yield paths in query order. If False, yield
+    (query index, path) pairs in completion order instead.
+
+    Yields:
+    list of tuple or None: One path per query (see ordered).
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+
+    grid = as_grid(grid)
+    table = jps_plus.build_table(grid) if algorithm == "jps_plus" else None
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        solve = _solver(algorithm, grid, table)
+        for i, (start, goal) in enumerate(queries):
+            path = solve(start, goal)
+            yield path if ordered else (i, path)
+        return
+
+    blocks = [_share(grid.cells)]
+    table_spec = None
+    if table is not None:
+        blocks.append(_share(table.distances.tobytes()))
+        table_spec = (blocks[-1].name, table.distances.typecode,
+                      len(table.distances), table.digest)
+
+    try:
+        with Pool(workers, _init_worker,
+                  (algorithm, grid.height, grid.width, blocks[0].name, table_spec)) as pool:
+            if ordered:
+                chunks = _chunks(queries, chunksize)
+                for paths in pool.imap(_run_chunk, chunks):
+                    yield from paths
+            else:
+                chunks = _chunks(enumerate(queries), chunksize)
+                for results in pool.imap_unordered(_run_indexed_chunk, chunks):
+                    yield from results
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def find_paths(queries, grid, algorithm="jps", workers=None, chunksize=16):
+    """
+    Solve (start, goal) queries in parallel.
+
+    Returns:
+    list: One path (or None) per query, in query order.
+    """
+    return list(iter_paths(queries, grid, algorithm, workers, chunksize))
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
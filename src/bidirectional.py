@@ -0,0 +1,140 @@
+"""
+Bidirectional A*.
+
+One A* search runs forward from the start towards the goal, another runs
+backwards from the goal towards the start, and every step expands the
+side with the smaller open list. Moves are symmetric (a move is allowed
+whenever the target cell is free, at the same cost in both directions),
+so the backward search runs on the same grid.
+
+mu is the cost of the best path found so far through a cell reached by
+both searches. Because the octile heuristic is consistent, no path
+through a node left on an open list can cost less than that list's
+smallest f. The search therefore stops once either smallest f reaches mu,
+and the path stays optimal.
+"""
+
+import heapq
+import math
+
+from a_star import DIRECTIONS, heuristic
+from grid import as_grid
+from path_result import PathResult
+from search_context import SearchContext
+
+
+def find_path(start, goal, grid, context=None, reverse_context=None, components=None,
+              stats=None):
+    """
+    Find the shortest path from start to goal with bidirectional A*.
+
+    Same moves and costs as a_star.find_path. Both start and goal must be
+    free cells, since each is the target of one of the searches.
+
+    context, reverse_context (SearchContext, optional): Preallocated search
+    state for the forward and the backward search; they must be two
+    different objects.
+    components (ComponentIndex, optional): Return None at once when start
+    and goal are in different connected components.
+    stats (SearchStats, optional): Counters for both searches together.
+
+    Returns:
+    PathResult: Path from start to goal, expanded on demand.
+    Returns None if no path exists.
+    """
+    if start == goal:
+        return PathResult([start])
+
+    grid = as_grid(grid)
+    if not grid.passable(*start) or not grid.passable(*goal):
+        return None
+    if components is not None and not components.connected(start, goal):
+        return None
+
+    contexts = []
+    for c in (context, reverse_context):
+        if c is None:
+            c = SearchContext(grid)
+        else:
+            c.check(grid)
+        contexts.append(c)
+    forward, backward = contexts
+    if forward is backward:
+        raise ValueError("context and reverse_context must be different objects")
+
+    cells = grid.cells
+    stride = grid.stride
+    moves = [
+        (dy * stride + dx, math.sqrt(2) if dy != 0 and dx != 0 else 1)
+        for dy, dx in DIRECTIONS
+    ]
+
+    start_i = grid.index(*start)
+    goal_i = grid.index(*goal)
+
+    # Per side: generation, g, parent, seen, closed, open list, heuristic target
+    sides = []
+    for c, source, target in ((forward, start_i, goal), (backward, goal_i, start)):
+        generation = c.reset()
+        c.g[source] = 0
+        c.parent[source] = -1
+        c.seen[source] = generation
+        sides.append((generation, c.g, c.parent, c.seen, c.closed, [(0, source)], target))
+    open_f = sides[0][5]
+    open_b = sides[1][5]
+
+    if stats is not None:
+        token = stats.start()
+        stats.pushes += 2
+        stats.peak_open = max(stats.peak_open, 2)
+
+    best = math.inf
+    meet = -1
+
+    while open_f and open_b:
+        if open_f[0][0] >= best or open_b[0][0] >= best:
+            break
+
+        side = 0 if len(open_f) <= len(open_b) else 1
+        generation, g_score, came_from, seen, closed, open_heap, target = sides[side]
+        other_generation, other_g, _, other_seen, _, _, _ = sides[1 - side]
+
+        _, current = heapq.heappop(open_heap)
+        if closed[current] == generation:
+            continue
+        closed[current] = generation
+        if stats is not None:
+            stats.expanded += 1
+
+        g = g_score[current]
+        for offset, step_cost in moves:
+            n = current + offset
+
+            # The wall border keeps n inside the array for in-map cells
+            if cells[n] or closed[n] == generation:
+                continue
+
+            t = g + step_cost
+            if seen[n] != generation or t < g_score[n]:
+                seen[n] = generation
+                came_from[n] = current
+                g_score[n] = t
+                ny, nx = divmod(n, stride)
+                heapq.heappush(open_heap, (t + heuristic((ny - 1, nx - 1), target), n))
+                if stats is not None:
+                    stats.pushes += 1
+                    if len(open_f) + len(open_b) > stats.peak_open:
+                        stats.peak_open = len(open_f) + len(open_b)
+
+                if other_seen[n] == other_generation and t + other_g[n] < best:
+                    best = t + other_g[n]
+                    meet = n
+
+    if stats is not None:
+        stats.finish(token, len(open_f) + len(open_b))
+    if meet == -1:
+        return None
+
+    points = forward.waypoints_to(grid, meet)
+    points.extend(reversed(backward.waypoints_to(grid, meet)[:-1]))
+    return PathResult(points)
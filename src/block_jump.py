@@ -0,0 +1,210 @@
+"""
+Block-based jump engine for JPS.
+
+Every row of the padded grid is stored as a Python int whose bit px is set
+when cell (py, px) is a wall, and every column is stored the same way in a
+transposed copy. A straight jump then becomes a handful of big-int
+operations: mask off the cells behind the current position and find the
+lowest (or highest) set bit, instead of stepping one cell at a time.
+
+All coordinates inside this module are padded coordinates (y + 1, x + 1).
+"""
+
+# bytes 0/1 -> ASCII '0'/'1', so a row can be parsed with int(..., 2)
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")
+
+
+def _pack(cells):
+    """
+    Pack a sequence of 0/1 bytes into an int with bit i = cells[i].
+    """
+    return int(bytes(cells).translate(_TO_DIGITS)[::-1] or b"0", 2)
+
+
+def _forced_up(walls):
+    """
+    Bits q where walls has q set and q + 1 clear.
+    """
+    return walls & ~(walls >> 1)
+
+
+def _forced_down(walls):
+    """
+    Bits q where walls has q set and q - 1 clear.
+    """
+    return walls & ~(walls << 1)
+
+
+def _first_above(mask, p):
+    """
+    Position of the lowest set bit of mask above p, or -1.
+    """
+    m = mask >> (p + 1)
+    if not m:
+        return -1
+    return p + (m & -m).bit_length()
+
+
+def _last_below(mask, p, low_masks):
+    """
+    Position of the highest set bit of mask below p, or -1.
+    """
+    return (mask & low_masks[p]).bit_length() - 1
+
+
+class BlockJumper:
+    """
+    Iterative jump() for JPS backed by row and column bitsets.
+
+    Built once per Grid (see Grid.derived) and reused by every query.
+    """
+
+    def __init__(self, grid):
+        self.cells = grid.cells
+        self.stride = stride = grid.stride
+        rows_n = grid.height + 2
+
+        self.rows = [_pack(grid.cells[py * stride:(py + 1) * stride]) for py in range(rows_n)]
+        self.cols = [_pack(grid.cells[px::stride]) for px in range(stride)]
+
+        # A cell q in row py is a jump point for a horizontal move when the
+        # row above or below has a wall at q and an opening just past it.
+        # East: opening at q + 1, west: opening at q - 1.
+        empty = 0
+        self.east = []
+        self.west = []
+        for py in range(rows_n):
+            above = self.rows[py - 1] if py > 0 else empty
+            below = self.rows[py + 1] if py + 1 < rows_n else empty
+            self.east.append(_forced_up(above) | _forced_up(below))
+            self.west.append(_forced_down(above) | _forced_down(below))
+
+        self.south = []
+        self.north = []
+        for px in range(stride):
+            left = self.cols[px - 1] if px > 0 else empty
+            right = self.cols[px + 1] if px + 1 < stride else empty
+            self.south.append(_forced_up(left) | _forced_up(right))
+            self.north.append(_forced_down(left) | _forced_down(right))
+
+        self.low_masks = [(1 << p) - 1 for p in range(max(rows_n, stride) + 1)]
+
+    def straight(self, py, px, dy, dx, gy, gx):
+        """
+        Jump from (py, px) along a straight direction.
+
+        Returns:
+        tuple or None: Padded coordinates of the jump point or goal.
+        """
+        if dy == 0:
+            walls = self.rows[py]
+            if dx > 0:
+                wall = _first_above(walls, px)
+                stop = _first_above(self.east[py], px)
+                if gy == py and px < gx < wall and (stop == -1 or gx <= stop):
+                    return (gy, gx)
+                if stop != -1 and stop < wall:
+                    return (py, stop)
+            else:
+                wall = _last_below(walls, px, self.low_masks)
+                stop = _last_below(self.west[py], px, self.low_masks)
+                if gy == py and wall < gx < px and gx >= stop:
+                    return (gy, gx)
+                if stop > wall:
+                    return (py, stop)
+        else:
+            walls = self.cols[px]
+            if dy > 0:
+                wall = _first_above(walls, py)
+                stop = _first_above(self.south[px], py)
+                if gx == px and py < gy < wall and (stop == -1 or gy <= stop):
+                    return (gy, gx)
+                if stop != -1 and stop < wall:
+                    return (stop, px)
+            else:
+                wall = _last_below(walls, py, self.low_masks)
+                stop = _last_below(self.north[px], py, self.low_masks)
+                if gx == px and wall < gy < py and gy >= stop:
+                    return (gy, gx)
+                if stop > wall:
+                    return (stop, px)
+        return None
+
+    def scan_length(self, py, px, dy, dx, jp):
+        """
+        Cells covered by a straight scan from (py, px) that stopped at jp,
+        or at the next wall if jp is None.
+        """
+        if jp is not None:
+            return abs(jp[0] - py) + abs(jp[1] - px)
+        if dy == 0:
+            if dx > 0:
+                return _first_above(self.rows[py], px) - px
+            return px - _last_below(self.rows[py], px, self.low_masks)
+        if dy > 0:
+            return _first_above(self.cols[px], py) - py
+        return py - _last_below(self.cols[px], py, self.low_masks)
+
+    def counted_straight(self, py, px, dy, dx, gy, gx, stats):
+        """
+        straight() that adds the cells it covered to stats.cells_scanned.
+        """
+        jp = self.straight(py, px, dy, dx, gy, gx)
+        stats.cells_scanned += self.scan_length(py, px, dy, dx, jp)
+        return jp
+
+    def diagonal(self, py, px, dy, dx, gy, gx, stats=None):
+        """
+        Jump from (py, px) along a diagonal direction. Each diagonal step
+        checks the diagonal forced neighbours and then runs the two
+        straight scans.
+
+        Returns:
+        tuple or None: Padded coordinates of the jump point or goal.
+        """
+        cells = self.cells
+        stride = self.stride
+        step = dy * stride + dx
+        i = py * stride + px
+
+        while True:
+            py += dy
+            px += dx
+            i += step
+            if stats is not None:
+                stats.cells_scanned += 1
+
+            if cells[i]:
+                return None
+            if py == gy and px == gx:
+                return (py, px)
+
+            if (cells[i - dy * stride] and not cells[i - dy * stride + dx]) or \
+               (cells[i - dx] and not cells[i + dy * stride - dx]):
+                return (py, px)
+
+            if stats is not None:
+                if self.counted_straight(py, px, dy, 0, gy, gx, stats) is not None or \
+                   self.counted_straight(py, px, 0, dx, gy, gx, stats) is not None:
+                    return (py, px)
+            elif self.straight(py, px, dy, 0, gy, gx) is not None or \
+                 self.straight(py, px, 0, dx, gy, gx) is not None:
+                return (py, px)
+
+    def jump(self, y, x, dy, dx, goal, stats=None):
+        """
+        Same contract as jps.jump(), in unpadded coordinates. With stats,
+        the call and the cells it covered are counted.
+        """
+        gy, gx = goal[0] + 1, goal[1] + 1
+        if stats is not None:
+            stats.jump_calls += 1
+        if dy != 0 and dx != 0:
+            jp = self.diagonal(y + 1, x + 1, dy, dx, gy, gx, stats)
+        elif stats is not None:
+            jp = self.counted_straight(y + 1, x + 1, dy, dx, gy, gx, stats)
+        else:
+            jp = self.straight(y + 1, x + 1, dy, dx, gy, gx)
+        if jp is None:
+            return None
+        return (jp[0] - 1, jp[1] - 1)
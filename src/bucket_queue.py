@@ -0,0 +1,123 @@
+"""
+Open list with exact keys and decrease-key.
+
+Search costs are kept as (straight, diagonal) step counts. For such
+pairs the float key a + b * sqrt(2) orders exactly: two different pairs
+of map-sized integers differ by far more than the rounding error, and
+equal pairs give bit-identical floats. Equal f-values therefore really
+are equal, and all nodes with the same f share one bucket.
+
+BucketQueue keeps one bucket (an insertion-ordered dict) per distinct
+key and a heap of the distinct keys. A node is in the queue at most once:
+pushing it again with a lower key moves it to the new bucket
+(decrease-key) instead of adding a duplicate entry, so the open list
+never holds stale entries. Within a bucket, nodes come out last in,
+first out, which favours the deeper nodes among equal f-values.
+
+tie_breaker() builds tuple keys (f, tie) for other ways of ordering
+nodes with equal f; each distinct tuple is then a bucket of its own.
+"""
+
+import heapq
+import math
+
+
+SQRT2 = math.sqrt(2)
+
+
+def exact_key(straight, diagonal):
+    """
+    Float key of the cost straight + diagonal * sqrt(2).
+    """
+    return straight + diagonal * SQRT2
+
+
+# Orders among nodes with equal f:
+# "lifo": most recently pushed first (plain f keys)
+# "high_g": larger g first, i.e. closer to the goal by the heuristic
+# "cross": closest to the straight line from start to goal first
+TIE_BREAKS = ("lifo", "high_g", "cross")
+
+
+def tie_breaker(tie_break, start, goal):
+    """
+    Key function for the tie-breaking policy tie_break (see TIE_BREAKS).
+
+    Returns:
+    function: key(f, g, y, x) for a node at (y, x) with cost g and
+    f-value f, or None for "lifo", which uses f itself as the key.
+    """
+    if tie_break == "lifo":
+        return None
+    if tie_break == "high_g":
+        return lambda f, g, y, x: (f, -g)
+    if tie_break == "cross":
+        gy, gx = goal
+        sy = start[0] - gy
+        sx = start[1] - gx
+        return lambda f, g, y, x: (f, abs((y - gy) * sx - (x - gx) * sy))
+    raise ValueError(f"unknown tie_break {tie_break!r}, expected one of {TIE_BREAKS}")
+
+
+class BucketQueue:
+    """
+    Priority queue of nodes (any hashable) with float keys from exact_key(),
+    or (key, tie) tuples from a tie_breaker().
+    """
+
+    __slots__ = ("buckets", "keys", "key_of")
+
+    def __init__(self):
+        self.buckets = {}
+        self.keys = []
+        self.key_of = {}
+
+    def __len__(self):
+        return len(self.key_of)
+
+    def __bool__(self):
+        return bool(self.key_of)
+
+    def __contains__(self, node):
+        return node in self.key_of
+
+    def push(self, node, key):
+        """
+        Insert node, or lower its key if it is already queued.
+
+        Returns:
+        bool: True if node was not in the queue before.
+        """
+        key_of = self.key_of
+        old = key_of.get(node)
+        if old is not None:
+            if key >= old:
+                return False
+            del self.buckets[old][node]
+        key_of[node] = key
+
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = {}
+            heapq.heappush(self.keys, key)
+        bucket[node] = None
+        return old is None
+
+    def min_key(self):
+        """
+        Smallest key in the queue (the queue must not be empty).
+        """
+        keys = self.keys
+        buckets = self.buckets
+        while not buckets.get(keys[0]):
+            buckets.pop(heapq.heappop(keys), None)
+        return keys[0]
+
+    def pop(self):
+        """
+        Remove and return (key, node) with the smallest key.
+        """
+        key = self.min_key()
+        node, _ = self.buckets[key].popitem()
+        del self.key_of[node]
+        return key, node
@@ -0,0 +1,182 @@
+"""
+8-connected component labelling for O(1) unreachable-query rejection.
+
+Every free cell gets a component label; two cells are connected exactly
+when their labels resolve to the same root. Opening a cell merges the
+labels around it with a union-find step. Closing a cell only needs a
+flood fill when the cell could actually have been the sole link between
+its neighbours.
+"""
+
+from array import array
+from collections import deque
+
+from grid import as_grid
+
+
+DIRECTIONS = [
+    (-1,0), (1,0), (0,-1), (0,1),
+    (-1,-1), (-1,1), (1,-1), (1,1)
+]
+
+# The 8 neighbours of a cell, clockwise from north
+RING = [(-1,0), (-1,1), (0,1), (1,1), (1,0), (1,-1), (0,-1), (-1,-1)]
+
+
+class ComponentIndex:
+    """
+    Component labels for one Grid.
+
+    labels[i] is 0 for walls and a label >= 1 for free cells (i is the
+    padded Grid index). Labels are merged through a union-find parent
+    table, so find(labels[i]) is the component id.
+
+    Edit the grid through ComponentIndex.set_cell() to keep the index up
+    to date incrementally; edits made directly on the grid are detected
+    through Grid.version and trigger a full relabelling.
+    """
+
+    def __init__(self, grid):
+        self.grid = as_grid(grid)
+        self.rebuild()
+
+    def rebuild(self):
+        """
+        Label every component from scratch.
+        """
+        grid = self.grid
+        cells = grid.cells
+        self.labels = array("i", [0]) * len(cells)
+        self.parent = [0]
+        for i in range(grid.stride, len(cells) - grid.stride):
+            if not cells[i] and not self.labels[i]:
+                self._flood(i, self._new_label())
+        self.version = grid.version
+
+    def _new_label(self):
+        self.parent.append(len(self.parent))
+        return len(self.parent) - 1
+
+    def _flood(self, start, label, old_root=None):
+        """
+        Give label to every free cell reachable from start. With old_root,
+        only cells currently in that component are relabelled.
+        """
+        cells = self.grid.cells
+        labels = self.labels
+        offsets = [dy * self.grid.stride + dx for dy, dx in DIRECTIONS]
+
+        labels[start] = label
+        queue = deque([start])
+        while queue:
+            u = queue.popleft()
+            for offset in offsets:
+                v = u + offset
+                if cells[v] or labels[v] == label:
+                    continue
+                if old_root is not None and self.find(labels[v]) != old_root:
+                    continue
+                labels[v] = label
+                queue.append(v)
+
+    def find(self, label):
+        """
+        Root label of a component (with path halving).
+        """
+        parent = self.parent
+        while parent[label] != label:
+            parent[label] = parent[parent[label]]
+            label = parent[label]
+        return label
+
+    def component(self, y, x):
+        """
+        Component id of (y, x), or 0 if it is a wall or outside the grid.
+        """
+        if self.version != self.grid.version:
+            self.rebuild()
+        if not self.grid.in_bounds(y, x):
+            return 0
+        label = self.labels[self.grid.index(y, x)]
+        return self.find(label) if label else 0
+
+    def connected(self, a, b):
+        """
+        True if free cells a and b are in the same 8-connected component.
+        """
+        ca = self.component(*a)
+        return ca != 0 and ca == self.component(*b)
+
+    def set_cell(self, y, x, value):
+        """
+        Set cell (y, x) on the grid and update the labels incrementally.
+        """
+        grid = self.grid
+        if self.version != grid.version:
+            self.rebuild()
+
+        i = grid.index(y, x)
+        was_wall = grid.cells[i] != 0
+        grid.set_cell(y, x, value)
+        self.version = grid.version
+
+        if was_wall and not value:
+            self._open(i)
+        elif not was_wall and value:
+            self._close(i)
+
+    def _open(self, i):
+        cells = self.grid.cells
+        labels = self.labels
+        stride = self.grid.stride
+
+        roots = {self.find(labels[i + dy * stride + dx])
+                 for dy, dx in DIRECTIONS if not cells[i + dy * stride + dx]}
+        if not roots:
+            labels[i] = self._new_label()
+            return
+
+        root = roots.pop()
+        for other in roots:
+            self.parent[other] = root
+        labels[i] = root
+
+    def _close(self, i):
+        cells = self.grid.cells
+        labels = self.labels
+        stride = self.grid.stride
+
+        old_root = self.find(labels[i])
+        labels[i] = 0
+
+        ring = [i + dy * stride + dx for dy, dx in RING]
+        free = [k for k, n in enumerate(ring) if not cells[n]]
+        if not free:
+            return
+
+        # Free ring cells that touch each other stay connected without i.
+        # If they form a single group, the component cannot have split.
+        if len(_ring_groups(free)) == 1:
+            return
+
+        for n in (ring[k] for k in free):
+            if self.find(labels[n]) == old_root:
+                self._flood(n, self._new_label(), old_root)
+
+
+def _ring_groups(free):
+    """
+    Group ring positions (0-7, clockwise from north) that are 8-adjacent
+    to each other.
+    """
+    groups = []
+    for k in free:
+        ky, kx = RING[k]
+        touching = [g for g in groups
+                    if any(max(abs(ky - RING[j][0]), abs(kx - RING[j][1])) <= 1 for j in g)]
+        merged = [k]
+        for g in touching:
+            merged.extend(g)
+            groups.remove(g)
+        groups.append(merged)
+    return groups
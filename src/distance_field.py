@@ -0,0 +1,150 @@
+"""
+One-to-all octile distances.
+
+distance_field(source, grid) computes the exact 8-connected shortest path
+cost from one cell to every reachable cell in a single Dijkstra pass over
+the flat Grid arrays, instead of running one A* query per target.
+
+Costs are tracked exactly as (straight steps, diagonal steps) counts, so
+cost = straight + diagonal * sqrt(2) without accumulated rounding error.
+"""
+
+import heapq
+import math
+from array import array
+
+from grid import as_grid
+
+
+DIRECTIONS = [
+    (-1,0), (1,0), (0,-1), (0,1),
+    (-1,-1), (-1,1), (1,-1), (1,1)
+]
+
+NO_PARENT = 255
+UNREACHED = -1
+
+
+class DistanceField:
+    """
+    Result of distance_field(): per padded Grid index, the number of
+    straight and diagonal steps on a shortest path from the source
+    (straight == UNREACHED if the cell cannot be reached) and the
+    direction of the last move into the cell (NO_PARENT for the source
+    and unreached cells).
+    """
+
+    def __init__(self, grid, source, straight, diagonal, direction):
+        self.grid = grid
+        self.source = source
+        self.straight = straight
+        self.diagonal = diagonal
+        self.direction = direction
+
+    def steps(self, y, x):
+        """
+        (straight, diagonal) step counts to (y, x), or None if unreachable.
+        """
+        if not self.grid.in_bounds(y, x):
+            return None
+        i = self.grid.index(y, x)
+        if self.straight[i] == UNREACHED:
+            return None
+        return (self.straight[i], self.diagonal[i])
+
+    def cost(self, y, x):
+        """
+        Octile path cost to (y, x), or math.inf if unreachable.
+        """
+        steps = self.steps(y, x)
+        if steps is None:
+            return math.inf
+        return steps[0] + steps[1] * math.sqrt(2)
+
+    def path_to(self, y, x):
+        """
+        Read back a shortest path from the source to (y, x) by following
+        the stored directions.
+
+        Returns:
+        list of tuple: Path from source to (y, x), or None if unreachable.
+        """
+        if self.steps(y, x) is None:
+            return None
+
+        grid = self.grid
+        direction = self.direction
+        offsets = [dy * grid.stride + dx for dy, dx in DIRECTIONS]
+
+        i = grid.index(y, x)
+        path = [i]
+        while direction[i] != NO_PARENT:
+            i -= offsets[direction[i]]
+            path.append(i)
+        return [grid.coords(i) for i in reversed(path)]
+
+    def to_rows(self):
+        """
+        Cost map as a list of lists of floats (math.inf where unreachable).
+        """
+        return [[self.cost(y, x) for x in range(self.grid.width)]
+                for y in range(self.grid.height)]
+
+
+def distance_field(source, grid):
+    """
+    Compute the octile cost from source to every cell of the grid.
+
+    Parameters:
+    source (tuple): (y, x) start cell.
+    grid (Grid or list of list of int): Map (0 = walkable, 1 = wall).
+
+    Returns:
+    DistanceField: Costs and parent directions for every cell.
+    """
+    grid = as_grid(grid)
+    cells = grid.cells
+    size = len(cells)
+    sqrt2 = math.sqrt(2)
+
+    straight = array("i", [UNREACHED]) * size
+    diagonal = array("i", [0]) * size
+    direction = bytearray([NO_PARENT]) * size
+    done = bytearray(size)
+
+    if not grid.passable(*source):
+        return DistanceField(grid, source, straight, diagonal, direction)
+
+    moves = [
+        (d, dy * grid.stride + dx, dy != 0 and dx != 0)
+        for d, (dy, dx) in enumerate(DIRECTIONS)
+    ]
+
+    s = grid.index(*source)
+    straight[s] = 0
+    heap = [(0.0, s)]
+
+    while heap:
+        _, u = heapq.heappop(heap)
+        if done[u]:
+            continue
+        done[u] = 1
+
+        a = straight[u]
+        b = diagonal[u]
+        for d, offset, is_diagonal in moves:
+            v = u + offset
+            if cells[v] or done[v]:
+                continue
+            if is_diagonal:
+                na, nb = a, b + 1
+            else:
+                na, nb = a + 1, b
+            key = na + nb * sqrt2
+            if straight[v] == UNREACHED or key < straight[v] + diagonal[v] * sqrt2:
+                straight[v] = na
+                diagonal[v] = nb
+                direction[v] = d
+                heapq.heappush(heap, (key, v))
+
+    return DistanceField(grid, source, straight, diagonal, direction)
@@ -0,0 +1,231 @@
+"""
+Incremental replanning with D* Lite.
+
+The planner searches backwards from the goal and keeps its g/rhs values
+between calls. After cells are changed with set_cell(), only the vertices
+whose costs are affected are repaired on the next find_path() call,
+instead of searching again from scratch. The start may also move along
+the path (move_start) without discarding the search state.
+
+Uses the same octile move costs and heuristic as a_star.py.
+"""
+
+import heapq
+import math
+
+from a_star import DIRECTIONS, heuristic
+from grid import as_grid
+from path_result import PathResult
+
+
+INF = math.inf
+
+# Keys are sums of sqrt(2) terms, so two keys that are equal in exact
+# arithmetic can differ in the last bit. Keys this close count as equal.
+EPS = 1e-9
+
+
+class DStarLite:
+    """
+    Parameters:
+    grid (Grid or list of list of int): Map; a list is converted to a
+    Grid, which the planner then owns and edits.
+    start (tuple): (y, x) start cell.
+    goal (tuple): (y, x) goal cell.
+    """
+
+    def __init__(self, grid, start, goal):
+        self.grid = as_grid(grid)
+        stride = self.grid.stride
+        self.moves = [
+            (dy * stride + dx, math.sqrt(2) if dy != 0 and dx != 0 else 1)
+            for dy, dx in DIRECTIONS
+        ]
+
+        self.start = self.grid.index(*start)
+        self.goal = self.grid.index(*goal)
+        self.last = self.start
+        self.km = 0
+
+        self.g = {}
+        self.rhs = {self.goal: 0}
+        self.queue = []
+        self.queued = {}
+        self._push(self.goal)
+
+        # Vertices expanded by the last find_path() call
+        self.expanded = 0
+
+    def _coords(self, index):
+        y, x = divmod(index, self.grid.stride)
+        return (y - 1, x - 1)
+
+    def _key(self, u):
+        m = min(self.g.get(u, INF), self.rhs.get(u, INF))
+        return (m + heuristic(self._coords(self.start), self._coords(u)) + self.km, m)
+
+    def _push(self, u):
+        key = self._key(u)
+        self.queued[u] = key
+        heapq.heappush(self.queue, (key, u))
+
+    def _top(self):
+        """
+        Smallest live queue entry, dropping stale ones.
+        """
+        queue = self.queue
+        while queue:
+            key, u = queue[0]
+            if self.queued.get(u) == key:
+                return key, u
+            heapq.heappop(queue)
+        return (INF, INF), None
+
+    def _best_rhs(self, u):
+        cells = self.grid.cells
+        if cells[u]:
+            return INF
+        g = self.g
+        best = INF
+        for offset, cost in self.moves:
+            v = u + offset
+            if not cells[v]:
+                t = cost + g.get(v, INF)
+                if t < best:
+                    best = t
+        return best
+
+    def _update_vertex(self, u):
+        if u != self.goal:
+            self.rhs[u] = self._best_rhs(u)
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+        else:
+            self.queued.pop(u, None)
+
+    def _compute_shortest_path(self):
+        cells = self.grid.cells
+        g = self.g
+        rhs = self.rhs
+        start = self.start
+        expanded = 0
+
+        while True:
+            top_key, u = self._top()
+            if u is None:
+                break
+            if not (_not_after(top_key, self._key(start)) or rhs.get(start, INF) > g.get(start, INF)):
+                break
+
+            new_key = self._key(u)
+            if top_key < new_key:
+                self._push(u)
+                continue
+
+            heapq.heappop(self.queue)
+            del self.queued[u]
+            expanded += 1
+
+            if g.get(u, INF) > rhs.get(u, INF):
+                g[u] = rhs[u]
+                for offset, cost in self.moves:
+                    s = u + offset
+                    if cells[s] or s == self.goal:
+                        continue
+                    t = cost + g[u]
+                    if t < rhs.get(s, INF):
+                        rhs[s] = t
+                        self._update_vertex_key(s)
+            else:
+                g[u] = INF
+                self._update_vertex(u)
+                for offset, _ in self.moves:
+                    s = u + offset
+                    if not cells[s]:
+                        self._update_vertex(s)
+
+        self.expanded = expanded
+
+    def _update_vertex_key(self, u):
+        """
+        UpdateVertex() for a vertex whose rhs was already lowered.
+        """
+        if self.g.get(u, INF) != self.rhs.get(u, INF):
+            self._push(u)
+        else:
+            self.queued.pop(u, None)
+
+    def set_cell(self, y, x, value):
+        """
+        Open (0) or block (non-zero) cell (y, x). The search state is
+        repaired on the next find_path() call.
+        """
+        grid = self.grid
+        i = grid.index(y, x)
+        if (grid.cells[i] != 0) == bool(value):
+            return
+        grid.set_cell(y, x, value)
+
+        # Costs of all edges touching the cell changed
+        self._update_vertex(i)
+        for offset, _ in self.moves:
+            n = i + offset
+            if not grid.cells[n]:
+                self._update_vertex(n)
+
+    def move_start(self, start):
+        """
+        Move the start (e.g. the agent's position) without replanning.
+        """
+        new_start = self.grid.index(*start)
+        self.km += heuristic(self._coords(self.last), self._coords(new_start))
+        self.last = new_start
+        self.start = new_start
+
+    def find_path(self):
+        """
+        Repair the search and return the current shortest path.
+
+        Returns:
+        PathResult: Path from start to goal, expanded on demand.
+        Returns None if no path exists.
+        """
+        grid = self.grid
+        if grid.cells[self.start] or grid.cells[self.goal]:
+            return None
+
+        self._compute_shortest_path()
+        g = self.g
+        if self.rhs.get(self.start, INF) == INF:
+            return None
+
+        # Follow the successor that minimises cost + g towards the goal
+        cells = grid.cells
+        u = self.start
+        path = [u]
+        limit = len(cells)
+        while u != self.goal:
+            best = None
+            best_cost = INF
+            for offset, cost in self.moves:
+                v = u + offset
+                if cells[v]:
+                    continue
+                t = cost + g.get(v, INF)
+                if t < best_cost:
+                    best, best_cost = v, t
+            if best is None or len(path) > limit:
+                return None
+            u = best
+            path.append(u)
+        return PathResult.from_cells(self._coords(i) for i in path)
+
+
+def _not_after(a, b):
+    """
+    True if key a sorts before key b or ties with it (within EPS). Ties
+    are expanded too: doing extra work is safe, stopping early is not.
+    """
+    if a[0] < b[0] - EPS:
+        return True
+    return a[0] <= b[0] + EPS and a[1] <= b[1] + EPS
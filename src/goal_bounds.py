@@ -0,0 +1,235 @@
+"""
+Goal bounding: a pruning layer for A* and JPS.
+
+For every free cell n and each outgoing direction d, preprocessing stores
+the bounding box of all cells t such that some optimal path from n to t
+starts with the move d. A search that is looking for goal can then skip
+direction d at n when the goal lies outside that box.
+
+Boxes record every optimal first move, not just one, so any optimal path
+(including the canonical one JPS follows) stays available and both
+searches still return optimal paths.
+
+Preprocessing is one Dijkstra per free cell, so it is spread over worker
+processes and cached on disk keyed by Grid.digest().
+"""
+
+import heapq
+import math
+import os
+from array import array
+from multiprocessing import Pool
+
+from grid import Grid, as_grid
+from table_io import cache_path, read_table, write_table
+
+
+MAGIC = b"GBND"
+FORMAT_VERSION = 1
+
+DIRECTIONS = [
+    (-1,0), (1,0), (0,-1), (0,1),
+    (-1,-1), (-1,1), (1,-1), (1,1)
+]
+
+# min_y, max_y, min_x, max_x of an empty box
+EMPTY_BOX = (32767, -1, 32767, -1)
+
+
+class GoalBounds:
+    """
+    Bounding boxes for one grid: boxes[(index * 8 + d) * 4 : ... + 4] is
+    (min_y, max_y, min_x, max_x) for padded Grid index and direction d
+    (position in DIRECTIONS).
+    """
+
+    def __init__(self, height, width, digest, boxes):
+        self.height = height
+        self.width = width
+        self.stride = width + 2
+        self.digest = digest
+        self.boxes = boxes
+
+    def allows(self, y, x, dy, dx, goal):
+        """
+        True if moving from (y, x) in direction (dy, dx) can start an
+        optimal path to goal.
+        """
+        b = (((y + 1) * self.stride + x + 1) * 8 + DIRECTIONS.index((dy, dx))) * 4
+        boxes = self.boxes
+        return boxes[b] <= goal[0] <= boxes[b + 1] and boxes[b + 2] <= goal[1] <= boxes[b + 3]
+
+
+def first_moves(grid, source):
+    """
+    Dijkstra from a padded index, recording for every reached cell the
+    bitmask of directions that start an optimal path to it.
+
+    Costs are kept as exact (straight, diagonal) step counts, so equal-cost
+    paths are detected without floating point tolerance.
+
+    Returns:
+    dict: padded index -> bitmask of first-move directions.
+    """
+    cells = grid.cells
+    stride = grid.stride
+    sqrt2 = math.sqrt(2)
+    moves = [(d, dy * stride + dx, dy != 0 and dx != 0) for d, (dy, dx) in enumerate(DIRECTIONS)]
+
+    cost = {source: (0, 0)}
+    masks = {}
+    heap = []
+    for d, offset, diagonal in moves:
+        n = source + offset
+        if cells[n]:
+            continue
+        cost[n] = (0, 1) if diagonal else (1, 0)
+        masks[n] = 1 << d
+        heapq.heappush(heap, (sqrt2 if diagonal else 1, n))
+
+    done = {source}
+    while heap:
+        _, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+
+        a, b = cost[u]
+        mask = masks[u]
+        for d, offset, diagonal in moves:
+            v = u + offset
+            if cells[v] or v in done:
+                continue
+            c = (a, b + 1) if diagonal else (a + 1, b)
+            old = cost.get(v)
+            if old == c:
+                masks[v] |= mask
+                continue
+            key = c[0] + c[1] * sqrt2
+            if old is None or key < old[0] + old[1] * sqrt2:
+                cost[v] = c
+                masks[v] = mask
+                heapq.heappush(heap, (key, v))
+
+    return masks
+
+
+def boxes_for_source(grid, source):
+    """
+    The 8 bounding boxes of one cell, flattened to 32 values.
+    """
+    stride = grid.stride
+    box = [list(EMPTY_BOX) for _ in DIRECTIONS]
+
+    for t, mask in first_moves(grid, source).items():
+        ty, tx = divmod(t, stride)
+        ty -= 1
+        tx -= 1
+        d = 0
+        while mask:
+            if mask & 1:
+                b = box[d]
+                if ty < b[0]:
+                    b[0] = ty
+                if ty > b[1]:
+                    b[1] = ty
+                if tx < b[2]:
+                    b[2] = tx
+                if tx > b[3]:
+                    b[3] = tx
+            mask >>= 1
+            d += 1
+
+    return [v for b in box for v in b]
+
+
+_worker_grid = None
+
+
+def _init_worker(height, width, cells):
+    global _worker_grid
+    _worker_grid = Grid(height, width, bytearray(cells))
+
+
+def _boxes_for_sources(sources):
+    return [(s, boxes_for_source(_worker_grid, s)) for s in sources]
+
+
+def build_bounds(grid, workers=None):
+    """
+    Compute the goal bounds of a grid.
+
+    workers is the number of processes to use (default: all cores);
+    1 runs everything in the calling process.
+
+    Returns:
+    GoalBounds: Boxes for the grid's current contents.
+    """
+    grid = as_grid(grid)
+    cells = grid.cells
+    stride = grid.stride
+    typecode = "h" if max(grid.height, grid.width) < 2 ** 15 else "i"
+    boxes = array(typecode, EMPTY_BOX) * (len(cells) * 8)
+
+    sources = [c for c in range(stride, len(cells) - stride) if not cells[c]]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(sources) < 64:
+        results = [[(s, boxes_for_source(grid, s)) for s in sources]]
+    else:
+        chunk = max(1, len(sources) // (workers * 8))
+        chunks = [sources[i:i + chunk] for i in range(0, len(sources), chunk)]
+        with Pool(workers, _init_worker, (grid.height, grid.width, bytes(cells))) as pool:
+            results = list(pool.imap_unordered(_boxes_for_sources, chunks))
+
+    for result in results:
+        for s, values in result:
+            boxes[s * 32:s * 32 + 32] = array(typecode, values)
+
+    return GoalBounds(grid.height, grid.width, grid.digest(), boxes)
+
+
+def save_bounds(bounds, path):
+    """
+    Write goal bounds to a versioned binary file.
+    """
+    write_table(path, MAGIC, FORMAT_VERSION, bounds.height, bounds.width,
+                bounds.digest, bounds.boxes)
+
+
+def load_bounds(path):
+    """
+    Read goal bounds written by save_bounds().
+
+    Raises:
+    ValueError: If the file is not a goal bounds table of the current format.
+    """
+    height, width, digest, boxes = read_table(path, MAGIC, FORMAT_VERSION, 32)
+    return GoalBounds(height, width, digest, boxes)
+
+
+def load_or_build(grid, cache_dir=None, workers=None):
+    """
+    Return the goal bounds of a grid, reading them from cache_dir if they
+    were already computed for the same map, and building (and saving)
+    them otherwise.
+    """
+    grid = as_grid(grid)
+    if cache_dir is None:
+        return build_bounds(grid, workers)
+
+    digest = grid.digest()
+    path = cache_path(cache_dir, digest, ".gbnd")
+    if os.path.exists(path):
+        try:
+            bounds = load_bounds(path)
+            if bounds.digest == digest:
+                return bounds
+        except ValueError:
+            pass
+
+    bounds = build_bounds(grid, workers)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_bounds(bounds, path)
+    return bounds
+
@@ -0,0 +1,143 @@
+import hashlib
+
+WALL = 1
+FREE = 0
+
+
+class Grid:
+    """
+    Walkable/blocked map stored as a flat row-major bytearray.
+
+    The map is surrounded by a one-cell wall border, so every in-map cell
+    has all eight neighbours inside the array and the searches can probe
+    them by index without any bounds checks.
+
+    Cell (y, x) lives at index (y + 1) * stride + (x + 1), where
+    stride = width + 2. A value of 0 is walkable, 1 is a wall.
+    """
+
+    def __init__(self, height, width, cells=None):
+        self.height = height
+        self.width = width
+        self.stride = width + 2
+
+        if cells is None:
+            cells = bytearray([WALL]) * ((height + 2) * self.stride)
+            empty = bytes(width)
+            for y in range(height):
+                start = (y + 1) * self.stride + 1
+                cells[start:start + width] = empty
+        self.cells = cells
+
+        # Bumped on every set_cell() so derived structures know to rebuild
+        self.version = 0
+        self._derived = {}
+
+    @classmethod
+    def from_rows(cls, rows):
+        """
+        Build a Grid from a list of lists (0 = walkable, anything else = wall).
+        """
+        height = len(rows)
+        width = len(rows[0]) if height else 0
+        grid = cls(height, width)
+        cells = grid.cells
+        stride = grid.stride
+
+        for y, row in enumerate(rows):
+            if len(row) != width:
+                raise ValueError(f"Row {y} has length {len(row)}, expected {width}")
+            start = (y + 1) * stride + 1
+            cells[start:start + width] = bytes(map(bool, row))
+        return grid
+
+    def index(self, y, x):
+        """
+        Flat index of cell (y, x) in the padded cell array.
+        """
+        return (y + 1) * self.stride + x + 1
+
+    def coords(self, index):
+        """
+        Inverse of index(): the (y, x) coordinates of a flat index.
+        """
+        y, x = divmod(index, self.stride)
+        return (y - 1, x - 1)
+
+    def in_bounds(self, y, x):
+        return 0 <= y < self.height and 0 <= x < self.width
+
+    def passable(self, y, x):
+        """
+        Check if position is inside the grid and walkable.
+        """
+        return 0 <= y < self.height and 0 <= x < self.width and \
+            self.cells[(y + 1) * self.stride + x + 1] == FREE
+
+    def set_cell(self, y, x, value):
+        """
+        Set cell (y, x) to walkable (0) or wall (non-zero).
+        """
+        if not self.in_bounds(y, x):
+            raise IndexError(f"cell {(y, x)} is outside the grid")
+        self.cells[(y + 1) * self.stride + x + 1] = WALL if value else FREE
+        self.version += 1
+
+    def derived(self, key, build):
+        """
+        Return a structure computed from the cells by build(grid), cached
+        under key and rebuilt only after the grid has been edited.
+        """
+        entry = self._derived.get(key)
+        if entry is None or entry[0] != self.version:
+            entry = (self.version, build(self))
+            self._derived[key] = entry
+        return entry[1]
+
+    def digest(self):
+        """
+        SHA-256 hex digest of the map, used to key on-disk caches.
+        """
+        h = hashlib.sha256(f"{self.height}x{self.width}:".encode())
+        h.update(self.cells)
+        return h.hexdigest()
+
+    def to_rows(self):
+        """
+        Convert back to a list of lists of ints.
+        """
+        return [list(row) for row in self]
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        """
+        Read-only view of row y, so grid[y][x] works as with list grids.
+        """
+        if y < 0:
+            y += self.height
+        if not 0 <= y < self.height:
+            raise IndexError("grid row out of range")
+        start = (y + 1) * self.stride + 1
+        return memoryview(self.cells)[start:start + self.width].toreadonly()
+
+    def __iter__(self):
+        for y in range(self.height):
+            yield self[y]
+
+    def __eq__(self, other):
+        if isinstance(other, Grid):
+            return self.height == other.height and self.width == other.width \
+                and self.cells == other.cells
+        return NotImplemented
+
+
+def as_grid(grid):
+    """
+    Return grid unchanged if it is already a Grid, otherwise convert
+    a list of lists into one.
+    """
+    if isinstance(grid, Grid):
+        return grid
+    return Grid.from_rows(grid)
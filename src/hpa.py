@@ -0,0 +1,248 @@
+"""
+Hierarchical pathfinding (HPA*).
+
+The grid is split into square clusters. Where a run of free cells crosses
+a cluster border, an entrance puts a pair of abstract nodes on both sides
+of it. Nodes in the same cluster are linked by their exact in-cluster
+distance. A query connects start and goal to the nodes of their
+clusters, runs A* on this small abstract graph, and refines every
+abstract edge into grid cells with a_star.find_path.
+
+Paths are not always optimal: they are forced through entrance cells.
+"""
+
+import heapq
+import math
+
+import a_star
+from grid import as_grid
+from path_result import PathResult
+from search_context import SearchContext
+
+
+DIRECTIONS = [
+    (-1,0), (1,0), (0,-1), (0,1),
+    (-1,-1), (-1,1), (1,-1), (1,1)
+]
+
+# Entrances at least this wide get a transition at both ends instead of
+# one in the middle
+MAX_ENTRANCE_WIDTH = 6
+
+
+class HierarchicalMap:
+    """
+    Abstract graph of a grid for HPA* queries.
+
+    Parameters:
+    grid (Grid or list of list of int): Map to preprocess.
+    cluster_size (int): Side length of the square clusters.
+    """
+
+    def __init__(self, grid, cluster_size=16):
+        if cluster_size < 2:
+            raise ValueError("cluster_size must be at least 2")
+        self.grid = as_grid(grid)
+        self.cluster_size = cluster_size
+        self.context = SearchContext(self.grid)
+
+        # Abstract graph: padded cell index -> list of (index, cost)
+        self.edges = {}
+        self.cluster_nodes = {}
+        self._add_entrances()
+        for cluster, nodes in self.cluster_nodes.items():
+            for node in nodes:
+                costs = self._cluster_costs(node, cluster)
+                for other in nodes:
+                    if other != node and other in costs:
+                        self._add_edge(node, other, costs[other])
+
+    def cluster_of(self, index):
+        """
+        (cluster row, cluster column) of a padded cell index.
+        """
+        y, x = self.grid.coords(index)
+        return (y // self.cluster_size, x // self.cluster_size)
+
+    def _add_edge(self, a, b, cost):
+        self.edges.setdefault(a, []).append((b, cost))
+
+    def _add_node(self, index):
+        if index not in self.edges:
+            self.edges[index] = []
+            self.cluster_nodes.setdefault(self.cluster_of(index), []).append(index)
+
+    def _add_transition(self, a, b, cost):
+        self._add_node(a)
+        self._add_node(b)
+        self._add_edge(a, b, cost)
+        self._add_edge(b, a, cost)
+
+    def _add_entrances(self):
+        grid = self.grid
+        size = self.cluster_size
+
+        # Straight crossings: runs of free cell pairs along each border
+        for b in range(size, grid.width, size):
+            for y0 in range(0, grid.height, size):
+                ys = range(y0, min(y0 + size, grid.height))
+                pairs = [(grid.index(y, b - 1), grid.index(y, b)) for y in ys]
+                self._add_runs(pairs, 1)
+        for b in range(size, grid.height, size):
+            for x0 in range(0, grid.width, size):
+                xs = range(x0, min(x0 + size, grid.width))
+                pairs = [(grid.index(b - 1, x), grid.index(b, x)) for x in xs]
+                self._add_runs(pairs, 1)
+
+        # Diagonal crossings where both orthogonal cells are walls cannot be
+        # replaced by two straight moves, so they need their own transition
+        cells = grid.cells
+        stride = grid.stride
+        for y in range(grid.height):
+            for x in range(grid.width):
+                u = grid.index(y, x)
+                if cells[u]:
+                    continue
+                for dx in (-1, 1):
+                    v = u + stride + dx
+                    if cells[v] or not cells[u + stride] or not cells[u + dx]:
+                        continue
+                    if self.cluster_of(u) != self.cluster_of(v):
+                        self._add_transition(u, v, math.sqrt(2))
+
+    def _add_runs(self, pairs, cost):
+        cells = self.grid.cells
+        run = []
+        for a, b in pairs + [(None, None)]:
+            if a is not None and not cells[a] and not cells[b]:
+                run.append((a, b))
+                continue
+            if run:
+                if len(run) < MAX_ENTRANCE_WIDTH:
+                    self._add_transition(*run[len(run) // 2], cost)
+                else:
+                    self._add_transition(*run[0], cost)
+                    self._add_transition(*run[-1], cost)
+                run = []
+
+    def _cluster_costs(self, source, cluster):
+        """
+        Dijkstra from source restricted to its cluster.
+
+        Returns:
+        dict: padded index -> cost, for every cell reachable in the cluster.
+        """
+        grid = self.grid
+        cells = grid.cells
+        stride = grid.stride
+        size = self.cluster_size
+        y0, x0 = cluster[0] * size + 1, cluster[1] * size + 1
+        y1, x1 = y0 + size, x0 + size
+
+        moves = [(dy * stride + dx, math.sqrt(2) if dy and dx else 1) for dy, dx in DIRECTIONS]
+        cost = {source: 0}
+        heap = [(0, source)]
+        done = set()
+        while heap:
+            c, u = heapq.heappop(heap)
+            if u in done:
+                continue
+            done.add(u)
+            for offset, step in moves:
+                v = u + offset
+                if cells[v] or v in done:
+                    continue
+                vy, vx = divmod(v, stride)
+                if not (y0 <= vy < y1 and x0 <= vx < x1):
+                    continue
+                t = c + step
+                if t < cost.get(v, math.inf):
+                    cost[v] = t
+                    heapq.heappush(heap, (t, v))
+        return cost
+
+    def _endpoint_edges(self, index):
+        """
+        Temporary edges linking a query endpoint to its cluster's nodes.
+        """
+        cluster = self.cluster_of(index)
+        costs = self._cluster_costs(index, cluster)
+        return cluster, costs, [(n, costs[n]) for n in self.cluster_nodes.get(cluster, [])
+                                if n in costs and n != index]
+
+    def find_abstract_path(self, start, goal):
+        """
+        Search the abstract graph between two cells.
+
+        Returns:
+        list of int: Padded indices of the abstract nodes from start to
+        goal, or None if no path exists.
+        """
+        grid = self.grid
+        if not grid.passable(*start) or not grid.passable(*goal):
+            return None
+        s = grid.index(*start)
+        t = grid.index(*goal)
+        if s == t:
+            return [s]
+
+        s_cluster, s_costs, s_edges = self._endpoint_edges(s)
+        t_cluster, t_costs, t_edges = self._endpoint_edges(t)
+
+        extra = {s: list(s_edges), t: []}
+        for n, c in t_edges:
+            extra.setdefault(n, []).append((t, c))
+        if s_cluster == t_cluster and t in s_costs:
+            extra[s].append((t, s_costs[t]))
+
+        goal_y, goal_x = goal
+
+        def h(index):
+            y, x = divmod(index, grid.stride)
+            return a_star.heuristic((y - 1, x - 1), (goal_y, goal_x))
+
+        g_score = {s: 0}
+        came_from = {}
+        heap = [(h(s), s)]
+        closed = set()
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            closed.add(u)
+            if u == t:
+                path = [u]
+                while u in came_from:
+                    u = came_from[u]
+                    path.append(u)
+                return path[::-1]
+
+            for v, c in self.edges.get(u, []) + extra.get(u, []):
+                if v in closed:
+                    continue
+                cost = g_score[u] + c
+                if cost < g_score.get(v, math.inf):
+                    g_score[v] = cost
+                    came_from[v] = u
+                    heapq.heappush(heap, (cost + h(v), v))
+        return None
+
+    def find_path(self, start, goal):
+        """
+        Find a path with HPA*: abstract search, then refinement of every
+        abstract edge with a_star.find_path.
+
+        Returns:
+        PathResult: Path from start to goal, expanded on demand.
+        Returns None if no path exists.
+        """
+        abstract = self.find_abstract_path(start, goal)
+        if abstract is None:
+            return None
+
+        grid = self.grid
+        points = [grid.coords(abstract[0])]
+        for a, b in zip(abstract, abstract[1:]):
+            segment = a_star.find_path(grid.coords(a), grid.coords(b), grid, context=self.context)
+            points.extend(segment.points[1:])
+        return PathResult(points)
@@ -1,6 +1,19 @@
-import heapq
+import functools
 import math
 
+from block_jump import BlockJumper
+from bucket_queue import SQRT2, BucketQueue, exact_key, tie_breaker
+from grid import Grid, as_grid
+from movement import (DIRECTION_INDEX, START, StepJumper, allows, check_movement,
+                      neighbour_masks, pruned_table)
+from path_result import PathResult
+from search_context import SearchContext
+
+
+DIRECTIONS = [
+    (-1,0), (1,0), (0,-1), (0,1),
+    (-1,-1), (-1,1), (1,-1), (1,1)
+]
 
 def passable(grid, y, x):
     """
@@ -14,14 +27,27 @@ def passable(grid, y, x):
     Returns:
     bool: True if the tile is valid and not blocked.
     """
+    if isinstance(grid, Grid):
+        return grid.passable(y, x)
     return 0 <= y < len(grid) and 0 <= x < len(grid[0]) and grid[y][x] == 0
 
 
-def valid_move(grid,y,x,ny,nx):
+def free(grid, y, x):
+    """
+    Fast walkability probe for a Grid.
+
+    Unlike passable(), it does no bounds check: it relies on the wall
+    border, so (y, x) must be an in-map cell or one step outside it.
+    """
+    return grid.cells[(y + 1) * grid.stride + x + 1] == 0
+
+
+def valid_move(grid,y,x,ny,nx,movement="corner_cutting"):
     """
-    Determine whether movement to new position is allowed.
+    Determine whether movement to new position is allowed under the
+    movement rule (see movement.MOVEMENTS).
     """
-    return passable(grid,ny,nx)
+    return allows(grid, y, x, ny, nx, movement)
 
 
 def heuristic(a, b):
@@ -36,111 +62,72 @@ def heuristic(a, b):
 def jump(grid,y,x,dy,dx,goal):
     """
     Jump in a direction until a jump point, forced neighbor,
-    or the goal is reached.
+    or the goal is reached. grid must be a Grid.
+
+    Steps one cell at a time; find_path uses the equivalent bitset
+    engine in block_jump.BlockJumper instead.
 
     Returns:
     tuple or None: The jump point coordinates if found.
     """
-    ny,nx = y+dy,x+dx
+    while True:
+        ny,nx = y+dy,x+dx
 
-    if not valid_move(grid,y,x,ny,nx):
-        return None
+        if not free(grid,ny,nx):
+            return None
 
-    if (ny, nx) == goal:
-        return (ny,nx)
+        if (ny, nx) == goal:
+            return (ny,nx)
 
-    if dy != 0 and dx != 0:
-        if (not passable(grid,ny - dy,nx) and passable(grid, ny-dy, nx+dx)) or \
-           (not passable(grid, ny, nx-dx) and passable(grid, ny+dy, nx-dx)):
-            return (ny, nx)
+        if dy != 0 and dx != 0:
+            if (not free(grid,ny - dy,nx) and free(grid, ny-dy, nx+dx)) or \
+               (not free(grid, ny, nx-dx) and free(grid, ny+dy, nx-dx)):
+                return (ny, nx)
 
-        if jump(grid, ny, nx, dy, 0, goal) is not None:
-            return (ny, nx)
-        if jump(grid, ny, nx, 0, dx, goal) is not None:
-            return (ny, nx)
+            # Straight sub-jumps never branch further, so this recursion
+            # is at most one level deep
+            if jump(grid, ny, nx, dy, 0, goal) is not None:
+                return (ny, nx)
+            if jump(grid, ny, nx, 0, dx, goal) is not None:
+                return (ny, nx)
 
-    elif dx != 0:
-        if (not passable(grid, ny-1, nx) and passable(grid, ny-1, nx+dx)) or \
-           (not passable(grid, ny+1, nx) and passable(grid, ny+1, nx+dx)):
-            return (ny, nx)
+        elif dx != 0:
+            if (not free(grid, ny-1, nx) and free(grid, ny-1, nx+dx)) or \
+               (not free(grid, ny+1, nx) and free(grid, ny+1, nx+dx)):
+                return (ny, nx)
 
-    elif dy != 0:
-        if (not passable(grid, ny, nx+1) and passable(grid, ny+dy, nx+1)) or \
-           (not passable(grid, ny, nx-1) and passable(grid, ny+dy, nx-1)):
-            return (ny, nx)
+        elif dy != 0:
+            if (not free(grid, ny, nx+1) and free(grid, ny+dy, nx+1)) or \
+               (not free(grid, ny, nx-1) and free(grid, ny+dy, nx-1)):
+                return (ny, nx)
 
-    return jump(grid,ny,nx,dy,dx,goal)
+        y, x = ny, nx
 
 
-def prune_neighbors(grid, current, parent):
+def prune_neighbors(grid, current, parent, movement="corner_cutting"):
     """
     Reduce neighbor directions based on movement direction.
-    (JPS pruning step)
+    (JPS pruning step) grid must be a Grid.
+
+    The directions come from movement.pruned_table(), indexed by the
+    travel direction and the free-neighbour mask of current.
 
     Returns:
     list of tuple: Directions to explore next.
     """
-    y, x = current
-
-    if parent is None:
-        return [
-            (-1,0), (1,0), (0,-1), (0,1),
-            (-1,-1), (-1,1), (1,-1), (1,1)
-        ]
-
-    py, px = parent
-    dy = y - py
-    dx = x - px
+    return [DIRECTIONS[d] for d in
+            pruned_table(movement)[_travel(current, parent)][neighbour_masks(grid)[grid.index(*current)]]]
 
-    dy = 0 if dy == 0 else dy // abs(dy)
-    dx = 0 if dx == 0 else dx // abs(dx)
 
-    directions = []
-
-    if dy != 0 and dx != 0:
-        if valid_move(grid, y, x, y+dy, x+dx):
-            directions.append((dy, dx))
-        if valid_move(grid, y, x, y+dy, x):
-            directions.append((dy, 0))
-        if valid_move(grid, y, x, y, x+dx):
-            directions.append((0, dx))
-
-        if not passable(grid, y-dy, x) and passable(grid, y-dy, x+dx):
-            directions.append((-dy, dx))
-        if not passable(grid, y, x-dx) and passable(grid, y+dy, x-dx):
-            directions.append((dy, -dx))
-
-    elif dx != 0:
-        if valid_move(grid, y, x, y, x+dx):
-            directions.append((0, dx))
-
-        if not passable(grid, y+1, x) and passable(grid, y+1, x+dx):
-            directions.append((1, dx))
-        if not passable(grid, y-1, x) and passable(grid, y-1, x+dx):
-            directions.append((-1, dx))
-
-    elif dy != 0:
-        if valid_move(grid, y, x, y+dy, x):
-            directions.append((dy, 0))
-
-        if not passable(grid, y, x+1) and passable(grid, y+dy, x+1):
-            directions.append((dy, 1))
-        if not passable(grid, y, x-1) and passable(grid, y+dy, x-1):
-            directions.append((dy, -1))
-
-    return directions
-
-
-def reconstruct(came_from, start, goal):
+def _travel(current, parent):
     """
-    Reconstruct the path from goal back to start.
+    Index of the direction from parent to current (START if no parent).
     """
-    path = [goal]
-    cur = goal
-    while cur != start:
-        cur = came_from[cur]
-        path.append(cur)
-    return path[::-1]
+    if parent is None:
+        return START
+    dy = current[0] - parent[0]
+    dx = current[1] - parent[1]
+    return DIRECTION_INDEX[((dy > 0) - (dy < 0), (dx > 0) - (dx < 0))]
 
 
 def expand_path(path, grid):
@@ -177,98 +164,211 @@ def expand_path(path, grid):
     return expanded
 
 
-def find_path(start, goal, grid):
+def _octile_steps(dy, dx):
     """
-    Find the shortest path using JPS algorithm.
-
-    Returns:
-    list of tuple: Full expanded path from start to goal,
-    or None if no path exists.
+    (straight, diagonal) steps of an octile move by (dy, dx).
     """
-    if start == goal:
-        return [start]
+    dy = abs(dy)
+    dx = abs(dx)
+    if dy > dx:
+        return dy - dx, dx
+    return dx - dy, dy
 
-    open_set = []
-    heapq.heappush(open_set, (heuristic(start, goal), start))
 
-    came_from = {}
-    g_score = {start: 0}
-    parent = {start: None}
-    closed = set()
+def find_path(start, goal, grid, jumper=None, goal_bounds=None, context=None,
+              components=None, stats=None, tie_break="lifo", landmarks=None,
+              movement="corner_cutting"):
+    """
+    Find the shortest path using JPS algorithm.
 
-    while open_set:
-        _, current = heapq.heappop(open_set)
-        if current in closed:
-            continue
-        closed.add(current)
-
-        if current == goal:
-            raw = reconstruct(came_from, start, goal)
-            return expand_path(raw, grid)
-
-        for dy, dx in prune_neighbors(grid, current, parent[current]):
-            jp = jump(grid, current[0], current[1], dy, dx, goal)
-            if jp is None or jp in closed:
-                continue
+    jumper is an optional object with a jump(y, x, dy, dx, goal) method
+    to use instead of the grid's BlockJumper (e.g. a JPS+ table).
+    goal_bounds (GoalBounds, optional): Skip directions whose goal
+    bounding box does not contain the goal.
+    context (SearchContext, optional): Preallocated search state to reuse
+    across queries on the same grid.
+    components (ComponentIndex, optional): Return None at once when start
+    and goal are in different connected components.
+    stats (SearchStats, optional): Counters to add this search's
+    expansions, heap pushes/pops, open list size, jump() calls and
+    scanned cells to. The jumper must then accept a stats keyword.
+    tie_break (str): Order of jump points with equal f, one of
+    bucket_queue.TIE_BREAKS. Does not change the path cost.
+    landmarks (Landmarks, optional): Use the ALT heuristic of these
+    landmarks instead of the octile distance.
+    movement (str): Movement rule, one of movement.MOVEMENTS. Rules other
+    than "corner_cutting" use a movement.StepJumper by default; jumper,
+    goal_bounds and landmarks must then be built for that rule.
 
-            ddy = abs(jp[0] - current[0])
-            ddx = abs(jp[1] - current[1])
-            diag = min(ddy, ddx)
-            straight = max(ddy, ddx) - diag
-            cost = diag * math.sqrt(2) + straight
-
-            t = g_score[current] + cost
-            if t < g_score.get(jp, float("inf")):
-                came_from[jp] = current
-                parent[jp] = current
-                g_score[jp] = t
-                heapq.heappush(open_set, (t + heuristic(jp, goal), jp))
-    return None
+    Returns:
+    PathResult: Path from start to goal, holding the jump points and
+    expanded on demand. Returns None if no path exists (or start or goal
+    is a wall).
+    """
+    raw = find_path_jump_points(start, goal, grid, jumper, goal_bounds, context, components, stats,
+                                tie_break, landmarks, movement)
+    if raw is None:
+        return None
+    return PathResult(raw)
 
 
-def find_path_jump_points(start, goal, grid):
+def find_path_jump_points(start, goal, grid, jumper=None, goal_bounds=None, context=None,
+                          components=None, stats=None, tie_break="lifo", landmarks=None,
+                          movement="corner_cutting"):
     """
-    Same as find_path, but returns ONLY jump points (for unit tests).
+    JPS search engine. find_path() wraps its result in a PathResult, and
+    jps_plus.find_path() runs it with a JPS+ table as the jumper.
+
+    Parameters:
+    jumper (optional): Object with a jump(y, x, dy, dx, goal) method to
+    use instead of the grid's BlockJumper (e.g. a JPS+ table).
+    goal_bounds (GoalBounds, optional): Skip directions whose goal
+    bounding box does not contain the goal.
+    context (SearchContext, optional): Preallocated search state to reuse
+    across queries on the same grid.
+    components (ComponentIndex, optional): Return None at once when start
+    and goal are in different connected components.
+    stats (SearchStats, optional): Counters to add this search's
+    expansions, heap pushes/pops, open list size, jump() calls and
+    scanned cells to. The jumper must then accept a stats keyword.
+    tie_break (str): Order of jump points with equal f, one of
+    bucket_queue.TIE_BREAKS. Does not change the path cost.
+    landmarks (Landmarks, optional): Use the ALT heuristic of these
+    landmarks instead of the octile distance.
+    movement (str): Movement rule, one of movement.MOVEMENTS. Rules other
+    than "corner_cutting" use a movement.StepJumper by default; jumper,
+    goal_bounds and landmarks must then be built for that rule.
+
+    Returns:
+    list of tuple: Jump points from start to goal; consecutive points lie
+    on one straight or diagonal line. Returns None if no path exists (or
+    start or goal is a wall).
     """
+    tie = tie_breaker(tie_break, start, goal)
+    check_movement(movement)
+    if movement != "corner_cutting" and (goal_bounds is not None or landmarks is not None):
+        raise ValueError("goal bounds and landmarks assume corner-cutting movement")
     if start==goal:
         return [start]
 
-    open_set = []
-    heapq.heappush(open_set, (heuristic(start, goal), start))
-
-    came_from = {}
-    g_score = {start: 0}
-    parent = {start: None}
-    closed = set()
+    grid = as_grid(grid)
+    if not grid.passable(*start) or not grid.passable(*goal):
+        return None
+    if components is not None and not components.connected(start, goal):
+        return None
+    if jumper is None:
+        if movement == "corner_cutting":
+            jumper = grid.derived("block_jump", BlockJumper)
+        else:
+            jumper = grid.derived(("step_jump", movement), lambda g: StepJumper(g, movement))
+
+    if goal_bounds is not None and \
+       (goal_bounds.height, goal_bounds.width) != (grid.height, grid.width):
+        raise ValueError("goal bounds were built for a different grid size")
+    alt = None
+    if landmarks is not None:
+        if (landmarks.height, landmarks.width) != (grid.height, grid.width):
+            raise ValueError("landmarks were built for a different grid size")
+        alt = landmarks.heuristic(goal)
+
+    if context is None:
+        context = SearchContext(grid)
+    else:
+        context.check(grid)
+    generation = context.reset()
+    g_score = context.g
+    g_straight = context.g_straight
+    g_diagonal = context.g_diagonal
+    parent = context.parent
+    seen = context.seen
+    closed = context.closed
+    stride = grid.stride
+    masks = neighbour_masks(grid)
+    pruned = pruned_table(movement)
+    four = movement == "four_connected"
+    gy, gx = goal
+
+    start_i = grid.index(*start)
+    goal_i = grid.index(*goal)
+
+    # Costs are exact (straight, diagonal) step counts, see bucket_queue.py
+    open_set = BucketQueue()
+    f = exact_key(*_octile_steps(start[0] - gy, start[1] - gx))
+    open_set.push(start_i, f if tie is None else tie(f, 0.0, *start))
+    jump = jumper.jump
+    if stats is not None:
+        token = stats.start()
+        stats.pushes += 1
+        stats.peak_open = max(stats.peak_open, 1)
+        jump = functools.partial(jumper.jump, stats=stats)
+
+    g_score[start_i] = 0
+    g_straight[start_i] = 0
+    g_diagonal[start_i] = 0
+    parent[start_i] = -1
+    seen[start_i] = generation
 
     while open_set:
-        _, current = heapq.heappop(open_set)
-
-        if current in closed:
-            continue
-        closed.add(current)
-
-        if current == goal:
-            return reconstruct(came_from, start, goal)
-
-        for dy, dx in prune_neighbors(grid, current, parent[current]):
-            jp = jump(grid, current[0], current[1], dy, dx, goal)
-
-            if jp is None or jp in closed:
+        _, current_i = open_set.pop()
+        closed[current_i] = generation
+        if stats is not None:
+            stats.expanded += 1
+
+        if current_i == goal_i:
+            if stats is not None:
+                stats.finish(token, len(open_set))
+            return context.path_to(grid, current_i)
+
+        cy, cx = divmod(current_i, stride)
+        current = (cy - 1, cx - 1)
+        p = parent[current_i]
+        if p == -1:
+            travel = START
+        else:
+            py, px = divmod(p, stride)
+            travel = DIRECTION_INDEX[((cy > py) - (cy < py), (cx > px) - (cx < px))]
+        a = g_straight[current_i]
+        b = g_diagonal[current_i]
+
+        for d in pruned[travel][masks[current_i]]:
+            dy, dx = DIRECTIONS[d]
+            if goal_bounds is not None and \
+               not goal_bounds.allows(current[0], current[1], dy, dx, goal):
                 continue
 
-            ddy = abs(jp[0]-current[0])
-            ddx = abs(jp[1]-current[1])
-            diag = min(ddy, ddx)
-            straight = max(ddy, ddx) - diag
-            cost = diag * math.sqrt(2) + straight
-
-            t = g_score[current] + cost
+            jp = jump(current[0], current[1], dy, dx, goal)
+            if jp is None:
+                continue
 
-            if t < g_score.get(jp, float("inf")):
-                came_from[jp] = current
-                parent[jp] = current
-                g_score[jp] = t
-                heapq.heappush(open_set, (t + heuristic(jp, goal), jp))
+            jp_i = (jp[0] + 1) * stride + jp[1] + 1
+            if closed[jp_i] == generation:
+                continue
 
+            straight, diag = _octile_steps(jp[0] - current[0], jp[1] - current[1])
+            ta = a + straight
+            tb = b + diag
+            t = ta + tb * SQRT2
+
+            if seen[jp_i] != generation or t < g_score[jp_i]:
+                seen[jp_i] = generation
+                parent[jp_i] = current_i
+                g_score[jp_i] = t
+                g_straight[jp_i] = ta
+                g_diagonal[jp_i] = tb
+                if alt is not None:
+                    ha, hb = alt(jp_i)
+                elif four:
+                    ha, hb = abs(jp[0] - gy) + abs(jp[1] - gx), 0
+                else:
+                    ha, hb = _octile_steps(jp[0] - gy, jp[1] - gx)
+                f = ta + ha + (tb + hb) * SQRT2
+                if tie is not None:
+                    f = tie(f, t, jp[0], jp[1])
+                if open_set.push(jp_i, f) and stats is not None:
+                    stats.pushes += 1
+                    if len(open_set) > stats.peak_open:
+                        stats.peak_open = len(open_set)
+
+    if stats is not None:
+        stats.finish(token, 0)
     return None
@@ -0,0 +1,223 @@
+"""
+JPS+ : Jump Point Search with precomputed jump distances.
+
+For every free cell and each of the 8 directions, build_table() stores
+the number of steps to the next jump point in that direction (positive),
+or minus the number of free steps before the next wall (zero or negative).
+A query then replaces every jump() scan with a table lookup plus a few
+goal checks, and returns exactly the same jump points as jps.find_path.
+
+Tables can be saved to a versioned binary file keyed by Grid.digest(), so
+the preprocessing is paid once per map.
+"""
+
+import os
+from array import array
+
+from grid import as_grid
+from jps import DIRECTIONS, find_path_jump_points as jps_jump_points
+from path_result import PathResult
+from table_io import cache_path, read_table, write_table
+
+
+MAGIC = b"JPSP"
+FORMAT_VERSION = 1
+
+DIR_INDEX = {d: i for i, d in enumerate(DIRECTIONS)}
+
+
+class JumpTable:
+    """
+    Jump distances for one grid: distances[index * 8 + d] where index is
+    the padded Grid index and d the position of the direction in DIRECTIONS.
+
+    Implements jump(y, x, dy, dx, goal), so it can be passed as the jumper
+    of jps.find_path.
+    """
+
+    def __init__(self, height, width, digest, distances):
+        self.height = height
+        self.width = width
+        self.stride = width + 2
+        self.digest = digest
+        self.distances = distances
+
+    def jump(self, y, x, dy, dx, goal, stats=None):
+        """
+        Same contract as jps.jump(), answered from the table. With stats,
+        the call is counted; no grid cells are scanned.
+        """
+        if stats is not None:
+            stats.jump_calls += 1
+        stride = self.stride
+        distances = self.distances
+        c = (y + 1) * stride + x + 1
+        dist = distances[c * 8 + DIR_INDEX[(dy, dx)]]
+        reach = dist if dist > 0 else -dist
+        gy, gx = goal
+
+        if dx == 0:
+            if gx == x and 0 < (gy - y) * dy <= reach:
+                return goal
+        elif dy == 0:
+            if gy == y and 0 < (gx - x) * dx <= reach:
+                return goal
+        else:
+            # The goal stops a diagonal jump when it is on the diagonal or
+            # visible from a diagonal cell by one of the straight sub-jumps
+            best = dist if dist > 0 else reach + 1
+            step = dy * stride + dx
+
+            k = (gy - y) * dy
+            if 0 < k < best:
+                rest = (gx - x - k * dx) * dx
+                if rest == 0 or 0 < rest <= abs(distances[(c + k * step) * 8 + DIR_INDEX[(0, dx)]]):
+                    best = k
+
+            k = (gx - x) * dx
+            if 0 < k < best:
+                rest = (gy - y - k * dy) * dy
+                if rest == 0 or 0 < rest <= abs(distances[(c + k * step) * 8 + DIR_INDEX[(dy, 0)]]):
+                    best = k
+
+            if best <= reach:
+                return (y + best * dy, x + best * dx)
+            return None
+
+        if dist > 0:
+            return (y + dist * dy, x + dist * dx)
+        return None
+
+
+def _forced(cells, stride, c, dy, dx):
+    """
+    True if free cell c, reached by moving (dy, dx), has a forced neighbour
+    (the same tests as jps.jump()).
+    """
+    if dy != 0 and dx != 0:
+        return (cells[c - dy * stride] and not cells[c - dy * stride + dx]) or \
+            (cells[c - dx] and not cells[c + dy * stride - dx])
+    if dx != 0:
+        return (cells[c - stride] and not cells[c - stride + dx]) or \
+            (cells[c + stride] and not cells[c + stride + dx])
+    return (cells[c + 1] and not cells[c + 1 + dy * stride]) or \
+        (cells[c - 1] and not cells[c - 1 + dy * stride])
+
+
+def build_table(grid):
+    """
+    Compute the jump distance table of a grid.
+
+    Returns:
+    JumpTable: Table for the grid's current contents.
+    """
+    grid = as_grid(grid)
+    cells = grid.cells
+    stride = grid.stride
+    size = len(cells)
+    typecode = "h" if max(grid.height, grid.width) < 2 ** 15 else "i"
+    distances = array(typecode, bytes(size * 8 * array(typecode).itemsize))
+
+    free = [c for c in range(stride, size - stride) if not cells[c]]
+
+    # Straight directions first: the diagonal pass reads them
+    order = [d for d in DIRECTIONS if 0 in d] + [d for d in DIRECTIONS if 0 not in d]
+    for dy, dx in order:
+        d = DIR_INDEX[(dy, dx)]
+        step = dy * stride + dx
+        diagonal = dy != 0 and dx != 0
+        sub_y = DIR_INDEX.get((dy, 0))
+        sub_x = DIR_INDEX.get((0, dx))
+
+        # Visit cells so that c + step is always done before c
+        for c in (reversed(free) if step > 0 else free):
+            n = c + step
+            if cells[n]:
+                continue
+            if _forced(cells, stride, n, dy, dx) or \
+               (diagonal and (distances[n * 8 + sub_y] > 0 or distances[n * 8 + sub_x] > 0)):
+                distances[c * 8 + d] = 1
+            else:
+                ahead = distances[n * 8 + d]
+                distances[c * 8 + d] = ahead + 1 if ahead > 0 else ahead - 1
+
+    return JumpTable(grid.height, grid.width, grid.digest(), distances)
+
+
+def save_table(table, path):
+    """
+    Write a table to a versioned binary file.
+    """
+    write_table(path, MAGIC, FORMAT_VERSION, table.height, table.width,
+                table.digest, table.distances)
+
+
+def load_table(path):
+    """
+    Read a table written by save_table().
+
+    Raises:
+    ValueError: If the file is not a JPS+ table of the current format.
+    """
+    height, width, digest, distances = read_table(path, MAGIC, FORMAT_VERSION, 8)
+    return JumpTable(height, width, digest, distances)
+
+
+def load_or_build(grid, cache_dir=None):
+    """
+    Return the jump table of a grid, reading it from cache_dir if a table
+    for the same map is there, and building (and saving) it otherwise.
+    """
+    grid = as_grid(grid)
+    if cache_dir is None:
+        return build_table(grid)
+
+    digest = grid.digest()
+    path = cache_path(cache_dir, digest, ".jpsp")
+    if os.path.exists(path):
+        try:
+            table = load_table(path)
+            if table.digest == digest:
+                return table
+        except ValueError:
+            pass
+
+    table = build_table(grid)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_table(table, path)
+    return table
+
+
+def _table_for(grid, table, cache_dir):
+    if table is None:
+        return grid.derived(("jps_plus", cache_dir), lambda g: load_or_build(g, cache_dir))
+    if (table.height, table.width) != (grid.height, grid.width):
+        raise ValueError("JPS+ table was built for a different grid size")
+    return table
+
+
+def find_path_jump_points(start, goal, grid, table=None, cache_dir=None, stats=None):
+    """
+    JPS+ search returning only the jump points.
+
+    If table is None, the grid's table is built (or loaded from cache_dir)
+    on first use and reused until the grid is edited.
+    stats (SearchStats, optional): Counters to fill in, as in jps.find_path.
+    """
+    grid = as_grid(grid)
+    return jps_jump_points(start, goal, grid, _table_for(grid, table, cache_dir), stats=stats)
+
+
+def find_path(start, goal, grid, table=None, cache_dir=None, stats=None):
+    """
+    Find the shortest path with JPS+.
+
+    Returns:
+    PathResult: Path from start to goal, expanded on demand.
+    Returns None if no path exists (or start or goal is a wall).
+    """
+    grid = as_grid(grid)
+    raw = find_path_jump_points(start, goal, grid, table, cache_dir, stats)
+    if raw is None:
+        return None
+    return PathResult(raw)
@@ -0,0 +1,237 @@
+"""
+ALT heuristic: A*, landmarks and the triangle inequality.
+
+For a landmark L with exact distances d(L, .), every cell n and goal t
+satisfy d(n, t) >= |d(L, t) - d(L, n)|, because moves cost the same in
+both directions. Taking the largest of these bounds over a few
+landmarks (and the octile distance) gives a consistent heuristic that,
+unlike the octile distance, knows about walls.
+
+Landmarks are picked by farthest-point selection: each new landmark is
+the free cell farthest from the ones already chosen, so they end up on
+the edges of the map, where the bounds are tightest. Landmarks are only
+picked in the largest connected component; elsewhere the heuristic is
+the octile distance.
+
+Distances are stored exactly, as (straight, diagonal) step counts in a
+16-bit array (4 bytes per cell and landmark), and the heuristic returns
+step counts too, so the searches keep their exact keys. The tables can
+be cached on disk keyed by Grid.digest().
+"""
+
+import math
+import os
+from array import array
+from collections import Counter
+
+from components import ComponentIndex
+from distance_field import UNREACHED, distance_field
+from grid import as_grid
+from table_io import HEADER, cache_path, read_table, write_table
+
+
+MAGIC = b"LMRK"
+FORMAT_VERSION = 1
+
+# Stored in place of the straight count for unreachable cells
+NO_DISTANCE = 0xFFFF
+
+
+class Landmarks:
+    """
+    Landmark distances for one grid: distances[(index * count + k) * 2]
+    and the item after it are the straight and diagonal steps from
+    landmark k to padded Grid index (straight NO_DISTANCE if unreachable).
+    """
+
+    def __init__(self, height, width, digest, count, distances):
+        self.height = height
+        self.width = width
+        self.stride = width + 2
+        self.digest = digest
+        self.count = count
+        self.distances = distances
+
+    def steps(self, k, y, x):
+        """
+        (straight, diagonal) steps from landmark k to (y, x), or None if
+        the cell cannot be reached from it.
+        """
+        i = ((y + 1) * self.stride + x + 1) * self.count + k
+        if self.distances[i * 2] == NO_DISTANCE:
+            return None
+        return (self.distances[i * 2], self.distances[i * 2 + 1])
+
+    def heuristic(self, goal):
+        """
+        ALT heuristic towards goal.
+
+        Returns:
+        function: h(index) -> (straight, diagonal) steps of a lower bound
+        on the cost from padded Grid index to goal; at least the octile
+        distance.
+        """
+        distances = self.distances
+        count = self.count
+        stride = self.stride
+        sqrt2 = math.sqrt(2)
+        gy, gx = goal
+
+        base = ((gy + 1) * stride + gx + 1) * count * 2
+        targets = [
+            (k * 2, distances[base + k * 2], distances[base + k * 2 + 1])
+            for k in range(count)
+            if distances[base + k * 2] != NO_DISTANCE
+        ]
+
+        def h(index):
+            y, x = divmod(index, stride)
+            dy = abs(y - 1 - gy)
+            dx = abs(x - 1 - gx)
+            if dy > dx:
+                best_a, best_b = dy - dx, dx
+            else:
+                best_a, best_b = dx - dy, dy
+            best = best_a + best_b * sqrt2
+
+            i = index * count * 2
+            for k, ta, tb in targets:
+                a = distances[i + k]
+                if a == NO_DISTANCE:
+                    continue
+                a = ta - a
+                b = tb - distances[i + k + 1]
+                value = a + b * sqrt2
+                if value < 0:
+                    value, a, b = -value, -a, -b
+                if value > best:
+                    best, best_a, best_b = value, a, b
+            return best_a, best_b
+
+        return h
+
+
+def build_landmarks(grid, count=8, sources=None):
+    """
+    Pick landmarks and compute their distance tables.
+
+    Parameters:
+    count (int): Number of landmarks, picked by farthest-point selection.
+    sources (list of tuple, optional): Use these free cells as the
+    landmarks instead (count is then ignored).
+
+    Returns:
+    Landmarks: Distances for the grid's current contents.
+    """
+    grid = as_grid(grid)
+    cells = grid.cells
+    size = len(cells)
+    free = [i for i in range(grid.stride, size - grid.stride) if not cells[i]]
+    if sources is not None:
+        for source in sources:
+            if not grid.passable(*source):
+                raise ValueError(f"landmark {source} is not a free cell")
+        count = len(sources)
+    if count < 1:
+        raise ValueError("at least one landmark is needed")
+
+    fields = []
+    if sources is not None:
+        fields = [distance_field(source, grid) for source in sources]
+    elif free:
+        sqrt2 = math.sqrt(2)
+        # Start from the largest component; the first landmark is the
+        # cell farthest from an arbitrary cell of it
+        components = ComponentIndex(grid)
+        sizes = Counter(components.find(components.labels[i]) for i in free)
+        root = sizes.most_common(1)[0][0]
+        seed = next(i for i in free if components.find(components.labels[i]) == root)
+        field = distance_field(grid.coords(seed), grid)
+        # Distance of each cell of that component to the nearest landmark
+        nearest = {}
+        while True:
+            for i in free:
+                if field.straight[i] != UNREACHED:
+                    d = field.straight[i] + field.diagonal[i] * sqrt2
+                    if d < nearest.get(i, math.inf):
+                        nearest[i] = d
+            if len(fields) == count:
+                break
+            far = max(nearest, key=nearest.__getitem__)
+            if nearest[far] == 0:
+                break
+            field = distance_field(grid.coords(far), grid)
+            fields.append(field)
+    count = len(fields)
+
+    if any(max(f.straight) >= NO_DISTANCE or max(f.diagonal) >= NO_DISTANCE for f in fields):
+        raise ValueError("map too large for 16-bit landmark distances")
+
+    distances = array("H", [NO_DISTANCE, 0]) * (size * count)
+    for k, field in enumerate(fields):
+        straight = field.straight
+        diagonal = field.diagonal
+        for i in free:
+            if straight[i] != UNREACHED:
+                j = (i * count + k) * 2
+                distances[j] = straight[i]
+                distances[j + 1] = diagonal[i]
+
+    return Landmarks(grid.height, grid.width, grid.digest(), count, distances)
+
+
+def save_landmarks(landmarks, path):
+    """
+    Write landmark distances to a versioned binary file.
+    """
+    write_table(path, MAGIC, FORMAT_VERSION, landmarks.height, landmarks.width,
+                landmarks.digest, landmarks.distances)
+
+
+def load_landmarks(path):
+    """
+    Read landmark distances written by save_landmarks(). The number of
+    landmarks follows from the file size.
+
+    Raises:
+    ValueError: If the file is not a landmark table of the current format.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        payload = os.fstat(f.fileno()).st_size - HEADER.size
+    if len(header) != HEADER.size:
+        raise ValueError(f"{path}: truncated header")
+    _, _, typecode, height, width, _ = HEADER.unpack(header)
+    per_landmark = (height + 2) * (width + 2) * 2 * array(typecode.decode()).itemsize
+    if payload % per_landmark:
+        raise ValueError(f"{path}: truncated table")
+
+    count = payload // per_landmark
+    height, width, digest, distances = read_table(path, MAGIC, FORMAT_VERSION, count * 2)
+    return Landmarks(height, width, digest, count, distances)
+
+
+def load_or_build(grid, count=8, cache_dir=None):
+    """
+    Return the landmarks of a grid, reading them from cache_dir if they
+    were already computed for the same map and count, and building (and
+    saving) them otherwise.
+    """
+    grid = as_grid(grid)
+    if cache_dir is None:
+        return build_landmarks(grid, count)
+
+    digest = grid.digest()
+    path = cache_path(cache_dir, digest, f".lm{count}")
+    if os.path.exists(path):
+        try:
+            landmarks = load_landmarks(path)
+            if landmarks.digest == digest:
+                return landmarks
+        except ValueError:
+            pass
+
+    landmarks = build_landmarks(grid, count)
+    os.makedirs(cache_dir, exist_ok=True)
+    save_landmarks(landmarks, path)
+    return landmarks
@@ -1,27 +1,55 @@
+"""
+A* vs JPS pathfinder.
+
+Without arguments the program runs interactively. With a map file it
+runs in batch mode instead and streams one JSON or CSV line per query:
+
+    python src/main.py --map tests/Berlin_1_256.map --queries queries.txt
+    echo "0 0 255 255" | python src/main.py --map tests/Berlin_1_256.map --format csv
+
+A query file has one "start_y start_x goal_y goal_x" line per query
+(commas work too); blank lines and lines starting with '#' are skipped.
+A MovingAI .scen file can be given instead.
+"""
+
+import argparse
+import contextlib
+import csv
+import json
+import sys
 import time
 from a_star import find_path as a_star_path
 from jps import find_path as jps_path
+from grid import Grid, as_grid
+from map_io import load_map
+from movement import MOVEMENTS
+from render import render_text, window
+from search_context import SearchContext
+
+ALGORITHMS = ("astar", "jps", "jps_plus")
+# Larger grids are printed only around the path, PRINT_RADIUS cells wide
+PRINT_LIMIT = 80
+PRINT_RADIUS = 10
+CSV_FIELDS = ["query", "start_y", "start_x", "goal_y", "goal_x", "cost", "cells", "time_ms",
+              "path", "error"]
 
-def print_grid(grid, path=None):
+def print_grid(grid, path=None, file=None):
     """
     Print the grid to the terminal, optionally highlighting a path.
+    Grids larger than PRINT_LIMIT cells across are cropped to the part
+    around the path.
 
     Parameters:
-    grid (list of list of int): 2D grid (0 = walkable, 1 = wall)
+    grid (Grid or list of list of int): 2D grid (0 = walkable, 1 = wall)
     path (list of tuple, optional): List of coordinates representing the path
+    file (file object, optional): Where to print (default: stdout)
     """
-    path_set = set(path) if path else set()
-    for y, row in enumerate(grid):
-        row_str = ""
-        for x, cell in enumerate(row):
-            if (y, x) in path_set:
-                row_str += "• "
-            elif cell == 1:
-                row_str += "█ "
-            else:
-                row_str += ". "
-        print(row_str)
-    print()
+    grid = as_grid(grid)
+    view = None
+    if path and max(grid.height, grid.width) > PRINT_LIMIT:
+        view = window(grid, path, radius=PRINT_RADIUS)
+    text = render_text(grid, [(path or (), "• ")], view=view, free=". ", wall="█ ")
+    print(text, file=file)
 
 def get_user_point(prompt, max_y, max_x, grid):
     """
@@ -63,9 +91,14 @@ def get_user_grid():
         if row.strip() == "":
             break
         try:
-            grid.append([int(ch) for ch in row.split()])
+            cells = [int(ch) for ch in row.split()]
         except ValueError:
             print("Invalid input. Use only 0 and 1 separated by spaces.")
+            continue
+        if grid and len(cells) != len(grid[0]):
+            print(f"Invalid input. Every row must have {len(grid[0])} cells.")
+            continue
+        grid.append(cells)
     return grid
 
 def print_path_info(name, path, elapsed_time, grid):
@@ -74,14 +107,14 @@ def print_path_info(name, path, elapsed_time, grid):
 
     Parameters:
     name (str): Algorithm name ('A*' or 'JPS')
-    path (list of tuple): Path found by the algorithm
+    path (PathResult): Path found by the algorithm
     elapsed_time (float): Time taken to compute the path
     grid (list of list of int): Grid for displaying the path
     """
     print(f"{name} Path:")
     if path:
         print_grid(grid, path)
-        print(f"Steps: {len(path)} | Time: {elapsed_time:.6f}s\n")
+        print(f"Steps: {len(path)} | Cost: {path.cost:.3f} | Time: {elapsed_time:.6f}s\n")
     else:
         print_grid(grid)
         print("No path found!\n")
@@ -113,7 +146,8 @@ def main():
     else:
         grid = get_user_grid()
 
-    max_y, max_x = len(grid), len(grid[0])
+    grid = Grid.from_rows(grid)
+    max_y, max_x = grid.height, grid.width
     print("\nGrid layout:")
     print_grid(grid)
 
@@ -136,5 +170,160 @@ def main():
     print_path_info("A*", a_path, a_time, grid)
     print_path_info("JPS", j_path, j_time, grid)
 
+def parse_queries(lines):
+    """
+    Read queries from lines of "start_y start_x goal_y goal_x".
+
+    Yields:
+    tuple: (line number, start, goal, error). start and goal are None
+    and error says why when a line cannot be read.
+    """
+    for n, line in enumerate(lines, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            sy, sx, gy, gx = (int(v) for v in line.replace(",", " ").split())
+        except ValueError:
+            yield n, None, None, f"line {n}: expected four integers"
+            continue
+        yield n, (sy, sx), (gy, gx), None
+
+
+def _solver(algorithm, grid, movement, cache_dir):
+    """
+    Return a function (start, goal) -> PathResult for one algorithm.
+    """
+    context = SearchContext(grid)
+    if algorithm == "astar":
+        return lambda start, goal: a_star_path(start, goal, grid, context=context, movement=movement)
+    if algorithm == "jps":
+        return lambda start, goal: jps_path(start, goal, grid, context=context, movement=movement)
+    if movement != "corner_cutting":
+        raise ValueError("jps_plus only supports corner-cutting movement")
+    import jps_plus
+    table = jps_plus.load_or_build(grid, cache_dir)
+    return lambda start, goal: jps_plus.find_path(start, goal, grid, table)
+
+
+def run_batch(grid, queries, find_path, out, fmt="json", expand=False, render=None):
+    """
+    Solve queries one by one and write one result line per query as soon
+    as it is solved.
+
+    Parameters:
+    queries (iterable): (line number, start, goal, error) as from parse_queries().
+    find_path (function): (start, goal) -> PathResult or None.
+    out (file object): Text stream for the results.
+    fmt (str): "json" (one object per line) or "csv".
+    expand (bool): Write every cell of a path instead of its waypoints.
+    render (file object, optional): Also draw each path on the map here.
+
+    Returns:
+    int: Number of queries that could not be run.
+    """
+    writer = None
+    if fmt == "csv":
+        writer = csv.DictWriter(out, CSV_FIELDS, lineterminator="\n")
+        writer.writeheader()
+
+    errors = 0
+    for i, (_, start, goal, error) in enumerate(queries):
+        if error is None:
+            for name, point in (("start", start), ("goal", goal)):
+                if not grid.in_bounds(*point):
+                    error = f"{name} {point} is outside the map"
+                    break
+
+        path = None
+        elapsed = 0.0
+        if error is None:
+            t0 = time.perf_counter()
+            path = find_path(start, goal)
+            elapsed = time.perf_counter() - t0
+        else:
+            errors += 1
+
+        cells = None
+        if path is not None:
+            cells = [list(p) for p in (path if expand else path.points)]
+        record = {
+            "query": i,
+            "start": None if start is None else list(start),
+            "goal": None if goal is None else list(goal),
+            "cost": None if path is None else path.cost,
+            "cells": None if path is None else len(path),
+            "time_ms": elapsed * 1e3,
+            "path": cells,
+        }
+        if error is not None:
+            record["error"] = error
+
+        if writer is None:
+            out.write(json.dumps(record) + "\n")
+        else:
+            writer.writerow({
+                "query": i,
+                "start_y": "" if start is None else start[0],
+                "start_x": "" if start is None else start[1],
+                "goal_y": "" if goal is None else goal[0],
+                "goal_x": "" if goal is None else goal[1],
+                "cost": "" if path is None else f"{path.cost:.6f}",
+                "cells": "" if path is None else len(path),
+                "time_ms": f"{elapsed * 1e3:.3f}",
+                "path": "" if cells is None else ";".join(f"{y} {x}" for y, x in cells),
+                "error": error or "",
+            })
+        out.flush()
+
+        if render is not None and path is not None:
+            print(f"query {i}: {start} -> {goal}, cost {path.cost:.3f}", file=render)
+            print_grid(grid, list(path), file=render)
+    return errors
+
+
+def batch_main(argv=None):
+    """
+    Batch mode: solve every query of a file (or stdin) on one map.
+    """
+    parser = argparse.ArgumentParser(description="Solve path queries on a map.")
+    parser.add_argument("--map", required=True, help="MovingAI .map file or compiled map")
+    parser.add_argument("--queries", default="-",
+                        help="query file or .scen file (default: stdin)")
+    parser.add_argument("--algorithm", choices=ALGORITHMS, default="jps")
+    parser.add_argument("--movement", choices=MOVEMENTS, default="corner_cutting")
+    parser.add_argument("--format", choices=("json", "csv"), default="json")
+    parser.add_argument("--out", default=None, help="output file (default: stdout)")
+    parser.add_argument("--expand", action="store_true",
+                        help="write every cell of a path, not just its waypoints")
+    parser.add_argument("--render", action="store_true", help="draw every path on stderr")
+    parser.add_argument("--cache-dir", default=None, help="JPS+ table cache directory")
+    args = parser.parse_args(argv)
+
+    grid = load_map(args.map)
+    try:
+        find_path = _solver(args.algorithm, grid, args.movement, args.cache_dir)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with contextlib.ExitStack() as stack:
+        if args.queries.endswith(".scen"):
+            import scenarios
+            queries = [(None, s.start, s.goal, None) for s in scenarios.parse_scen(args.queries)]
+        elif args.queries == "-":
+            queries = parse_queries(sys.stdin)
+        else:
+            queries = parse_queries(stack.enter_context(open(args.queries)))
+
+        out = sys.stdout
+        if args.out:
+            out = stack.enter_context(open(args.out, "w", newline=""))
+        errors = run_batch(grid, queries, find_path, out, args.format, args.expand,
+                           sys.stderr if args.render else None)
+    return 1 if errors else 0
+
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(batch_main())
     main()
@@ -0,0 +1,191 @@
+"""
+Reading MovingAI .map files and compiled binary maps.
+
+A MovingAI map is a small text header followed by one line per row:
+
+    type octile
+    height 256
+    width 256
+    map
+    ..@@T...
+
+parse_movingai() checks the header against the rows and keeps the terrain
+characters. Following the MovingAI conventions, '.', 'G' and 'S' are
+walkable; '@', 'O', 'T' and 'W' are walls for our searches.
+
+compile_map() stores a map in the table_io file format, with the padded
+Grid cell array as the table (one byte per cell) and the terrain
+characters appended after it. open_compiled() maps such a file with mmap
+and returns a Grid that uses the mapped bytes directly as its cells, so
+loading costs neither parsing nor copying.
+"""
+
+import mmap
+import os
+from array import array
+from collections import namedtuple
+
+from grid import Grid
+from table_io import HEADER, read_table, write_table
+
+
+MAGIC = b"GMAP"
+FORMAT_VERSION = 1
+
+TERRAIN = b".GS@OTW"
+WALKABLE = b".GS"
+
+# Terrain character -> Grid cell value
+_TO_CELLS = bytes(0 if bytes([c]) in WALKABLE else 1 for c in range(256))
+
+MovingAIMap = namedtuple("MovingAIMap", "type height width terrain")
+MovingAIMap.__doc__ = """
+Parsed .map file. terrain holds the height * width terrain characters,
+row by row, without line breaks.
+"""
+
+
+def parse_movingai(path):
+    """
+    Read and validate a MovingAI .map file.
+
+    Returns:
+    MovingAIMap: Header fields and terrain.
+
+    Raises:
+    ValueError: If the header is malformed or does not match the rows.
+    """
+    with open(path, "rb") as f:
+        lines = f.read().splitlines()
+
+    header = {}
+    for n, key in enumerate((b"type", b"height", b"width")):
+        fields = lines[n].split() if n < len(lines) else []
+        if len(fields) != 2 or fields[0] != key:
+            raise ValueError(f"{path}:{n + 1}: expected '{key.decode()} <value>'")
+        header[key] = fields[1]
+    if len(lines) < 4 or lines[3].strip() != b"map":
+        raise ValueError(f"{path}:4: expected 'map'")
+
+    try:
+        height = int(header[b"height"])
+        width = int(header[b"width"])
+    except ValueError as e:
+        raise ValueError(f"{path}: height and width must be integers") from e
+
+    rows = lines[4:]
+    while rows and not rows[-1].strip():
+        rows.pop()
+    if len(rows) != height:
+        raise ValueError(f"{path}: header says height {height}, found {len(rows)} rows")
+    for y, row in enumerate(rows):
+        if len(row) != width:
+            raise ValueError(f"{path}:{y + 5}: row has length {len(row)}, expected {width}")
+        bad = row.translate(None, TERRAIN)
+        if bad:
+            raise ValueError(f"{path}:{y + 5}: unknown terrain {bad[:1].decode('latin-1')!r}")
+
+    return MovingAIMap(header[b"type"].decode(), height, width, b"".join(rows))
+
+
+def to_grid(terrain_map):
+    """
+    Grid of a parsed map (walkable terrain = 0, everything else = wall).
+    """
+    height, width = terrain_map.height, terrain_map.width
+    grid = Grid(height, width)
+    cells = grid.cells
+    terrain = terrain_map.terrain.translate(_TO_CELLS)
+    for y in range(height):
+        start = grid.index(y, 0)
+        cells[start:start + width] = terrain[y * width:(y + 1) * width]
+    return grid
+
+
+def load_movingai(path):
+    """
+    Read a MovingAI .map file straight into a Grid.
+    """
+    return to_grid(parse_movingai(path))
+
+
+def load_map(path):
+    """
+    Load a MovingAI .map file or a compiled map, whichever path holds.
+    """
+    with open(path, "rb") as f:
+        compiled = f.read(len(MAGIC)) == MAGIC
+    if compiled:
+        return open_compiled(path)
+    return load_movingai(path)
+
+
+def compile_map(path, out_path):
+    """
+    Compile a MovingAI .map file into the binary format read by
+    open_compiled().
+
+    Returns:
+    Grid: The compiled map.
+    """
+    terrain_map = parse_movingai(path)
+    grid = to_grid(terrain_map)
+    save_compiled(grid, out_path, terrain_map.terrain)
+    return grid
+
+
+def save_compiled(grid, path, terrain=None):
+    """
+    Write a Grid in the compiled format. Without terrain, walkable cells
+    are stored as '.' and walls as '@'.
+    """
+    if terrain is None:
+        terrain = b"".join(bytes(row) for row in grid).translate(bytes.maketrans(b"\0\1", b".@"))
+    write_table(path, MAGIC, FORMAT_VERSION, grid.height, grid.width,
+                grid.digest(), array("B", grid.cells))
+    with open(path, "ab") as f:
+        f.write(terrain)
+
+
+def _check_header(path, data):
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path}: truncated header")
+    magic, version, typecode, height, width, _ = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION or typecode != b"B":
+        raise ValueError(f"{path}: not a version {FORMAT_VERSION} {MAGIC.decode()} map")
+    size = (height + 2) * (width + 2)
+    if len(data) < HEADER.size + size + height * width:
+        raise ValueError(f"{path}: truncated map")
+    return height, width, size
+
+
+def open_compiled(path):
+    """
+    Memory-map a compiled map as a Grid without copying the cells.
+
+    The mapping is copy-on-write: Grid.set_cell() works, but edits only
+    change the in-memory map, never the file.
+
+    Raises:
+    ValueError: If the file is not a compiled map.
+    """
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path}: truncated header")
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    height, width, size = _check_header(path, data)
+    return Grid(height, width, memoryview(data)[HEADER.size:HEADER.size + size])
+
+
+def read_terrain(path):
+    """
+    Terrain characters stored in a compiled map (see MovingAIMap.terrain).
+    """
+    height, width, _, cells = read_table(path, MAGIC, FORMAT_VERSION, 1)
+    with open(path, "rb") as f:
+        f.seek(HEADER.size + len(cells))
+        terrain = f.read(height * width)
+    if len(terrain) != height * width:
+        raise ValueError(f"{path}: truncated map")
+    return terrain
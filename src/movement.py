@@ -0,0 +1,295 @@
+"""
+Per-cell neighbour masks and movement rules.
+
+Every cell gets an 8-bit mask of its free neighbours (bit d set when the
+neighbour in DIRECTIONS[d] is free). A movement rule turns that mask into
+the moves a search may make, and JPS looks up its pruned neighbours and
+forced-neighbour tests in tables indexed by the mask and the direction
+of travel, so neither search probes single cells any more.
+
+Rules:
+"corner_cutting": all 8 moves to free cells, even past blocked corners
+"no_corner_cutting": diagonal moves only when both cells beside them are free
+"four_connected": straight moves only
+
+A* and JPS use the same tables, so for every rule they find paths of the
+same cost.
+"""
+
+import functools
+
+from grid import Grid, as_grid
+
+
+# Bit d of a mask stands for DIRECTIONS[d]
+DIRECTIONS = [
+    (-1,0), (1,0), (0,-1), (0,1),
+    (-1,-1), (-1,1), (1,-1), (1,1)
+]
+DIRECTION_INDEX = {direction: d for d, direction in enumerate(DIRECTIONS)}
+
+MOVEMENTS = ("corner_cutting", "no_corner_cutting", "four_connected")
+
+# Travel direction used for the start node, which has no parent
+START = len(DIRECTIONS)
+
+
+def check_movement(movement):
+    """
+    Raise ValueError unless movement is one of MOVEMENTS.
+    """
+    if movement not in MOVEMENTS:
+        raise ValueError(f"unknown movement {movement!r}, expected one of {MOVEMENTS}")
+
+
+def _bit(dy, dx):
+    return 1 << DIRECTION_INDEX[(dy, dx)]
+
+
+def _build_masks(grid):
+    # One shifted copy of the free cells per direction; each contributes
+    # its own bit to every byte, so adding them as big ints never carries
+    free = bytes(grid.cells).translate(bytes.maketrans(b"\0\1", b"\1\0"))
+    size = len(free)
+    total = 0
+    for d, (dy, dx) in enumerate(DIRECTIONS):
+        offset = dy * grid.stride + dx
+        if offset > 0:
+            shifted = free[offset:] + bytes(offset)
+        else:
+            shifted = bytes(-offset) + free[:offset]
+        total += int.from_bytes(shifted, "little") << d
+    return bytearray(total.to_bytes(size, "little"))
+
+
+def neighbour_masks(grid):
+    """
+    Free-neighbour mask of every cell, indexed by padded Grid index.
+    Cached on the grid and rebuilt after edits.
+    """
+    return as_grid(grid).derived("neighbour_masks", _build_masks)
+
+
+def _allowed(movement, mask):
+    if movement == "corner_cutting":
+        return mask
+    if movement == "four_connected":
+        return mask & 0b1111
+    allowed = mask & 0b1111
+    for dy, dx in DIRECTIONS[4:]:
+        if mask & _bit(dy, dx) and mask & _bit(dy, 0) and mask & _bit(0, dx):
+            allowed |= _bit(dy, dx)
+    return allowed
+
+
+def _pruned(movement, d, mask):
+    """
+    Directions to search from a cell with free-neighbour mask, entered
+    by travelling in DIRECTIONS[d] (d = START for the start node).
+    """
+    allowed = _allowed(movement, mask)
+
+    def free(dy, dx):
+        return mask & _bit(dy, dx)
+
+    if d == START:
+        return tuple(e for e in range(len(DIRECTIONS)) if allowed >> e & 1)
+
+    dy, dx = DIRECTIONS[d]
+    directions = []
+    if movement == "corner_cutting":
+        if dy != 0 and dx != 0:
+            directions += [(dy, dx), (dy, 0), (0, dx)]
+            if not free(-dy, 0) and free(-dy, dx):
+                directions.append((-dy, dx))
+            if not free(0, -dx) and free(dy, -dx):
+                directions.append((dy, -dx))
+        elif dx != 0:
+            directions.append((0, dx))
+            if not free(1, 0) and free(1, dx):
+                directions.append((1, dx))
+            if not free(-1, 0) and free(-1, dx):
+                directions.append((-1, dx))
+        else:
+            directions.append((dy, 0))
+            if not free(0, 1) and free(dy, 1):
+                directions.append((dy, 1))
+            if not free(0, -1) and free(dy, -1):
+                directions.append((dy, -1))
+
+    elif movement == "no_corner_cutting":
+        # A diagonal move cannot pass a wall, so diagonal travel has no
+        # forced neighbours
+        if dy != 0 and dx != 0:
+            directions += [(dy, dx), (dy, 0), (0, dx)]
+        else:
+            directions.append((dy, dx))
+            for sy, sx in ((dx, dy), (-dx, -dy)):
+                if free(sy, sx) and not free(sy - dy, sx - dx):
+                    directions += [(sy, sx), (sy + dy, sx + dx)]
+
+    else:
+        # Straight travel turns either way at every jump point
+        directions += [(dy, dx), (dx, dy), (-dx, -dy)]
+
+    return tuple(DIRECTION_INDEX[e] for e in directions if allowed & _bit(*e))
+
+
+def _forced(movement, d, mask):
+    """
+    True if a cell with free-neighbour mask, entered by travelling in
+    DIRECTIONS[d], has a forced neighbour (and so is a jump point).
+    """
+    def free(dy, dx):
+        return mask & _bit(dy, dx)
+
+    dy, dx = DIRECTIONS[d]
+    if movement == "corner_cutting":
+        if dy != 0 and dx != 0:
+            return bool((not free(-dy, 0) and free(-dy, dx)) or
+                        (not free(0, -dx) and free(dy, -dx)))
+        return any(not free(sy, sx) and free(sy + dy, sx + dx)
+                   for sy, sx in ((dx, dy), (-dx, -dy)))
+
+    if dy != 0 and dx != 0:
+        return False
+    return any(free(sy, sx) and not free(sy - dy, sx - dx)
+               for sy, sx in ((dx, dy), (-dx, -dy)))
+
+
+def _subjumps(movement, d):
+    """
+    Straight directions JPS scans from every cell of a jump in DIRECTIONS[d].
+    """
+    dy, dx = DIRECTIONS[d]
+    if dy != 0 and dx != 0:
+        return (DIRECTION_INDEX[(dy, 0)], DIRECTION_INDEX[(0, dx)])
+    if movement == "four_connected" and dy != 0:
+        return (DIRECTION_INDEX[(0, 1)], DIRECTION_INDEX[(0, -1)])
+    return ()
+
+
+@functools.lru_cache(maxsize=None)
+def allowed_table(movement):
+    """
+    bytes: allowed_table(movement)[mask] is the mask of allowed moves.
+    """
+    check_movement(movement)
+    return bytes(_allowed(movement, mask) for mask in range(256))
+
+
+@functools.lru_cache(maxsize=None)
+def pruned_table(movement):
+    """
+    pruned_table(movement)[d][mask] is the tuple of direction indices JPS
+    searches from a cell with free-neighbour mask, entered travelling in
+    DIRECTIONS[d] (d = START for the start node).
+    """
+    check_movement(movement)
+    return [[_pruned(movement, d, mask) for mask in range(256)]
+            for d in range(len(DIRECTIONS) + 1)]
+
+
+@functools.lru_cache(maxsize=None)
+def forced_table(movement):
+    """
+    forced_table(movement)[d][mask] is 1 if a cell with free-neighbour mask,
+    entered travelling in DIRECTIONS[d], has a forced neighbour.
+    """
+    check_movement(movement)
+    return [bytes(_forced(movement, d, mask) for mask in range(256))
+            for d in range(len(DIRECTIONS))]
+
+
+@functools.lru_cache(maxsize=None)
+def move_table(stride, movement):
+    """
+    move_table(stride, movement)[mask] is the tuple of allowed moves
+    (d, index offset, straight steps, diagonal steps) for A*.
+    """
+    moves = [
+        (d, dy * stride + dx, 0 if dy != 0 and dx != 0 else 1, 1 if dy != 0 and dx != 0 else 0)
+        for d, (dy, dx) in enumerate(DIRECTIONS)
+    ]
+    allowed = allowed_table(movement)
+    return [tuple(m for m in moves if allowed[mask] >> m[0] & 1) for mask in range(256)]
+
+
+def allows(grid, y, x, ny, nx, movement="corner_cutting"):
+    """
+    True if the rule allows one step from (y, x) to the neighbour (ny, nx).
+    A Grid is checked through its masks; a list grid is probed directly,
+    so it is not converted for a single move.
+    """
+    if (ny - y, nx - x) not in DIRECTION_INDEX:
+        return False
+    if isinstance(grid, Grid):
+        if not grid.in_bounds(y, x):
+            return False
+        mask = neighbour_masks(grid)[grid.index(y, x)]
+        return bool(allowed_table(movement)[mask] & _bit(ny - y, nx - x))
+
+    check_movement(movement)
+
+    def free(cy, cx):
+        return 0 <= cy < len(grid) and 0 <= cx < len(grid[0]) and grid[cy][cx] == 0
+
+    if not (0 <= y < len(grid) and 0 <= x < len(grid[0])) or not free(ny, nx):
+        return False
+    if ny == y or nx == x:
+        return True
+    if movement == "four_connected":
+        return False
+    return movement == "corner_cutting" or (free(ny, x) and free(y, nx))
+
+
+class StepJumper:
+    """
+    jump() for JPS under any movement rule, stepping one cell at a time
+    and testing each cell through the mask tables. find_path uses it for
+    the rules block_jump.BlockJumper (corner cutting only) does not cover.
+    """
+
+    def __init__(self, grid, movement):
+        check_movement(movement)
+        self.stride = grid.stride
+        self.masks = neighbour_masks(grid)
+        self.allowed = allowed_table(movement)
+        self.forced = forced_table(movement)
+        self.offsets = [dy * grid.stride + dx for dy, dx in DIRECTIONS]
+        self.subjumps = [_subjumps(movement, d) for d in range(len(DIRECTIONS))]
+
+    def _jump(self, i, d, goal_i, stats):
+        masks = self.masks
+        allowed = self.allowed
+        forced = self.forced[d]
+        subjumps = self.subjumps[d]
+        step = self.offsets[d]
+        bit = 1 << d
+
+        while True:
+            if not allowed[masks[i]] & bit:
+                return None
+            i += step
+            if stats is not None:
+                stats.cells_scanned += 1
+
+            if i == goal_i or forced[masks[i]]:
+                return i
+            for e in subjumps:
+                if self._jump(i, e, goal_i, stats) is not None:
+                    return i
+
+    def jump(self, y, x, dy, dx, goal, stats=None):
+        """
+        Same contract as jps.jump().
+        """
+        if stats is not None:
+            stats.jump_calls += 1
+        stride = self.stride
+        i = self._jump((y + 1) * stride + x + 1, DIRECTION_INDEX[(dy, dx)],
+                       (goal[0] + 1) * stride + goal[1] + 1, stats)
+        if i is None:
+            return None
+        y, x = divmod(i, stride)
+        return (y - 1, x - 1)
@@ -0,0 +1,146 @@
+"""
+LRU cache in front of a find_path function.
+
+    cached = PathCache(jps.find_path, maxsize=4096)
+    path = cached(start, goal, grid)
+
+Entries are tied to one Grid and its version counter: any Grid.set_cell()
+edit empties the cache on the next call. Search options (movement,
+tie_break, landmarks, ...) are part of the key, so queries with different
+options never share an entry. With subpaths=True a miss is
+also answered from any cached path that passes through both endpoints,
+since every part of a shortest path is itself a shortest path.
+"""
+
+from collections import OrderedDict, namedtuple
+
+from grid import Grid
+from path_result import PathResult
+
+
+CacheInfo = namedtuple("CacheInfo", "hits subpath_hits misses invalidations size maxsize")
+
+# Keyword arguments that do not change the returned path
+UNKEYED = ("context", "stats")
+
+
+class PathCache:
+    """
+    Parameters:
+    find_path (callable): Search function with the (start, goal, grid, ...)
+    signature of a_star.find_path and jps.find_path.
+    maxsize (int): Maximum number of cached queries.
+    subpaths (bool): Also serve queries whose endpoints lie on a cached path.
+    """
+
+    def __init__(self, find_path, maxsize=1024, subpaths=False):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.find_path = find_path
+        self.maxsize = maxsize
+        self.subpaths = subpaths
+
+        self.hits = 0
+        self.subpath_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._grid = None
+        self._version = None
+        self._entries = OrderedDict()
+        # cell -> {cache key: position of the cell in that cached path}
+        self._cells = {}
+
+    def __call__(self, start, goal, grid, **kwargs):
+        """
+        Return find_path(start, goal, grid, **kwargs), from the cache when
+        possible. Only Grid instances are cached: list grids have no
+        version counter, so their queries are always recomputed.
+        """
+        if not isinstance(grid, Grid):
+            self.misses += 1
+            return self.find_path(start, goal, grid, **kwargs)
+
+        if grid is not self._grid or grid.version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self.clear()
+            self._grid = grid
+            self._version = grid.version
+
+        options = tuple(sorted((k, v) for k, v in kwargs.items() if k not in UNKEYED))
+        key = (start, goal, options)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return _copy(self._entries[key])
+
+        if self.subpaths:
+            path = self._find_subpath(start, goal, options)
+            if path is not None:
+                self.subpath_hits += 1
+                return path
+
+        self.misses += 1
+        path = self.find_path(start, goal, grid, **kwargs)
+        self._store(key, path)
+        return _copy(path)
+
+    def _store(self, key, path):
+        self._entries[key] = path
+        if self.subpaths and path is not None:
+            for i, cell in enumerate(path):
+                self._cells.setdefault(cell, {})[key] = i
+
+        if len(self._entries) > self.maxsize:
+            old_key, old_path = self._entries.popitem(last=False)
+            if self.subpaths and old_path is not None:
+                for cell in old_path:
+                    positions = self._cells[cell]
+                    del positions[old_key]
+                    if not positions:
+                        del self._cells[cell]
+
+    def _find_subpath(self, start, goal, options):
+        on_start = self._cells.get(start)
+        on_goal = self._cells.get(goal)
+        if not on_start or not on_goal:
+            return None
+
+        for key, i in on_start.items():
+            j = on_goal.get(key)
+            if j is None or key[2] != options:
+                continue
+            self._entries.move_to_end(key)
+            path = self._entries[key]
+            if i <= j:
+                return path[i:j + 1]
+            part = path[j:i + 1]
+            if isinstance(part, PathResult):
+                return PathResult(part.points[::-1])
+            return part[::-1]
+        return None
+
+    def clear(self):
+        """
+        Drop all entries (statistics are kept).
+        """
+        self._entries.clear()
+        self._cells.clear()
+
+    def info(self):
+        """
+        Hit/miss statistics.
+
+        Returns:
+        CacheInfo: hits, subpath_hits, misses, invalidations, size, maxsize.
+        """
+        return CacheInfo(self.hits, self.subpath_hits, self.misses,
+                         self.invalidations, len(self._entries), self.maxsize)
+
+
+def _copy(path):
+    # PathResult is immutable and can be shared; lists are copied
+    if path is None or isinstance(path, PathResult):
+        return path
+    return list(path)
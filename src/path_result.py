@@ -0,0 +1,161 @@
+"""
+Paths stored as waypoints and expanded on demand.
+
+Searches return a PathResult instead of a list with one tuple per cell.
+It keeps only the waypoints (the jump points of JPS, the turning points
+of A*), which are joined by straight or diagonal lines. The cost is
+known without expanding anything, cells are generated while iterating,
+and indexing and slicing find the right segment by bisection.
+
+A PathResult compares equal to the list of its cells, so code written
+for list paths keeps working.
+"""
+
+import math
+from bisect import bisect_left, bisect_right
+from itertools import islice
+
+
+class PathResult:
+    """
+    Parameters:
+    points (list of tuple): Waypoints from start to goal. Consecutive
+    waypoints must lie on one straight or diagonal line.
+    """
+
+    __slots__ = ("points", "_offsets")
+
+    def __init__(self, points):
+        if not points:
+            raise ValueError("a path has at least one cell")
+        self.points = points
+        # _offsets[k] is the position of points[k] in the expanded path
+        offsets = [0]
+        for (y1, x1), (y2, x2) in zip(points, points[1:]):
+            offsets.append(offsets[-1] + max(abs(y2 - y1), abs(x2 - x1)))
+        self._offsets = offsets
+
+    @classmethod
+    def from_cells(cls, cells):
+        """
+        PathResult of a cell-by-cell path, keeping only its turning points.
+        """
+        cells = list(cells)
+        points = cells[:1]
+        for prev, cell, nxt in zip(cells, cells[1:], cells[2:]):
+            if (cell[0] - prev[0], cell[1] - prev[1]) != (nxt[0] - cell[0], nxt[1] - cell[1]):
+                points.append(cell)
+        if len(cells) > 1:
+            points.append(cells[-1])
+        return cls(points)
+
+    @property
+    def jump_points(self):
+        """
+        The waypoints (a copy).
+        """
+        return list(self.points)
+
+    @property
+    def steps(self):
+        """
+        (straight moves, diagonal moves) of the path.
+        """
+        straight = diagonal = 0
+        for (y1, x1), (y2, x2) in zip(self.points, self.points[1:]):
+            dy, dx = abs(y2 - y1), abs(x2 - x1)
+            diagonal += min(dy, dx)
+            straight += abs(dy - dx)
+        return straight, diagonal
+
+    @property
+    def cost(self):
+        """
+        Exact octile cost: straight + diagonal * sqrt(2).
+        """
+        straight, diagonal = self.steps
+        return straight + diagonal * math.sqrt(2)
+
+    @property
+    def start(self):
+        return self.points[0]
+
+    @property
+    def goal(self):
+        return self.points[-1]
+
+    def __len__(self):
+        return self._offsets[-1] + 1
+
+    def __iter__(self):
+        points = self.points
+        yield points[0]
+        for (y, x), (y2, x2) in zip(points, points[1:]):
+            sy = (y2 > y) - (y2 < y)
+            sx = (x2 > x) - (x2 < x)
+            while y != y2 or x != x2:
+                if y != y2:
+                    y += sy
+                if x != x2:
+                    x += sx
+                yield (y, x)
+
+    def _cell(self, i):
+        k = bisect_right(self._offsets, i) - 1
+        y, x = self.points[k]
+        if k + 1 == len(self.points):
+            return (y, x)
+        y2, x2 = self.points[k + 1]
+        d = i - self._offsets[k]
+        dy, dx = y2 - y, x2 - x
+        return (y + max(-d, min(d, dy)), x + max(-d, min(d, dx)))
+
+    def __getitem__(self, index):
+        """
+        path[i] is one cell. path[a:b] is a PathResult of that part of
+        the path; slices with a step other than 1 return a list.
+        """
+        n = len(self)
+        if isinstance(index, slice):
+            start, stop, step = index.indices(n)
+            if step != 1:
+                return [self._cell(i) for i in range(start, stop, step)]
+            if start >= stop:
+                return []
+            return self._sub(start, stop - 1)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("path index out of range")
+        return self._cell(index)
+
+    def _sub(self, first, last):
+        """
+        PathResult of the cells at positions first..last (inclusive).
+        """
+        offsets = self._offsets
+        inner = self.points[bisect_right(offsets, first):bisect_left(offsets, last)]
+        points = [self._cell(first)] + inner
+        if last > first:
+            points.append(self._cell(last))
+        return PathResult(points)
+
+    def __reversed__(self):
+        return iter(PathResult(self.points[::-1]))
+
+    def __eq__(self, other):
+        if isinstance(other, PathResult):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == tuple(b) for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        head = list(islice(self, 3))
+        more = ", ..." if len(self) > 3 else ""
+        return f"PathResult({', '.join(map(str, head))}{more}; {len(self)} cells, cost {self.cost:.4f})"
+
+    def __reduce__(self):
+        return (PathResult, (self.points,))
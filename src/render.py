@@ -0,0 +1,226 @@
+"""
+Text and image output of maps, paths and explored nodes.
+
+render_text() draws only a window of the map (see window()), one string
+per row built with join, and returns the whole picture as one string,
+so printing it is a single write. save_image() writes the whole map as a
+PPM or PNG file. The image is built with bytes operations instead of
+per-pixel Python code: a map row is one slice of Grid.cells, and
+bytes.translate() turns it into each colour channel. Only path and
+explored cells are set one by one. A 1024 x 1024 map takes well under a
+second.
+
+PNG files are written with zlib from the standard library, so no image
+package is needed.
+"""
+
+import argparse
+import struct
+import zlib
+
+from grid import as_grid
+
+
+# Colours of free cells, walls and explored (expanded) cells
+FREE_COLOUR = (255, 255, 255)
+WALL_COLOUR = (40, 40, 40)
+EXPLORED_COLOUR = (173, 216, 230)
+# Colours of the paths, in order
+PATH_COLOURS = [(220, 20, 60), (30, 144, 255), (34, 139, 34), (255, 140, 0)]
+
+
+def window(grid, cells, radius=20):
+    """
+    Part of the map around some cells.
+
+    Returns:
+    tuple: (min_y, max_y, min_x, max_x), half-open, covering every cell
+    plus radius on each side, clipped to the map. The whole map if cells
+    is empty.
+    """
+    grid = as_grid(grid)
+    ys = [y for y, _ in cells]
+    xs = [x for _, x in cells]
+    if not ys:
+        return (0, grid.height, 0, grid.width)
+    return (max(0, min(ys) - radius), min(grid.height, max(ys) + radius + 1),
+            max(0, min(xs) - radius), min(grid.width, max(xs) + radius + 1))
+
+
+def render_text(grid, paths=(), marks=None, view=None, free=".", wall="#", overlap=None):
+    """
+    Draw part of the map as text.
+
+    Parameters:
+    paths (list of tuple): (cells, glyph) pairs; every cell of a path is
+    drawn with its glyph, later paths on top of earlier ones.
+    marks (dict, optional): {(y, x): glyph}, drawn last (e.g. start and goal).
+    view (tuple, optional): (min_y, max_y, min_x, max_x) from window();
+    default the whole map.
+    free, wall (str): Glyphs of free cells and walls.
+    overlap (str, optional): Glyph of cells on more than one path.
+
+    Returns:
+    str: One line per row, each ending in a newline.
+    """
+    grid = as_grid(grid)
+    min_y, max_y, min_x, max_x = view or window(grid, ())
+    cells = grid.cells
+    stride = grid.stride
+    glyphs = (free, wall)
+    rows = [
+        [glyphs[c] for c in cells[(y + 1) * stride + min_x + 1:(y + 1) * stride + max_x + 1]]
+        for y in range(min_y, max_y)
+    ]
+
+    drawn = {}
+    for k, (path, glyph) in enumerate(paths):
+        for y, x in path:
+            if min_y <= y < max_y and min_x <= x < max_x:
+                if overlap is not None and drawn.get((y, x), k) != k:
+                    glyph_here = overlap
+                else:
+                    glyph_here = glyph
+                drawn[(y, x)] = k
+                rows[y - min_y][x - min_x] = glyph_here
+    for (y, x), glyph in (marks or {}).items():
+        if min_y <= y < max_y and min_x <= x < max_x:
+            rows[y - min_y][x - min_x] = glyph
+
+    return "".join("".join(row) + "\n" for row in rows)
+
+
+def render_image(grid, paths=(), explored=None, scale=1):
+    """
+    Draw the whole map as an RGB image.
+
+    Parameters:
+    paths (list): Paths (iterables of (y, x)), coloured with PATH_COLOURS.
+    explored (SearchContext or iterable of tuple, optional): Explored
+    cells; for a SearchContext, the nodes its last search closed.
+    scale (int): Pixels per cell along each side.
+
+    Returns:
+    tuple: (width, height, pixels), pixels being width * height * 3
+    bytes, row by row.
+    """
+    grid = as_grid(grid)
+    if scale < 1:
+        raise ValueError("scale must be at least 1")
+    height, width, stride = grid.height, grid.width, grid.stride
+
+    # One byte per cell: 0 free, 1 wall, 2 explored, 3 + k on path k
+    cells = grid.cells
+    classes = bytearray(b"".join(
+        cells[(y + 1) * stride + 1:(y + 2) * stride - 1] for y in range(height)
+    ))
+    if explored is not None:
+        if hasattr(explored, "closed"):
+            # Byte mask of the closed stamps, then visit only its set bytes
+            mask = bytes(map(explored.generation.__eq__, explored.closed))
+            i = mask.find(1)
+            while i != -1:
+                y, x = divmod(i, stride)
+                classes[(y - 1) * width + x - 1] = 2
+                i = mask.find(1, i + 1)
+        else:
+            for y, x in explored:
+                classes[y * width + x] = 2
+    for k, path in enumerate(paths):
+        value = 3 + k % len(PATH_COLOURS)
+        for y, x in path:
+            classes[y * width + x] = value
+
+    palette = [FREE_COLOUR, WALL_COLOUR, EXPLORED_COLOUR] + PATH_COLOURS
+    palette += [FREE_COLOUR] * (256 - len(palette))
+    if scale > 1:
+        classes = _scale(classes, width, height, scale)
+        width *= scale
+        height *= scale
+
+    pixels = bytearray(len(classes) * 3)
+    for channel in range(3):
+        table = bytes(colour[channel] for colour in palette)
+        pixels[channel::3] = classes.translate(table)
+    return width, height, pixels
+
+
+def _scale(classes, width, height, scale):
+    # Repeat every byte scale times along the row, then every row
+    wide = bytearray(len(classes) * scale)
+    for k in range(scale):
+        wide[k::scale] = classes
+    row = width * scale
+    return bytearray(b"".join(
+        wide[y * row:(y + 1) * row] * scale for y in range(height)
+    ))
+
+
+def write_ppm(path, width, height, pixels):
+    """
+    Write RGB pixels as a binary PPM (P6) file.
+    """
+    with open(path, "wb") as f:
+        f.write(b"P6\n%d %d\n255\n" % (width, height))
+        f.write(pixels)
+
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png(path, width, height, pixels):
+    """
+    Write RGB pixels as a PNG file (8-bit RGB, no filtering).
+    """
+    row = width * 3
+    raw = b"".join(b"\0" + pixels[y * row:(y + 1) * row] for y in range(height))
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(_chunk(b"IDAT", zlib.compress(raw, 6)))
+        f.write(_chunk(b"IEND", b""))
+
+
+def save_image(path, grid, paths=(), explored=None, scale=1):
+    """
+    render_image() and write the result; PNG if path ends in .png, PPM
+    otherwise.
+    """
+    width, height, pixels = render_image(grid, paths, explored, scale)
+    if str(path).lower().endswith(".png"):
+        write_png(path, width, height, pixels)
+    else:
+        write_ppm(path, width, height, pixels)
+
+
+def main(argv=None):
+    """
+    Solve one query with A* and JPS and save an image of both paths and
+    the nodes JPS explored.
+    """
+    from a_star import find_path as a_star_path
+    from jps import find_path as jps_path
+    from map_io import load_map
+    from search_context import SearchContext
+
+    parser = argparse.ArgumentParser(description="Draw A* and JPS paths on a map.")
+    parser.add_argument("map", help="MovingAI .map file or compiled map")
+    parser.add_argument("start", type=int, nargs=2, metavar=("Y", "X"))
+    parser.add_argument("goal", type=int, nargs=2, metavar=("Y", "X"))
+    parser.add_argument("--out", default="path.png", help="output .png or .ppm file")
+    parser.add_argument("--scale", type=int, default=1, help="pixels per cell")
+    args = parser.parse_args(argv)
+
+    grid = load_map(args.map)
+    start, goal = tuple(args.start), tuple(args.goal)
+    path_a = a_star_path(start, goal, grid)
+    context = SearchContext(grid)
+    path_j = jps_path(start, goal, grid, context=context)
+    paths = [p for p in (path_a, path_j) if p is not None]
+    save_image(args.out, grid, paths, explored=context, scale=args.scale)
+    print(f"Wrote {args.out}" + ("" if paths else " (no path)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Benchmark runner for MovingAI .scen scenario files.
+
+    python src/scenarios.py tests/Berlin_1_256.map.scen --out results.csv
+
+Every scenario is run with each algorithm over a process pool. The cost
+of every path is checked against the optimal length in the file, and
+per-query time, search counters (see search_stats.py) and cost are
+written to CSV or JSON, followed by p50/p95/p99 latency per algorithm and
+group of BUCKET_GROUP buckets. --metrics also writes the summed counters
+per algorithm in the Prometheus text format.
+
+MovingAI's optimal lengths forbid cutting corners, so the searches run
+with movement="no_corner_cutting" (see movement.py) and every path must
+match the recorded optimum. Anything else ("shorter", "longer" or
+"unreachable") is a failure.
+
+tests/Berlin_1_256.map.scen is generated locally and holds only two
+queries per bucket, against ten in the official MovingAI file, which is
+why buckets are summarized in groups. Its latencies are not comparable
+with results published for the official scenarios.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import Pool
+
+import a_star
+import jps
+from map_io import load_movingai
+from search_context import SearchContext
+from search_stats import SearchStats, percentile, write_prometheus
+
+
+ALGORITHMS = ("astar", "jps")
+
+# The movement rule the optimal lengths in .scen files were computed for
+MOVEMENT = "no_corner_cutting"
+
+# Buckets summarized together, so that percentiles rest on more than a
+# handful of queries
+BUCKET_GROUP = 10
+
+# The optimal lengths in .scen files are printed with 8 decimals
+TOLERANCE = 1e-4
+
+Scenario = namedtuple("Scenario", "bucket map_path height width start goal optimal")
+
+FIELDS = ["algorithm", "bucket", "map", "start_y", "start_x", "goal_y", "goal_x",
+          "optimal", "cost", "status", "time_ms", "expansions", "pushes", "pops", "stale",
+          "jump_calls", "cells_scanned", "peak_open"]
+
+
+def parse_scen(path):
+    """
+    Read a version 1 .scen file. Map names are resolved relative to the
+    directory of the scenario file.
+
+    Returns:
+    list of Scenario: start and goal are (y, x).
+
+    Raises:
+    ValueError: If the file is not a version 1 scenario file.
+    """
+    base = os.path.dirname(path)
+    scenarios = []
+    with open(path) as f:
+        version = f.readline().split()
+        if version != ["version", "1"] and version != ["version", "1.0"]:
+            raise ValueError(f"{path}:1: expected 'version 1'")
+        for n, line in enumerate(f, start=2):
+            if not line.strip():
+                continue
+            fields = line.split("\t")
+            if len(fields) != 9:
+                raise ValueError(f"{path}:{n}: expected 9 tab-separated fields")
+            try:
+                bucket, width, height, sx, sy, gx, gy = (int(fields[i]) for i in (0, 2, 3, 4, 5, 6, 7))
+                optimal = float(fields[8])
+            except ValueError as e:
+                raise ValueError(f"{path}:{n}: {e}") from e
+            scenarios.append(Scenario(bucket, os.path.join(base, fields[1]), height, width,
+                                      (sy, sx), (gy, gx), optimal))
+    return scenarios
+
+
+def classify(cost, optimal):
+    """
+    Status of a result compared with the optimal length of its scenario.
+    Only "optimal" is a pass.
+    """
+    if cost is None:
+        return "unreachable"
+    if abs(cost - optimal) <= TOLERANCE:
+        return "optimal"
+    return "shorter" if cost < optimal else "longer"
+
+
+_maps = {}
+
+
+def _solver(algorithm, map_path):
+    """
+    Grid and SearchContext of a map, loaded once per process.
+    """
+    entry = _maps.get(map_path)
+    if entry is None:
+        grid = load_movingai(map_path)
+        entry = _maps[map_path] = (grid, SearchContext(grid))
+    grid, context = entry
+    find_path = a_star.find_path if algorithm == "astar" else jps.find_path
+    return grid, context, find_path
+
+
+def run_one(algorithm, scenario):
+    """
+    Run one scenario with one algorithm.
+
+    Returns:
+    dict: One result row (see FIELDS).
+    """
+    grid, context, find_path = _solver(algorithm, scenario.map_path)
+    if (grid.height, grid.width) != (scenario.height, scenario.width):
+        raise ValueError(f"{scenario.map_path}: scenario expects a "
+                         f"{scenario.height}x{scenario.width} map")
+
+    stats = SearchStats()
+    t0 = time.perf_counter()
+    path = find_path(scenario.start, scenario.goal, grid, context=context, stats=stats,
+                     movement=MOVEMENT)
+    elapsed = time.perf_counter() - t0
+
+    cost = path.cost if path is not None else None
+    return {
+        "algorithm": algorithm,
+        "bucket": scenario.bucket,
+        "map": os.path.basename(scenario.map_path),
+        "start_y": scenario.start[0],
+        "start_x": scenario.start[1],
+        "goal_y": scenario.goal[0],
+        "goal_x": scenario.goal[1],
+        "optimal": scenario.optimal,
+        "cost": cost,
+        "status": classify(cost, scenario.optimal),
+        "time_ms": elapsed * 1e3,
+        "expansions": stats.expanded,
+        "pushes": stats.pushes,
+        "pops": stats.pops,
+        "stale": stats.stale,
+        "jump_calls": stats.jump_calls,
+        "cells_scanned": stats.cells_scanned,
+        "peak_open": stats.peak_open,
+    }
+
+
+def _run_task(task):
+    return run_one(*task)
+
+
+def run_scenarios(scenarios, algorithms=ALGORITHMS, workers=None, chunksize=16):
+    """
+    Run every scenario with every algorithm.
+
+    Parameters:
+    scenarios (list of Scenario): Queries to run.
+    algorithms (sequence of str): Any of ALGORITHMS.
+    workers (int, optional): Number of processes (default: all cores);
+    1 runs everything in the calling process.
+
+    Returns:
+    list of dict: Result rows, grouped by algorithm in scenario order.
+    """
+    for algorithm in algorithms:
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+
+    tasks = [(algorithm, s) for algorithm in algorithms for s in scenarios]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [_run_task(task) for task in tasks]
+    with Pool(workers) as pool:
+        return pool.map(_run_task, tasks, chunksize)
+
+
+def summarize(rows):
+    """
+    Latency percentiles and result counts per algorithm and group of
+    BUCKET_GROUP consecutive buckets.
+
+    Returns:
+    list of dict: One summary row per algorithm and bucket group;
+    "buckets" is the range, e.g. "1-10".
+    """
+    groups = {}
+    for row in rows:
+        groups.setdefault((row["algorithm"], (row["bucket"] - 1) // BUCKET_GROUP), []).append(row)
+
+    summary = []
+    for (algorithm, group_index), group in sorted(groups.items()):
+        first = group_index * BUCKET_GROUP + 1
+        times = [row["time_ms"] for row in group]
+        statuses = [row["status"] for row in group]
+        summary.append({
+            "algorithm": algorithm,
+            "buckets": f"{first}-{first + BUCKET_GROUP - 1}",
+            "queries": len(group),
+            "p50_ms": percentile(times, 50),
+            "p95_ms": percentile(times, 95),
+            "p99_ms": percentile(times, 99),
+            "mean_expansions": sum(row["expansions"] for row in group) / len(group),
+            "optimal": statuses.count("optimal"),
+            "failures": len(group) - statuses.count("optimal"),
+        })
+    return summary
+
+
+def total_stats(rows):
+    """
+    SearchStats per algorithm, summed over result rows.
+
+    Returns:
+    dict: algorithm -> SearchStats.
+    """
+    totals = {}
+    for row in rows:
+        stats = SearchStats()
+        stats.queries = 1
+        stats.expanded = row["expansions"]
+        stats.pushes = row["pushes"]
+        stats.pops = row["pops"]
+        stats.stale = row["stale"]
+        stats.jump_calls = row["jump_calls"]
+        stats.cells_scanned = row["cells_scanned"]
+        stats.peak_open = row["peak_open"]
+        totals.setdefault(row["algorithm"], SearchStats()).merge(stats)
+    return totals
+
+
+def write_results(rows, summary, out):
+    """
+    Write result rows and the summary to a file object, as JSON if the
+    name ends in .json and as CSV otherwise. The CSV summary goes to a
+    second table after a blank line.
+    """
+    if getattr(out, "name", "").endswith(".json"):
+        json.dump({"results": rows, "summary": summary}, out, indent=1)
+        out.write("\n")
+        return
+
+    writer = csv.DictWriter(out, FIELDS, lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(rows)
+    if summary:
+        out.write("\n")
+        writer = csv.DictWriter(out, list(summary[0]), lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(summary)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run MovingAI .scen benchmarks.")
+    parser.add_argument("scen", nargs="+", help=".scen files")
+    parser.add_argument("--algorithm", action="append", choices=ALGORITHMS,
+                        help="algorithm to run (repeatable, default: all)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--out", default=None, help="output file, .csv or .json (default: CSV on stdout)")
+    parser.add_argument("--metrics", default=None, help="Prometheus text file for the summed counters")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for path in args.scen for s in parse_scen(path)]
+    rows = run_scenarios(scenarios, args.algorithm or ALGORITHMS, args.workers)
+    summary = summarize(rows)
+
+    if args.out:
+        with open(args.out, "w", newline="") as f:
+            write_results(rows, summary, f)
+    else:
+        write_results(rows, summary, sys.stdout)
+    if args.metrics:
+        write_prometheus(args.metrics, [({"algorithm": algorithm}, stats)
+                                        for algorithm, stats in total_stats(rows).items()])
+
+    failures = sum(row["failures"] for row in summary)
+    for row in summary:
+        print(f"{row['algorithm']:<6} buckets {row['buckets']:>7}: {row['queries']:>4} queries  "
+              f"p50 {row['p50_ms']:.3f} ms  p95 {row['p95_ms']:.3f} ms  "
+              f"p99 {row['p99_ms']:.3f} ms  failures {row['failures']}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
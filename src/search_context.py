@@ -0,0 +1,85 @@
+from array import array
+
+from grid import as_grid
+
+
+class SearchContext:
+    """
+    Reusable per-grid search state for a_star.find_path and jps.find_path.
+
+    g-cost, parent and closed flags live in flat arrays indexed by the
+    padded Grid index, allocated once. g-costs are kept exactly as
+    (g_straight, g_diagonal) step counts; g holds their exact_key(). Instead of clearing them between
+    queries, every query gets a new generation number: an entry only
+    counts if its stamp equals the current generation, so reset() is O(1).
+
+    A context must not be shared by two searches running at the same time.
+    """
+
+    def __init__(self, grid):
+        grid = as_grid(grid)
+        self.size = size = len(grid.cells)
+        self.g = array("d", [0.0]) * size
+        self.g_straight = array("i", [0]) * size
+        self.g_diagonal = array("i", [0]) * size
+        self.parent = array("i", [0]) * size
+        self.seen = array("I", [0]) * size
+        self.closed = array("I", [0]) * size
+        self.generation = 0
+
+    def reset(self):
+        """
+        Forget the previous query.
+
+        Returns:
+        int: The generation number to use for the new query.
+        """
+        self.generation += 1
+        if self.generation > 0xFFFFFFFF:
+            # Stamps would wrap around: clear them once and start over
+            self.seen = array("I", [0]) * self.size
+            self.closed = array("I", [0]) * self.size
+            self.generation = 1
+        return self.generation
+
+    def check(self, grid):
+        """
+        Raise ValueError if the context was created for a grid of another size.
+        """
+        if self.size != len(grid.cells):
+            raise ValueError("search context was created for a different grid size")
+
+    def path_to(self, grid, index):
+        """
+        Follow parent links from a padded index back to the query start.
+
+        Returns:
+        list of tuple: Coordinates from start to index.
+        """
+        parent = self.parent
+        path = [index]
+        while parent[index] != -1:
+            index = parent[index]
+            path.append(index)
+        return [grid.coords(i) for i in reversed(path)]
+
+    def waypoints_to(self, grid, index):
+        """
+        Like path_to(), but keeps only the start, the cells where the
+        direction changes, and index itself.
+
+        Returns:
+        list of tuple: Waypoints from start to index (see PathResult).
+        """
+        parent = self.parent
+        path = [index]
+        step = None
+        while parent[index] != -1:
+            previous = parent[index]
+            if previous - index != step:
+                step = previous - index
+            else:
+                path.pop()
+            path.append(previous)
+            index = previous
+        return [grid.coords(i) for i in reversed(path)]
@@ -0,0 +1,146 @@
+"""
+Optional counters filled in by the searches.
+
+    stats = SearchStats()
+    jps.find_path(start, goal, grid, stats=stats)
+    print(stats.expanded, stats.jump_calls, stats.cells_scanned)
+
+A SearchStats object keeps adding up over every query it is passed to,
+so one object can aggregate a long run. Searches called without stats
+skip all counting.
+
+write_prometheus() exports the counters in the Prometheus text format,
+e.g. for the node_exporter textfile collector. percentile() is the
+latency percentile shared by the scenario runner and the server.
+"""
+
+import math
+import os
+
+
+# name -> (metric suffix, metric type, help text)
+METRICS = {
+    "queries": ("queries_total", "counter", "Searches run."),
+    "expanded": ("expanded_total", "counter", "Nodes expanded."),
+    "pushes": ("heap_pushes_total", "counter", "Open list pushes."),
+    "pops": ("heap_pops_total", "counter", "Open list pops."),
+    "stale": ("stale_skipped_total", "counter", "Stale open list entries skipped."),
+    "jump_calls": ("jump_calls_total", "counter", "jump() calls (JPS only)."),
+    "cells_scanned": ("cells_scanned_total", "counter", "Grid cells scanned by jump() (JPS only)."),
+    "peak_open": ("open_list_peak", "gauge", "Largest open list size seen."),
+}
+
+
+class SearchStats:
+    """
+    Search counters: queries, expanded, pushes, pops, stale, jump_calls,
+    cells_scanned and peak_open (the largest open list of any query).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """
+        Set every counter back to zero.
+        """
+        for name in METRICS:
+            setattr(self, name, 0)
+
+    def start(self):
+        """
+        Called by a search before its first push.
+
+        Returns:
+        tuple: Token to pass to finish().
+        """
+        self.queries += 1
+        return (self.pushes, self.expanded)
+
+    def finish(self, token, open_size):
+        """
+        Called by a search when it returns. Pops and stale entries are
+        derived from the pushes, expansions and the final open list size
+        instead of being counted in the search loop.
+        """
+        pushes, expanded = token
+        pops = self.pushes - pushes - open_size
+        self.pops += pops
+        self.stale += pops - (self.expanded - expanded)
+
+    def merge(self, other):
+        """
+        Add the counters of another SearchStats into this one.
+        """
+        for name in METRICS:
+            if name == "peak_open":
+                self.peak_open = max(self.peak_open, other.peak_open)
+            else:
+                setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in METRICS}
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={value}" for name, value in self.as_dict().items())
+        return f"SearchStats({fields})"
+
+    def to_prometheus(self, labels=None, prefix="pathfinding"):
+        """
+        Prometheus text format of this object (see format_prometheus).
+        """
+        return format_prometheus([(labels or {}, self)], prefix)
+
+
+def percentile(values, q):
+    """
+    Nearest-rank percentile (q in 0-100) of a non-empty list.
+    """
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    parts = []
+    for key, value in sorted(labels.items()):
+        value = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def format_prometheus(series, prefix="pathfinding"):
+    """
+    Prometheus text exposition of several SearchStats.
+
+    Parameters:
+    series (iterable of (dict, SearchStats)): Label set and counters,
+    e.g. ({"algorithm": "jps"}, stats).
+    prefix (str): Metric name prefix.
+
+    Returns:
+    str: One HELP/TYPE block per metric, one sample per series.
+    """
+    series = list(series)
+    lines = []
+    for name, (suffix, kind, text) in METRICS.items():
+        metric = f"{prefix}_{suffix}"
+        lines.append(f"# HELP {metric} {text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for labels, stats in series:
+            lines.append(f"{metric}{_labels(labels)} {getattr(stats, name)}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, series, prefix="pathfinding"):
+    """
+    Write format_prometheus() output to path. The file is replaced
+    atomically, so a scraper never reads a half-written file.
+    """
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(format_prometheus(series, prefix))
+    os.replace(tmp, path)
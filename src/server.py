@@ -0,0 +1,534 @@
+"""
+Local pathfinding service.
+
+    python src/server.py --map berlin=tests/Berlin_1_256.map --port 8080
+    python src/server.py --map tests/Berlin_1_256.map --unix /tmp/paths.sock
+
+An asyncio HTTP/1.1 server with JSON bodies. Maps are loaded once at
+startup, in the server and in every worker process. Path requests go
+into a bounded queue. A batcher waits for a free worker, then takes
+every queued request (up to batch_size, after waiting batch_wait for
+more) and runs them as one job on a process pool. A slow query
+therefore never blocks the event loop, and small queries share the cost
+of the round trip to the pool.
+
+Endpoints:
+
+    POST /path     {"map": "berlin", "start": [y, x], "goal": [y, x],
+                    "algorithm": "jps", "deadline_ms": 250}
+    GET  /metrics  Prometheus text format
+    GET  /health
+
+A full queue is answered with 503 at once (backpressure). A request that
+is still queued, or whose answer has not arrived, when its deadline
+passes gets 504. Workers also skip queries whose deadline passed while
+their batch was waiting, but a search that has already started runs to
+the end.
+
+Everything runs locally; nothing but the standard library is used.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import a_star
+import jps
+from map_io import load_map
+from path_result import PathResult
+from search_context import SearchContext
+from search_stats import SearchStats, format_prometheus, percentile
+
+
+ALGORITHMS = ("astar", "jps")
+
+# Largest request body accepted, in bytes
+MAX_BODY = 1 << 16
+# Latencies kept for the quantiles on /metrics
+LATENCY_WINDOW = 4096
+QUANTILES = (0.5, 0.95, 0.99)
+
+REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    413: "Payload Too Large", 500: "Internal Server Error",
+    503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+class Overloaded(Exception):
+    """
+    The request queue is full.
+    """
+
+
+class DeadlineExceeded(Exception):
+    """
+    The request's deadline passed before its answer arrived.
+    """
+
+
+_worker = {}
+
+
+def _init_worker(map_paths):
+    _worker["maps"] = {}
+    for name, path in map_paths.items():
+        grid = load_map(path)
+        _worker["maps"][name] = (grid, SearchContext(grid))
+
+
+def _solve_batch(batch):
+    """
+    Run a batch of (map, algorithm, start, goal, deadline) queries, the
+    deadline being a time.time() value.
+
+    Returns:
+    list: Per query, None if its deadline had passed, otherwise
+    (waypoints or None, search seconds, SearchStats).
+    """
+    results = []
+    for name, algorithm, start, goal, deadline in batch:
+        if time.time() >= deadline:
+            results.append(None)
+            continue
+        grid, context = _worker["maps"][name]
+        find_path = jps.find_path if algorithm == "jps" else a_star.find_path
+        stats = SearchStats()
+        t0 = time.perf_counter()
+        path = find_path(start, goal, grid, context=context, stats=stats)
+        elapsed = time.perf_counter() - t0
+        results.append((None if path is None else path.points, elapsed, stats))
+    return results
+
+
+class PathService:
+    """
+    Request queue, batcher and worker pool behind the HTTP server.
+
+    Parameters:
+    maps (dict): Map name -> file path.
+    workers (int, optional): Worker processes (default: all cores). 0
+    runs the searches on one thread of the server process instead.
+    batch_size (int): Most queries sent to a worker at a time.
+    batch_wait (float): Seconds to wait for more queries before sending
+    a batch that is not full.
+    max_queue (int): Queued requests beyond which new ones get 503.
+    deadline (float): Deadline in seconds for requests without deadline_ms.
+    """
+
+    def __init__(self, maps, workers=None, batch_size=32, batch_wait=0.002,
+                 max_queue=1024, deadline=1.0):
+        self.map_paths = dict(maps)
+        self.grids = {name: load_map(path) for name, path in self.map_paths.items()}
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.deadline = deadline
+
+        self.queue = asyncio.Queue(max_queue)
+        # One batch in flight per worker, so requests wait in our queue
+        # (where deadlines and backpressure apply), not in the pool's
+        self.slots = asyncio.Semaphore(max(1, self.workers))
+        self.executor = None
+        self.batcher = None
+
+        self.responses = Counter()
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.latency_sum = 0.0
+        self.batches = 0
+        self.batched = 0
+        self.in_flight = 0
+        self.connections = 0
+        self.stats = {algorithm: SearchStats() for algorithm in ALGORITHMS}
+
+    async def start(self):
+        """
+        Start the worker pool and the batcher.
+        """
+        if self.workers == 0:
+            _init_worker(self.map_paths)
+            self.executor = ThreadPoolExecutor(1)
+        else:
+            # Spawned, not forked: a forked worker would inherit the
+            # event loop and the open client sockets
+            self.executor = ProcessPoolExecutor(self.workers, multiprocessing.get_context("spawn"),
+                                                initializer=_init_worker,
+                                                initargs=(self.map_paths,))
+        self.batcher = asyncio.get_running_loop().create_task(self._batch_loop())
+
+    async def close(self):
+        """
+        Stop the batcher and shut the worker pool down.
+        """
+        if self.batcher is not None:
+            self.batcher.cancel()
+            try:
+                await self.batcher
+            except asyncio.CancelledError:
+                pass
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+
+    def parse(self, payload):
+        """
+        Check a /path request body.
+
+        Returns:
+        tuple: (map, algorithm, start, goal, deadline seconds)
+
+        Raises:
+        LookupError: Unknown map.
+        ValueError: Anything else wrong with the request.
+        """
+        if not isinstance(payload, dict):
+            raise ValueError("request body must be a JSON object")
+        name = payload.get("map")
+        if not isinstance(name, str):
+            raise ValueError("map must be a string")
+        if name not in self.grids:
+            raise LookupError(f"unknown map {name!r}")
+        algorithm = payload.get("algorithm", "jps")
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm!r}, expected one of {ALGORITHMS}")
+
+        grid = self.grids[name]
+        points = []
+        for key in ("start", "goal"):
+            point = payload.get(key)
+            if not (isinstance(point, list) and len(point) == 2 and
+                    all(isinstance(v, int) and not isinstance(v, bool) for v in point)):
+                raise ValueError(f"{key} must be [y, x]")
+            if not grid.in_bounds(*point):
+                raise ValueError(f"{key} {point} is outside the map")
+            points.append(tuple(point))
+
+        deadline = payload.get("deadline_ms")
+        if deadline is None:
+            deadline = self.deadline
+        elif isinstance(deadline, (int, float)) and not isinstance(deadline, bool) and deadline >= 0:
+            deadline = deadline / 1e3
+        else:
+            raise ValueError("deadline_ms must be a non-negative number")
+        return name, algorithm, points[0], points[1], deadline
+
+    async def solve(self, payload):
+        """
+        Queue one path request and wait for its answer.
+
+        Returns:
+        dict: The JSON response body.
+
+        Raises:
+        LookupError, ValueError: See parse().
+        Overloaded: The queue is full.
+        DeadlineExceeded: No answer before the deadline.
+        """
+        name, algorithm, start, goal, timeout = self.parse(payload)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        deadline = time.time() + timeout
+        try:
+            self.queue.put_nowait(((name, algorithm, start, goal, deadline), future))
+        except asyncio.QueueFull:
+            raise Overloaded() from None
+
+        try:
+            points, elapsed = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded() from None
+
+        # Workers send the waypoints only
+        path = None if points is None else PathResult(points)
+        return {
+            "map": name,
+            "algorithm": algorithm,
+            "start": list(start),
+            "goal": list(goal),
+            "points": None if path is None else [list(p) for p in path.points],
+            "cells": None if path is None else len(path),
+            "cost": None if path is None else path.cost,
+            "time_ms": elapsed * 1e3,
+        }
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.slots.acquire()
+            try:
+                batch = [await self.queue.get()]
+                if self.queue.qsize() < self.batch_size - 1 and self.batch_wait > 0:
+                    await asyncio.sleep(self.batch_wait)
+                while len(batch) < self.batch_size and not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+            except BaseException:
+                self.slots.release()
+                raise
+            loop.create_task(self._run_batch(batch))
+
+    async def _run_batch(self, batch):
+        try:
+            now = time.time()
+            live = []
+            for query, future in batch:
+                if future.done():
+                    continue
+                if now >= query[-1]:
+                    future.set_exception(DeadlineExceeded())
+                    continue
+                live.append((query, future))
+            if not live:
+                return
+
+            self.batches += 1
+            self.batched += len(live)
+            self.in_flight += 1
+            loop = asyncio.get_running_loop()
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, _solve_batch, [query for query, _ in live])
+            except Exception as e:
+                for _, future in live:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            finally:
+                self.in_flight -= 1
+
+            for (query, future), result in zip(live, results):
+                if result is None:
+                    if not future.done():
+                        future.set_exception(DeadlineExceeded())
+                    continue
+                points, elapsed, stats = result
+                self.stats[query[1]].merge(stats)
+                if not future.done():
+                    future.set_result((points, elapsed))
+        finally:
+            self.slots.release()
+
+    def record(self, status, seconds):
+        """
+        Count one answered request.
+        """
+        self.responses[status] += 1
+        self.latencies.append(seconds)
+        self.latency_sum += seconds
+
+    def metrics(self):
+        """
+        Server and search counters in the Prometheus text format.
+        """
+        prefix = "pathfinding_server"
+        lines = [
+            f"# HELP {prefix}_responses_total Responses sent, by HTTP status.",
+            f"# TYPE {prefix}_responses_total counter",
+        ]
+        for status, count in sorted(self.responses.items()):
+            lines.append(f'{prefix}_responses_total{{status="{status}"}} {count}')
+
+        lines += [
+            f"# HELP {prefix}_latency_seconds Request latency over the last {LATENCY_WINDOW} requests.",
+            f"# TYPE {prefix}_latency_seconds summary",
+        ]
+        window = sorted(self.latencies)
+        if window:
+            for q in QUANTILES:
+                lines.append(f'{prefix}_latency_seconds{{quantile="{q}"}} {percentile(window, q * 100):.6f}')
+        lines.append(f"{prefix}_latency_seconds_sum {self.latency_sum:.6f}")
+        lines.append(f"{prefix}_latency_seconds_count {sum(self.responses.values())}")
+
+        for name, kind, text, value in (
+            ("connections", "gauge", "Open client connections.", self.connections),
+            ("queue_depth", "gauge", "Requests waiting for a worker.", self.queue.qsize()),
+            ("batches_in_flight", "gauge", "Batches running on the workers.", self.in_flight),
+            ("batches_total", "counter", "Batches sent to the workers.", self.batches),
+            ("batched_requests_total", "counter", "Requests sent in batches.", self.batched),
+        ):
+            lines += [f"# HELP {prefix}_{name} {text}", f"# TYPE {prefix}_{name} {kind}",
+                      f"{prefix}_{name} {value}"]
+
+        searches = format_prometheus([({"algorithm": algorithm}, stats)
+                                      for algorithm, stats in self.stats.items()])
+        return "\n".join(lines) + "\n" + searches
+
+    async def handle(self, reader, writer):
+        """
+        Serve one HTTP connection (keep-alive is supported).
+        """
+        self.connections += 1
+        try:
+            while True:
+                request = await _read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                t0 = time.perf_counter()
+                status, content_type, data = await self._respond(method, target, body)
+                if target == "/path":
+                    self.record(status, time.perf_counter() - t0)
+
+                close = headers.get("connection", "").lower() == "close"
+                head = [
+                    f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(data)}",
+                ]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                if close:
+                    head.append("Connection: close")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + data)
+                await writer.drain()
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError:
+            # Malformed request line or headers: nothing sensible to answer
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def _respond(self, method, target, body):
+        if target == "/path":
+            if method != "POST":
+                return _json(405, {"error": "use POST"})
+            if body is None:
+                return _json(413, {"error": "request body too large"})
+            try:
+                return _json(200, await self.solve(json.loads(body)))
+            except LookupError as e:
+                return _json(404, {"error": str(e.args[0])})
+            except ValueError as e:
+                return _json(400, {"error": str(e)})
+            except Overloaded:
+                return _json(503, {"error": "too many queued requests"})
+            except DeadlineExceeded:
+                return _json(504, {"error": "deadline exceeded"})
+            except Exception as e:
+                return _json(500, {"error": repr(e)})
+        if target == "/metrics" and method == "GET":
+            return 200, "text/plain; version=0.0.4", self.metrics().encode()
+        if target == "/health" and method == "GET":
+            return _json(200, {"status": "ok", "maps": sorted(self.grids)})
+        return _json(404, {"error": f"no such endpoint {target}"})
+
+
+def _json(status, body):
+    return status, "application/json", json.dumps(body).encode()
+
+
+async def _read_request(reader):
+    """
+    Read one HTTP request.
+
+    Returns:
+    tuple or None: (method, target, headers, body), body None if it is
+    larger than MAX_BODY; None when the client closed the connection.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    method, target, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY:
+        # Drain the body so the connection stays usable
+        while length > 0:
+            length -= len(await reader.read(min(length, 1 << 16)))
+        return method, target, headers, None
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+async def call(reader, writer, method, target, payload=None):
+    """
+    Minimal HTTP client for one keep-alive connection.
+
+    Returns:
+    tuple: (status, body bytes)
+    """
+    data = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\n"
+                 f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n\r\n"
+                 .encode("latin-1") + data)
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+
+async def serve(service, host="127.0.0.1", port=8080, unix_path=None):
+    """
+    Run service until cancelled.
+    """
+    await service.start()
+    if unix_path is not None:
+        server = await asyncio.start_unix_server(service.handle, unix_path)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def _map_arg(value):
+    name, sep, path = value.partition("=")
+    if not sep:
+        path = value
+        name = os.path.splitext(os.path.basename(value))[0]
+    return name, path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve path queries over HTTP.")
+    parser.add_argument("--map", action="append", type=_map_arg, required=True,
+                        help="NAME=PATH or PATH of a .map or compiled map (repeatable)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--unix", default=None, help="listen on this Unix socket instead")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--batch-wait-ms", type=float, default=2.0)
+    parser.add_argument("--max-queue", type=int, default=1024)
+    parser.add_argument("--deadline-ms", type=float, default=1000.0,
+                        help="deadline of requests without deadline_ms")
+    args = parser.parse_args(argv)
+
+    service = PathService(dict(args.map), args.workers, args.batch_size,
+                          args.batch_wait_ms / 1e3, args.max_queue, args.deadline_ms / 1e3)
+    where = args.unix or f"http://{args.host}:{args.port}"
+    print(f"serving {', '.join(service.grids)} on {where}", file=sys.stderr)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Binary file format shared by the per-map precomputed tables
+(JPS+ jump distances, goal bounds, ...).
+
+A file is a fixed header followed by the raw little-endian contents of
+one array.array:
+
+    magic (4 bytes), format version (u16), array typecode (1 byte),
+    map height (u32), map width (u32), map SHA-256 digest (32 bytes)
+
+The digest is Grid.digest() of the map the table was built from, so a
+cache lookup can tell a stale table from a valid one.
+"""
+
+import os
+import struct
+import sys
+from array import array
+
+
+HEADER = struct.Struct("<4sHcII32s")
+
+
+def cache_path(cache_dir, digest, suffix):
+    """
+    File name of the cached table of a map inside cache_dir.
+    """
+    return os.path.join(cache_dir, f"{digest[:32]}{suffix}")
+
+
+def write_table(path, magic, version, height, width, digest, values):
+    """
+    Write one array with its header. The file is replaced atomically.
+    """
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(HEADER.pack(magic, version, values.typecode.encode(),
+                            height, width, bytes.fromhex(digest)))
+        values.tofile(f)
+    os.replace(tmp, path)
+
+
+def read_table(path, magic, version, count_per_cell):
+    """
+    Read a file written by write_table().
+
+    count_per_cell is the number of array items per padded grid cell.
+
+    Returns:
+    tuple: (height, width, digest, values)
+
+    Raises:
+    ValueError: If the file has the wrong magic, version or size.
+    """
+    with open(path, "rb") as f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError(f"{path}: truncated header")
+        file_magic, file_version, typecode, height, width, digest = HEADER.unpack(header)
+        if file_magic != magic or file_version != version:
+            raise ValueError(f"{path}: not a version {version} {magic.decode()} table")
+
+        values = array(typecode.decode())
+        count = (height + 2) * (width + 2) * count_per_cell
+        try:
+            values.fromfile(f, count)
+        except EOFError as e:
+            raise ValueError(f"{path}: truncated table") from e
+
+    if sys.byteorder != "little":
+        values.byteswap()
+    return height, width, digest.hex(), values
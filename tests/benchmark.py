@@ -10,6 +10,9 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 from map_loader import load_movingai_map
 from a_star import find_path as astar
 from jps import find_path as jps
+from search_context import SearchContext
+from components import ComponentIndex
+from render import render_text, window
 
 
 MAP_PATH = "tests/Berlin_1_256.map"
@@ -18,12 +21,17 @@ MIN_DISTANCE = 20
 DEBUG_STOP_ON_FAILURE = True
 
 
-def random_free_cell(grid):
+def random_free_cell(grid, rng=random):
+    """
+    Random free cell of a Grid or list grid, drawn with rng (default:
+    the random module, so random.seed() makes it repeatable). Shared by
+    all benchmark scripts.
+    """
     h = len(grid)
     w = len(grid[0])
     while True:
-        y = random.randint(0, h-1)
-        x = random.randint(0, w-1)
+        y = rng.randint(0, h-1)
+        x = rng.randint(0, w-1)
         if grid[y][x] == 0:
             return (y, x)
 
@@ -60,37 +68,12 @@ def validate_path(grid, path):
 
 
 def print_ascii(grid, path_a, path_j, start, goal, radius=20):
-    sy, sx = start
-    h = len(grid)
-    w = len(grid[0])
-
-    min_y = max(0, sy - radius)
-    max_y = min(h, sy + radius)
-    min_x = max(0, sx - radius)
-    max_x = min(w, sx + radius)
-
-    set_a = set(path_a or [])
-    set_j = set(path_j or [])
+    view = window(grid, [start], radius)
+    text = render_text(grid, [(path_a or (), "A"), (path_j or (), "J")],
+                       marks={start: "S", goal: "G"}, view=view, overlap="B")
 
     print("\n=== ASCII MAP (cropped) ===")
-    for y in range(min_y, max_y):
-        row = ""
-        for x in range(min_x, max_x):
-            if (y, x) == start:
-                row += "S"
-            elif (y, x) == goal:
-                row += "G"
-            elif (y, x) in set_a and (y, x) in set_j:
-                row += "B"
-            elif (y, x) in set_a:
-                row += "A"
-            elif (y, x) in set_j:
-                row += "J"
-            elif grid[y][x] != 0:
-                row += "#"
-            else:
-                row += "."
-        print(row)
+    print(text, end="")
     print("===========================\n")
 
 
@@ -98,6 +81,13 @@ def main():
     grid = load_movingai_map(MAP_PATH)
     print(f"Loaded map: {len(grid)} x {len(grid[0])}\n")
 
+    # One preallocated search state per algorithm, reused by every query
+    context_a = SearchContext(grid)
+    context_j = SearchContext(grid)
+
+    # Rejects queries between disconnected regions without searching
+    components = ComponentIndex(grid)
+
     times_a = []
     times_j = []
     costs_a = []
@@ -114,11 +104,11 @@ def main():
             continue
 
         t0 = time.perf_counter()
-        path_a = astar(start, goal, grid)
+        path_a = astar(start, goal, grid, context=context_a, components=components)
         t1 = time.perf_counter()
 
         t2 = time.perf_counter()
-        path_j = jps(start, goal, grid)
+        path_j = jps(start, goal, grid, context=context_j, components=components)
         t3 = time.perf_counter()
 
         #CASE 1: no path exists
@@ -154,8 +144,8 @@ def main():
         costs_a.append(cost_a)
         costs_j.append(cost_j)
 
-        #CASE 4: cost mismatch
-        if abs(cost_a - cost_j) > 1e-6:
+        #CASE 4: cost mismatch (exact: both count straight and diagonal steps)
+        if path_a.steps != path_j.steps:
             mismatches += 1
             print("\n========== COST MISMATCH ==========")
             print("Start:", start)
@@ -173,6 +163,8 @@ def main():
     print("Cost mismatches:", mismatches)
     print("\nA* Avg Runtime:", statistics.mean(times_a))
     print("JPS Avg Runtime:", statistics.mean(times_j))
+    print("A* Throughput (queries/s):", len(times_a) / sum(times_a))
+    print("JPS Throughput (queries/s):", len(times_j) / sum(times_j))
     print("A* Avg Cost:", statistics.mean(costs_a))
     print("JPS Avg Cost:", statistics.mean(costs_j))
 
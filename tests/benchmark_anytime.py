@@ -0,0 +1,85 @@
+import sys
+import os
+import random
+import time
+import statistics
+import math
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from a_star import find_path as astar
+from ara_star import find_path as ara
+from search_context import SearchContext
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+NUM_TESTS = 40
+MIN_DISTANCE = 100
+WEIGHT = 3.0
+# Time budgets in milliseconds (None = run until optimal)
+BUDGETS = [5, 10, 25, 50, 100, None]
+SEED = 1
+
+
+def compute_path_cost(path):
+    cost = 0
+    for i in range(1, len(path)):
+        dy = abs(path[i][0] - path[i-1][0])
+        dx = abs(path[i][1] - path[i-1][1])
+        diag = min(dy, dx)
+        straight = max(dy, dx) - diag
+        cost += diag * math.sqrt(2) + straight
+    return cost
+
+
+def main():
+    random.seed(SEED)
+    grid = load_movingai_map(MAP_PATH)
+    context = SearchContext(grid)
+
+    queries = []
+    optimal = []
+    times_a = []
+    while len(queries) < NUM_TESTS:
+        start, goal = random_free_cell(grid), random_free_cell(grid)
+        if math.hypot(start[0] - goal[0], start[1] - goal[1]) < MIN_DISTANCE:
+            continue
+        t0 = time.perf_counter()
+        path = astar(start, goal, grid, context=context)
+        elapsed = time.perf_counter() - t0
+        if path:
+            queries.append((start, goal))
+            optimal.append(compute_path_cost(path))
+            times_a.append(elapsed)
+
+    print(f"{NUM_TESTS} queries on {MAP_PATH}, initial weight {WEIGHT}")
+    print(f"A* to optimal: mean {statistics.mean(times_a) * 1e3:.1f} ms, "
+          f"max {max(times_a) * 1e3:.1f} ms\n")
+    print(f"{'budget (ms)':<13}{'solved':>8}{'mean subopt':>13}{'max subopt':>12}{'mean bound':>12}")
+
+    for budget in BUDGETS:
+        solved = 0
+        ratios = []
+        bounds = []
+        for (start, goal), best in zip(queries, optimal):
+            deadline = None if budget is None else time.perf_counter() + budget / 1e3
+            result = ara(start, goal, grid, weight=WEIGHT, deadline=deadline, context=context)
+            if result.path is None:
+                continue
+            solved += 1
+            ratios.append(result.cost / best)
+            bounds.append(result.bound)
+            assert result.cost <= result.bound * best + 1e-6, "ARA* bound does not hold"
+
+        label = "unlimited" if budget is None else str(budget)
+        if ratios:
+            print(f"{label:<13}{solved:>8}{statistics.mean(ratios):>13.4f}{max(ratios):>12.4f}"
+                  f"{statistics.mean(bounds):>12.4f}")
+        else:
+            print(f"{label:<13}{solved:>8}{'-':>13}{'-':>12}{'-':>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from batch import find_paths
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+NUM_QUERIES = 2000
+ALGORITHM = "jps"
+SEED = 1
+
+
+def main():
+    random.seed(SEED)
+    grid = load_movingai_map(MAP_PATH)
+    queries = [(random_free_cell(grid), random_free_cell(grid)) for _ in range(NUM_QUERIES)]
+
+    cores = os.cpu_count() or 1
+    counts = sorted({1, 2, 4, 8, cores} & set(range(1, cores + 1)))
+
+    print(f"{NUM_QUERIES} {ALGORITHM} queries on {MAP_PATH}, {cores} cores\n")
+    base = None
+    reference = None
+    for workers in counts:
+        t0 = time.perf_counter()
+        paths = find_paths(queries, grid, ALGORITHM, workers=workers)
+        elapsed = time.perf_counter() - t0
+
+        if reference is None:
+            reference = paths
+            base = elapsed
+        assert paths == reference, "parallel results differ from serial ones"
+
+        print(f"workers={workers:<3} {NUM_QUERIES / elapsed:10.1f} queries/s"
+              f"   speedup {base / elapsed:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
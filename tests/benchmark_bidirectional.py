@@ -0,0 +1,85 @@
+import sys
+import os
+import random
+import time
+import statistics
+import math
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from a_star import find_path as astar, heuristic
+from bidirectional import find_path as bidirectional
+from search_context import SearchContext
+from search_stats import SearchStats
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+QUERIES_PER_BUCKET = 40
+# Octile distance between start and goal: [low, high)
+BUCKETS = [(0, 32), (32, 64), (64, 128), (128, 256), (256, 400)]
+SEED = 1
+
+
+def compute_path_cost(path):
+    cost = 0
+    for i in range(1, len(path)):
+        dy = abs(path[i][0] - path[i-1][0])
+        dx = abs(path[i][1] - path[i-1][1])
+        diag = min(dy, dx)
+        straight = max(dy, dx) - diag
+        cost += diag * math.sqrt(2) + straight
+    return cost
+
+
+def run(find, queries):
+    times = []
+    paths = []
+    stats = SearchStats()
+    for start, goal in queries:
+        t0 = time.perf_counter()
+        paths.append(find(start, goal, stats))
+        times.append(time.perf_counter() - t0)
+    return times, paths, stats
+
+
+def main():
+    random.seed(SEED)
+    grid = load_movingai_map(MAP_PATH)
+
+    buckets = {bucket: [] for bucket in BUCKETS}
+    while any(len(q) < QUERIES_PER_BUCKET for q in buckets.values()):
+        start, goal = random_free_cell(grid), random_free_cell(grid)
+        d = heuristic(start, goal)
+        for low, high in BUCKETS:
+            if low <= d < high and len(buckets[(low, high)]) < QUERIES_PER_BUCKET:
+                buckets[(low, high)].append((start, goal))
+
+    forward = SearchContext(grid)
+    backward = SearchContext(grid)
+
+    print(f"{QUERIES_PER_BUCKET} queries per distance bucket on {MAP_PATH}\n")
+    print(f"{'distance':<12}{'A* (ms)':>10}{'bidir (ms)':>12}{'speedup':>9}"
+          f"{'A* exp':>10}{'bidir exp':>11}")
+
+    for (low, high), queries in buckets.items():
+        times_a, paths_a, stats_a = run(
+            lambda s, g, st: astar(s, g, grid, context=forward, stats=st), queries)
+        times_b, paths_b, stats_b = run(
+            lambda s, g, st: bidirectional(s, g, grid, forward, backward, stats=st), queries)
+
+        for path_a, path_b in zip(paths_a, paths_b):
+            assert (path_a is None) == (path_b is None), "A* and bidirectional A* disagree on reachability"
+            if path_a:
+                assert abs(compute_path_cost(path_a) - compute_path_cost(path_b)) < 1e-6, \
+                    "bidirectional A* returned a longer path"
+
+        mean_a = statistics.mean(times_a)
+        mean_b = statistics.mean(times_b)
+        print(f"{f'{low}-{high}':<12}{mean_a * 1e3:>10.3f}{mean_b * 1e3:>12.3f}{mean_a / mean_b:>9.2f}"
+              f"{stats_a.expanded / len(queries):>10.0f}{stats_b.expanded / len(queries):>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import sys
+import os
+import random
+import time
+import statistics
+import math
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from a_star import find_path as astar
+from jps import find_path as jps
+from hpa import HierarchicalMap
+from search_context import SearchContext
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+NUM_TESTS = 200
+MIN_DISTANCE = 20
+CLUSTER_SIZES = [8, 16, 32]
+SEED = 1
+
+
+def compute_path_cost(path):
+    cost = 0
+    for i in range(1, len(path)):
+        dy = abs(path[i][0] - path[i-1][0])
+        dx = abs(path[i][1] - path[i-1][1])
+        diag = min(dy, dx)
+        straight = max(dy, dx) - diag
+        cost += diag * math.sqrt(2) + straight
+    return cost
+
+
+def time_queries(find, queries):
+    times = []
+    paths = []
+    for start, goal in queries:
+        t0 = time.perf_counter()
+        paths.append(find(start, goal))
+        times.append(time.perf_counter() - t0)
+    return times, paths
+
+
+def main():
+    random.seed(SEED)
+    grid = load_movingai_map(MAP_PATH)
+
+    queries = []
+    while len(queries) < NUM_TESTS:
+        start, goal = random_free_cell(grid), random_free_cell(grid)
+        if math.hypot(start[0] - goal[0], start[1] - goal[1]) >= MIN_DISTANCE:
+            queries.append((start, goal))
+
+    context = SearchContext(grid)
+    times_a, paths_a = time_queries(lambda s, g: astar(s, g, grid, context=context), queries)
+    times_j, _ = time_queries(lambda s, g: jps(s, g, grid, context=context), queries)
+    optimal = [compute_path_cost(p) if p else None for p in paths_a]
+
+    print(f"{NUM_TESTS} queries on {MAP_PATH}\n")
+    print(f"{'algorithm':<12}{'build (s)':>10}{'mean (ms)':>11}{'max (ms)':>10}"
+          f"{'mean subopt':>13}{'max subopt':>12}")
+    print(f"{'A*':<12}{'-':>10}{statistics.mean(times_a) * 1e3:>11.3f}"
+          f"{max(times_a) * 1e3:>10.3f}{'1.0000':>13}{'1.0000':>12}")
+    print(f"{'JPS':<12}{'-':>10}{statistics.mean(times_j) * 1e3:>11.3f}"
+          f"{max(times_j) * 1e3:>10.3f}{'1.0000':>13}{'1.0000':>12}")
+
+    for size in CLUSTER_SIZES:
+        t0 = time.perf_counter()
+        hierarchy = HierarchicalMap(grid, size)
+        build = time.perf_counter() - t0
+
+        times_h, paths_h = time_queries(hierarchy.find_path, queries)
+        ratios = []
+        for path, best in zip(paths_h, optimal):
+            assert (path is None) == (best is None), "HPA* and A* disagree on reachability"
+            if path and best:
+                ratios.append(compute_path_cost(path) / best)
+
+        print(f"{f'HPA* ({size})':<12}{build:>10.3f}{statistics.mean(times_h) * 1e3:>11.3f}"
+              f"{max(times_h) * 1e3:>10.3f}{statistics.mean(ratios):>13.4f}{max(ratios):>12.4f}")
+
+
+if __name__ == "__main__":
+    main()
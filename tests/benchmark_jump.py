@@ -0,0 +1,72 @@
+import sys
+import os
+import random
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from block_jump import BlockJumper
+import jps
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+NUM_QUERIES = 200
+SEED = 1
+
+
+def record_jump_calls(grid, queries):
+    """
+    Run JPS on every query and record the jump() calls it makes.
+    """
+    calls = []
+    original = BlockJumper.jump
+
+    def recording_jump(self, y, x, dy, dx, goal):
+        calls.append((y, x, dy, dx, goal))
+        return original(self, y, x, dy, dx, goal)
+
+    BlockJumper.jump = recording_jump
+    try:
+        for start, goal in queries:
+            jps.find_path(start, goal, grid)
+    finally:
+        BlockJumper.jump = original
+    return calls
+
+
+def main():
+    random.seed(SEED)
+    grid = load_movingai_map(MAP_PATH)
+    queries = [(random_free_cell(grid), random_free_cell(grid)) for _ in range(NUM_QUERIES)]
+
+    calls = record_jump_calls(grid, queries)
+    print(f"Recorded {len(calls)} jump() calls from {NUM_QUERIES} queries\n")
+
+    t0 = time.perf_counter()
+    stepwise = [jps.jump(grid, y, x, dy, dx, goal) for y, x, dy, dx, goal in calls]
+    t1 = time.perf_counter()
+
+    jumper = BlockJumper(grid)
+    t2 = time.perf_counter()
+    scanned = [jumper.jump(y, x, dy, dx, goal) for y, x, dy, dx, goal in calls]
+    t3 = time.perf_counter()
+
+    assert stepwise == scanned, "jump engines disagree"
+
+    t4 = time.perf_counter()
+    for start, goal in queries:
+        jps.find_path(start, goal, grid)
+    t5 = time.perf_counter()
+
+    print("===== JUMP ENGINE RESULTS =====\n")
+    print(f"Bitset build time:      {t2 - t1:.6f}s")
+    print(f"Stepwise jump() total:  {t1 - t0:.6f}s")
+    print(f"Bitset jump() total:    {t3 - t2:.6f}s")
+    print(f"Speedup:                {(t1 - t0) / (t3 - t2):.2f}x")
+    print(f"\nJPS Avg Runtime:        {(t5 - t4) / NUM_QUERIES:.6f}s")
+
+
+if __name__ == "__main__":
+    main()
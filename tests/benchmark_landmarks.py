@@ -0,0 +1,89 @@
+import sys
+import os
+import random
+import time
+import statistics
+import math
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from a_star import find_path as astar
+from jps import find_path as jps
+from landmarks import load_or_build
+from search_context import SearchContext
+from search_stats import SearchStats
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+NUM_TESTS = 200
+MIN_DISTANCE = 20
+LANDMARK_COUNTS = [4, 8, 16]
+SEED = 1
+
+
+def run(find, queries, landmarks):
+    times = []
+    steps = []
+    stats = SearchStats()
+    for start, goal in queries:
+        t0 = time.perf_counter()
+        path = find(start, goal, stats, landmarks)
+        times.append(time.perf_counter() - t0)
+        steps.append(None if path is None else path.steps)
+    return times, steps, stats
+
+
+def main():
+    random.seed(SEED)
+    grid = load_movingai_map(MAP_PATH)
+    context = SearchContext(grid)
+
+    queries = []
+    while len(queries) < NUM_TESTS:
+        start, goal = random_free_cell(grid), random_free_cell(grid)
+        if math.hypot(start[0] - goal[0], start[1] - goal[1]) >= MIN_DISTANCE:
+            queries.append((start, goal))
+
+    searches = [
+        ("A*", lambda s, g, st, lm: astar(s, g, grid, context=context, stats=st, landmarks=lm)),
+        ("JPS", lambda s, g, st, lm: jps(s, g, grid, context=context, stats=st, landmarks=lm)),
+    ]
+
+    tables = {None: None}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        print(f"Landmarks for {MAP_PATH}")
+        for count in LANDMARK_COUNTS:
+            t0 = time.perf_counter()
+            load_or_build(grid, count, cache_dir)
+            built = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            tables[count] = load_or_build(grid, count, cache_dir)
+            loaded = time.perf_counter() - t0
+            size = tables[count].distances.itemsize * len(tables[count].distances)
+            print(f"  K={count:<3} build {built:.2f} s, load from cache {loaded * 1e3:.1f} ms, "
+                  f"{size / 1024:.0f} KiB")
+
+    print(f"\n{NUM_TESTS} queries\n")
+    print(f"{'search':<8}{'heuristic':<11}{'mean exp':>10}{'exp ratio':>11}{'ms/query':>10}{'speedup':>9}")
+
+    for name, find in searches:
+        base_steps = base_stats = base_times = None
+        for count, landmarks in tables.items():
+            times, steps, stats = run(find, queries, landmarks)
+            if base_steps is None:
+                base_steps, base_stats, base_times = steps, stats, times
+            assert steps == base_steps, f"{name} with {count} landmarks changed a path cost"
+
+            label = "octile" if count is None else f"ALT K={count}"
+            print(f"{name:<8}{label:<11}{stats.expanded / NUM_TESTS:>10.0f}"
+                  f"{stats.expanded / base_stats.expanded:>11.2f}"
+                  f"{statistics.mean(times) * 1e3:>10.3f}"
+                  f"{statistics.mean(base_times) / statistics.mean(times):>9.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+Performance regression suite for a_star.py and jps.py.
+
+    python tests/benchmark_regression.py run --out baseline.json
+    ... change the code ...
+    python tests/benchmark_regression.py compare baseline.json
+
+The query set is fixed: SEED picks QUERIES_PER_CLASS connected queries
+per map and distance class, on Berlin_1_256 and on synthetic maps built
+from the same seed. Every (map, algorithm, class) group is warmed up and
+then timed REPEATS times, the repeats of all groups interleaved so that
+slow drift of the machine hits all of them alike. Each repeat gives one
+sample: the mean milliseconds per query of that group, best of INNER runs.
+
+compare runs the suite again (or reads a second result file) and tests
+each group with a one-sided Mann-Whitney U test. A group is flagged when
+its samples are significantly larger and the median is at least
+MIN_SLOWDOWN slower; the exit status is then 1. Significance uses the
+Holm correction over all groups, so the chance of any false alarm in a
+run is at most ALPHA.
+"""
+
+import sys
+import os
+import random
+import time
+import statistics
+import math
+import argparse
+import json
+import platform
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from a_star import find_path as astar
+from jps import find_path as jps
+from grid import Grid
+from components import ComponentIndex
+from search_context import SearchContext
+from search_stats import SearchStats
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+SYNTHETIC_SIZE = 256
+SEED = 1
+QUERIES_PER_CLASS = 20
+# Query classes by octile distance: (name, lower bound, upper bound)
+CLASSES = [("short", 8, 32), ("medium", 32, 128), ("long", 128, math.inf)]
+WARMUP = 1
+REPEATS = 9
+# Each sample is the fastest of INNER runs, which filters out most noise
+INNER = 3
+ALPHA = 0.01
+MIN_SLOWDOWN = 1.10
+FORMAT_VERSION = 1
+
+
+def octile(a, b):
+    dy, dx = abs(a[0] - b[0]), abs(a[1] - b[1])
+    return max(dy, dx) + (math.sqrt(2) - 1) * min(dy, dx)
+
+
+def random_obstacles(rng, size, density=0.2):
+    grid = Grid(size, size)
+    for y in range(size):
+        for x in range(size):
+            if rng.random() < density:
+                grid.set_cell(y, x, 1)
+    return grid
+
+
+def rooms(rng, size, room=16):
+    # Walls every room cells, with one door per wall segment
+    grid = Grid(size, size)
+    for y in range(0, size, room):
+        for x in range(size):
+            grid.set_cell(y, x, 1)
+            grid.set_cell(x, y, 1)
+    for y in range(0, size, room):
+        for x in range(0, size, room):
+            grid.set_cell(y, x + rng.randint(1, room - 1), 0)
+            grid.set_cell(y + rng.randint(1, room - 1), x, 0)
+    return grid
+
+
+def load_maps():
+    rng = random.Random(SEED)
+    return {
+        "berlin": load_movingai_map(MAP_PATH),
+        "random20": random_obstacles(rng, SYNTHETIC_SIZE),
+        "rooms": rooms(rng, SYNTHETIC_SIZE),
+        "open": Grid(SYNTHETIC_SIZE, SYNTHETIC_SIZE),
+    }
+
+
+def make_queries(grid, rng):
+    """
+    QUERIES_PER_CLASS connected queries for every distance class.
+    """
+    components = ComponentIndex(grid)
+    queries = {name: [] for name, _, _ in CLASSES}
+    while any(len(q) < QUERIES_PER_CLASS for q in queries.values()):
+        start, goal = random_free_cell(grid, rng), random_free_cell(grid, rng)
+        d = octile(start, goal)
+        for name, low, high in CLASSES:
+            if low <= d < high and len(queries[name]) < QUERIES_PER_CLASS:
+                if components.connected(start, goal):
+                    queries[name].append((start, goal))
+    return queries
+
+
+def run_suite():
+    """
+    Time every (map, algorithm, class) group.
+
+    Returns:
+    dict: Result document as written to JSON.
+    """
+    rng = random.Random(SEED)
+    groups = []
+    for map_name, grid in load_maps().items():
+        context = SearchContext(grid)
+        searches = [
+            ("astar", lambda s, g, st, grid=grid, context=context: astar(s, g, grid, context=context, stats=st)),
+            ("jps", lambda s, g, st, grid=grid, context=context: jps(s, g, grid, context=context, stats=st)),
+        ]
+        for class_name, queries in make_queries(grid, rng).items():
+            for name, find in searches:
+                groups.append((f"{map_name}/{name}/{class_name}", find, queries))
+
+    def run_group(find, queries, stats=None):
+        steps = []
+        t0 = time.perf_counter()
+        for start, goal in queries:
+            steps.append(find(start, goal, stats).steps)
+        return (time.perf_counter() - t0) * 1e3 / len(queries), steps
+
+    results = {}
+    for key, find, queries in groups:
+        stats = SearchStats()
+        for _ in range(WARMUP):
+            run_group(find, queries)
+        _, steps = run_group(find, queries, stats)
+        results[key] = {
+            "queries": len(queries),
+            "expanded": stats.expanded,
+            # Same queries and same answers, or the timings do not compare
+            "checksum": sum(a * 3 + b * 7 for a, b in steps),
+            "samples_ms": [],
+        }
+
+    for repeat in range(REPEATS):
+        for key, find, queries in groups:
+            sample = min(run_group(find, queries)[0] for _ in range(INNER))
+            results[key]["samples_ms"].append(sample)
+        print(f"Repeat {repeat + 1}/{REPEATS}", file=sys.stderr)
+
+    for result in results.values():
+        result["median_ms"] = statistics.median(result["samples_ms"])
+
+    return {
+        "version": FORMAT_VERSION,
+        "seed": SEED,
+        "repeats": REPEATS,
+        "inner": INNER,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+
+def _u_distribution(m, n):
+    # counts[u] = number of orderings of m + n values with U = u
+    counts = [[[1] if i == 0 or j == 0 else None for j in range(n + 1)] for i in range(m + 1)]
+    for i in range(1, m + 1):
+        for j in range(1, n + 1):
+            a = counts[i - 1][j]
+            b = counts[i][j - 1]
+            # The largest value belongs to the first sample (adds j to U) or not
+            row = [0] * (i * j + 1)
+            for u, c in enumerate(a):
+                row[u + j] += c
+            for u, c in enumerate(b):
+                row[u] += c
+            counts[i][j] = row
+    return counts[m][n]
+
+
+def mann_whitney_greater(current, baseline):
+    """
+    One-sided Mann-Whitney U test that current tends to be larger than
+    baseline.
+
+    Returns:
+    tuple: (U, p-value). The p-value is exact (ties counted as half) up
+    to 20 samples each, and from the normal approximation above.
+    """
+    m, n = len(current), len(baseline)
+    u = sum(1.0 if c > b else 0.5 if c == b else 0.0 for c in current for b in baseline)
+    if m <= 20 and n <= 20:
+        counts = _u_distribution(m, n)
+        # U is a multiple of 0.5 with ties; round down so ties never make p smaller
+        tail = sum(counts[math.floor(u):])
+        return u, tail / sum(counts)
+    mean = m * n / 2
+    sd = math.sqrt(m * n * (m + n + 1) / 12)
+    z = (u - mean - 0.5) / sd
+    return u, 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def holm(p_values):
+    """
+    Holm-adjusted p-values, in the same order.
+    """
+    order = sorted(range(len(p_values)), key=p_values.__getitem__)
+    adjusted = [1.0] * len(p_values)
+    running = 0.0
+    for rank, i in enumerate(order):
+        running = max(running, min(1.0, (len(p_values) - rank) * p_values[i]))
+        adjusted[i] = running
+    return adjusted
+
+
+def compare(baseline, current):
+    """
+    Print a table of all groups and return the keys flagged as slower.
+    """
+    rows = []
+    print(f"{'group':<28}{'base ms':>10}{'now ms':>10}{'ratio':>8}{'p':>9}{'holm p':>9}")
+    for key, base in baseline["results"].items():
+        now = current["results"].get(key)
+        if now is None:
+            print(f"{key:<28}{'missing':>10}")
+            continue
+        if now["checksum"] != base["checksum"]:
+            print(f"{key:<28} different queries or paths, not compared")
+            continue
+        ratio = now["median_ms"] / base["median_ms"]
+        _, p = mann_whitney_greater(now["samples_ms"], base["samples_ms"])
+        rows.append((key, base["median_ms"], now["median_ms"], ratio, p))
+
+    slower = []
+    adjusted = holm([row[4] for row in rows])
+    for (key, base_ms, now_ms, ratio, p), p_holm in zip(rows, adjusted):
+        flag = ""
+        if p_holm < ALPHA and ratio >= MIN_SLOWDOWN:
+            flag = "  SLOWER"
+            slower.append(key)
+        print(f"{key:<28}{base_ms:>10.3f}{now_ms:>10.3f}{ratio:>8.2f}{p:>9.4f}{p_holm:>9.4f}{flag}")
+    return slower
+
+
+def load(path):
+    with open(path) as f:
+        document = json.load(f)
+    if document.get("version") != FORMAT_VERSION:
+        raise SystemExit(f"{path}: unsupported result version {document.get('version')}")
+    return document
+
+
+def main():
+    parser = argparse.ArgumentParser(description="A* and JPS performance regression suite.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run = commands.add_parser("run", help="time the suite and save the results")
+    run.add_argument("--out", default="perf_baseline.json")
+    check = commands.add_parser("compare", help="compare against a baseline")
+    check.add_argument("baseline")
+    check.add_argument("current", nargs="?", help="result file (default: run the suite now)")
+    check.add_argument("--out", default=None, help="also save the new results here")
+    args = parser.parse_args()
+
+    if args.command == "run":
+        document = run_suite()
+        with open(args.out, "w") as f:
+            json.dump(document, f, indent=1)
+        print(f"Wrote {len(document['results'])} groups to {args.out}")
+        return 0
+
+    baseline = load(args.baseline)
+    if args.current:
+        current = load(args.current)
+    else:
+        current = run_suite()
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(current, f, indent=1)
+
+    slower = compare(baseline, current)
+    if slower:
+        print(f"\n{len(slower)} significant slowdown(s): {', '.join(slower)}")
+        return 1
+    print("\nNo significant slowdowns.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
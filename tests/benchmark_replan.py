@@ -0,0 +1,90 @@
+import sys
+import os
+import random
+import time
+import statistics
+import math
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from a_star import find_path as astar
+from dstar_lite import DStarLite
+from search_context import SearchContext
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+NUM_TESTS = 30
+EDITS_PER_TEST = 5
+MIN_DISTANCE = 100
+# Side length of the square block of cells toggled by one edit
+EDIT_SIZES = [1, 4, 12]
+SEED = 1
+
+
+def edit_cells(grid, path, size, start, goal):
+    """
+    Cells of a size x size block centred on a random cell of the current
+    path, so that every edit forces a detour.
+    """
+    cy, cx = random.choice(path[len(path) // 4: 3 * len(path) // 4 + 1])
+    cells = []
+    for y in range(cy - size // 2, cy - size // 2 + size):
+        for x in range(cx - size // 2, cx - size // 2 + size):
+            if grid.in_bounds(y, x) and grid[y][x] == 0 and (y, x) not in (start, goal):
+                cells.append((y, x))
+    return cells
+
+
+def main():
+    random.seed(SEED)
+    base = load_movingai_map(MAP_PATH)
+
+    queries = []
+    while len(queries) < NUM_TESTS:
+        start, goal = random_free_cell(base), random_free_cell(base)
+        if math.hypot(start[0] - goal[0], start[1] - goal[1]) >= MIN_DISTANCE:
+            if astar(start, goal, base):
+                queries.append((start, goal))
+
+    print(f"{NUM_TESTS} queries x {EDITS_PER_TEST} edits on {MAP_PATH}\n")
+    print(f"{'edit':<10}{'A* (ms)':>10}{'D* Lite (ms)':>14}{'speedup':>9}"
+          f"{'expanded':>10}{'initial (ms)':>14}")
+
+    for size in EDIT_SIZES:
+        times_a, times_d, initial, expanded = [], [], [], []
+        for start, goal in queries:
+            planner = DStarLite(base.to_rows(), start, goal)
+            grid = planner.grid
+            context = SearchContext(grid)
+
+            t0 = time.perf_counter()
+            path = planner.find_path()
+            initial.append(time.perf_counter() - t0)
+
+            for _ in range(EDITS_PER_TEST):
+                if path is None:
+                    break
+                for y, x in edit_cells(grid, path, size, start, goal):
+                    planner.set_cell(y, x, 1)
+
+                t0 = time.perf_counter()
+                path = planner.find_path()
+                times_d.append(time.perf_counter() - t0)
+                expanded.append(planner.expanded)
+
+                t0 = time.perf_counter()
+                full = astar(start, goal, grid, context=context)
+                times_a.append(time.perf_counter() - t0)
+                assert (path is None) == (full is None), "D* Lite and A* disagree on reachability"
+
+        mean_a = statistics.mean(times_a)
+        mean_d = statistics.mean(times_d)
+        print(f"{f'{size}x{size}':<10}{mean_a * 1e3:>10.3f}{mean_d * 1e3:>14.3f}"
+              f"{mean_a / mean_d:>9.2f}{statistics.mean(expanded):>10.0f}"
+              f"{statistics.mean(initial) * 1e3:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+import sys
+import os
+import random
+import time
+import asyncio
+from collections import Counter
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from search_stats import percentile
+from server import PathService, call
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+# (host, port) of a running server, or None to start one in this process
+SERVER_ADDRESS = None
+WORKERS = None
+ALGORITHM = "jps"
+DEADLINE_MS = 2000
+# Concurrent clients, each with one keep-alive connection
+CONCURRENCY = [1, 4, 16, 64]
+REQUESTS_PER_LEVEL = 600
+SEED = 1
+
+
+async def client(host, port, queries, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while queries:
+            start, goal = queries.pop()
+            payload = {"map": "berlin", "start": list(start), "goal": list(goal),
+                       "algorithm": ALGORITHM, "deadline_ms": DEADLINE_MS}
+            t0 = time.perf_counter()
+            status, _ = await call(reader, writer, "POST", "/path", payload)
+            latencies.append(time.perf_counter() - t0)
+            statuses[status] += 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_level(host, port, queries, concurrency):
+    queries = list(queries)
+    latencies = []
+    statuses = Counter()
+    t0 = time.perf_counter()
+    await asyncio.gather(*[client(host, port, queries, latencies, statuses)
+                           for _ in range(concurrency)])
+    return time.perf_counter() - t0, sorted(latencies), statuses
+
+
+async def main_async():
+    random.seed(SEED)
+    grid = load_movingai_map(MAP_PATH)
+    queries = [(random_free_cell(grid), random_free_cell(grid)) for _ in range(REQUESTS_PER_LEVEL)]
+
+    service = server = None
+    if SERVER_ADDRESS is None:
+        service = PathService({"berlin": MAP_PATH}, workers=WORKERS)
+        await service.start()
+        server = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        host, port = server.sockets[0].getsockname()[:2]
+    else:
+        host, port = SERVER_ADDRESS
+
+    print(f"{REQUESTS_PER_LEVEL} {ALGORITHM} requests per level on {MAP_PATH}\n")
+    print(f"{'clients':<9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'batch':>7}  statuses")
+    try:
+        for concurrency in CONCURRENCY:
+            batches = service.batches if service else 0
+            batched = service.batched if service else 0
+            elapsed, latencies, statuses = await run_level(host, port, queries, concurrency)
+            batch = "-"
+            if service and service.batches > batches:
+                batch = f"{(service.batched - batched) / (service.batches - batches):.1f}"
+            print(f"{concurrency:<9}{len(latencies) / elapsed:>9.0f}"
+                  f"{percentile(latencies, 50) * 1e3:>9.2f}{percentile(latencies, 95) * 1e3:>9.2f}"
+                  f"{percentile(latencies, 99) * 1e3:>9.2f}{batch:>7}  {dict(statuses)}")
+    finally:
+        if server is not None:
+            while service.connections:
+                await asyncio.sleep(0.01)
+            server.close()
+            await server.wait_closed()
+            await service.close()
+
+
+def main():
+    asyncio.run(main_async())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import sys
+import os
+import random
+import time
+import statistics
+import math
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+from a_star import find_path as astar
+from jps import find_path as jps
+from bucket_queue import TIE_BREAKS
+from search_context import SearchContext
+from search_stats import SearchStats
+
+
+MAP_PATH = "tests/Berlin_1_256.map"
+NUM_TESTS = 200
+MIN_DISTANCE = 20
+SEED = 1
+
+
+def run(find, queries, tie_break):
+    times = []
+    steps = []
+    expanded = []
+    stats = SearchStats()
+    for start, goal in queries:
+        before = stats.expanded
+        t0 = time.perf_counter()
+        path = find(start, goal, stats, tie_break)
+        times.append(time.perf_counter() - t0)
+        steps.append(None if path is None else path.steps)
+        expanded.append(stats.expanded - before)
+    return times, steps, expanded, stats
+
+
+def main():
+    random.seed(SEED)
+    grid = load_movingai_map(MAP_PATH)
+    context = SearchContext(grid)
+
+    queries = []
+    while len(queries) < NUM_TESTS:
+        start, goal = random_free_cell(grid), random_free_cell(grid)
+        if math.hypot(start[0] - goal[0], start[1] - goal[1]) >= MIN_DISTANCE:
+            queries.append((start, goal))
+
+    searches = [
+        ("A*", lambda s, g, st, tb: astar(s, g, grid, context=context, stats=st, tie_break=tb)),
+        ("JPS", lambda s, g, st, tb: jps(s, g, grid, context=context, stats=st, tie_break=tb)),
+    ]
+
+    print(f"{NUM_TESTS} queries on {MAP_PATH}\n")
+    print(f"{'search':<8}{'tie break':<10}{'mean exp':>10}{'median exp':>12}{'pushes':>10}{'ms/query':>10}")
+
+    for name, find in searches:
+        reference = None
+        for tie_break in TIE_BREAKS:
+            times, steps, expanded, stats = run(find, queries, tie_break)
+            # Tie-breaking only changes which optimal path is found
+            if reference is None:
+                reference = steps
+            assert steps == reference, f"{name} with tie_break={tie_break} changed a path cost"
+
+            print(f"{name:<8}{tie_break:<10}{stats.expanded / NUM_TESTS:>10.0f}"
+                  f"{statistics.median(expanded):>12.0f}{stats.pushes / NUM_TESTS:>10.0f}"
+                  f"{statistics.mean(times) * 1e3:>10.3f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
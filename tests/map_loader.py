@@ -1,21 +1,13 @@
-def load_movingai_map(path):
-    grid = []
-    with open(path, "r") as f:
-        for line in f:
-            line = line.rstrip("\n")
+import os
+import sys
 
-            # Skip header lines
-            if line.startswith("type") or \
-               line.startswith("height") or \
-               line.startswith("width") or \
-               line.startswith("map"):
-                continue
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
-            if not line:
-                continue
+from map_io import load_movingai
 
-            # '.' = walkable (0)
-            # anything else = blocked (1)
-            grid.append([0 if c == '.' else 1 for c in line])
 
-    return grid
+def load_movingai_map(path):
+    """
+    Load a MovingAI .map file as a Grid ('.', 'G' and 'S' are walkable).
+    """
+    return load_movingai(path)
@@ -1,12 +1,45 @@
 import sys
 import os
 import math
+import random
+import tempfile
+import asyncio
+import json
+import io
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "..", "src"))
 
-from a_star import find_path as a_star_path
+from a_star import find_path as a_star_path, valid_move
 from jps import find_path as jps_path
 from jps import find_path_jump_points as jps_jumps
+from grid import Grid
+from block_jump import BlockJumper
+from jps import jump as jps_jump
+import jps_plus
+import goal_bounds
+import landmarks
+import movement
+from search_context import SearchContext
+from batch import find_paths, iter_paths
+from distance_field import distance_field
+from components import ComponentIndex
+from hpa import HierarchicalMap
+from path_cache import PathCache
+from dstar_lite import DStarLite
+from bidirectional import find_path as bidirectional_path
+import ara_star
+from path_result import PathResult
+from bucket_queue import TIE_BREAKS, BucketQueue, exact_key
+from map_loader import load_movingai_map
+from benchmark import random_free_cell
+import map_io
+import scenarios
+import server
+import main
+import render
+from search_stats import SearchStats, format_prometheus, percentile
+
+MAP_PATH = os.path.join(os.path.dirname(__file__), "Berlin_1_256.map")
 
 
 #octile distance
@@ -14,6 +47,18 @@ def octile_distance(a, b):
     dx, dy = abs(a[0] - b[0]), abs(a[1] - b[1])
     return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
 
+def random_rows(rng, height, width, density=0.3):
+    """
+    Random list grid with the given share of walls.
+    """
+    return [[1 if rng.random() < density else 0 for _ in range(width)] for _ in range(height)]
+
+def free_cells(rows):
+    """
+    All free (y, x) cells of a list grid.
+    """
+    return [(y, x) for y, row in enumerate(rows) for x, cell in enumerate(row) if cell == 0]
+
 def test_octile_distance():
     a, b = (0, 0), (3, 4)
     dist = octile_distance(a, b)
@@ -208,10 +253,875 @@ def test_jump_blocked_by_obstacle():
     assert is_valid_path(path, grid)
 
 
+#GRID TESTS
+
+def test_grid_roundtrip_and_border():
+    rows = [
+        [0, 1, 0],
+        [0, 0, 2],
+    ]
+    grid = Grid.from_rows(rows)
+
+    assert (grid.height, grid.width) == (2, 3)
+    assert grid.to_rows() == [[0, 1, 0], [0, 0, 1]]
+    assert grid[1][2] == 1 and len(grid[0]) == 3
+    assert grid.coords(grid.index(1, 2)) == (1, 2)
+    assert grid.passable(0, 0) and not grid.passable(0, 1)
+    assert not grid.passable(-1, 0) and not grid.passable(0, 3)
+
+    # The padding ring around the map is all walls
+    for y in range(-1, 3):
+        assert grid.cells[grid.index(y, -1)] == 1
+        assert grid.cells[grid.index(y, 3)] == 1
+
+
+def test_grid_and_list_inputs_agree():
+    rows = [
+        [0, 0, 0, 0, 0],
+        [0, 1, 1, 1, 0],
+        [0, 0, 0, 1, 0],
+        [0, 1, 0, 0, 0],
+        [0, 0, 0, 0, 0],
+    ]
+    grid = Grid.from_rows(rows)
+
+    assert a_star_path((0, 0), (4, 4), rows) == a_star_path((0, 0), (4, 4), grid)
+    assert jps_path((0, 0), (4, 4), rows) == jps_path((0, 0), (4, 4), grid)
+    assert a_star_path((0, 0), (1, 1), grid) is None
+
+
+def test_load_movingai_map():
+    grid = load_movingai_map(MAP_PATH)
+
+    assert isinstance(grid, Grid)
+    assert (grid.height, grid.width) == (256, 256)
+    with open(MAP_PATH) as f:
+        first_row = f.read().splitlines()[4]
+    assert list(grid[0]) == [0 if c == '.' else 1 for c in first_row]
+
+
+def test_movingai_header_validation():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "small.map")
+        with open(path, "w") as f:
+            f.write("type octile\nheight 2\nwidth 3\nmap\n.GT\nS@W\n")
+        parsed = map_io.parse_movingai(path)
+        assert parsed.terrain == b".GTS@W"
+        assert map_io.to_grid(parsed).to_rows() == [[0, 0, 1], [0, 1, 1]]
+
+        for text in ["type octile\nheight 3\nwidth 3\nmap\n...\n...\n",
+                     "type octile\nheight 2\nwidth 3\nmap\n...\n..\n",
+                     "type octile\nwidth 3\nheight 2\nmap\n...\n...\n",
+                     "type octile\nheight 2\nwidth 3\nmap\n...\n.x.\n"]:
+            with open(path, "w") as f:
+                f.write(text)
+            try:
+                map_io.parse_movingai(path)
+                assert False, "malformed map was accepted"
+            except ValueError:
+                pass
+
+
+def test_compiled_map_roundtrip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "berlin.gmap")
+        grid = map_io.compile_map(MAP_PATH, path)
+        mapped = map_io.open_compiled(path)
+        assert mapped == grid and mapped.digest() == grid.digest()
+        assert map_io.read_terrain(path) == map_io.parse_movingai(MAP_PATH).terrain
+        assert jps_path((0, 0), (255, 255), mapped) == jps_path((0, 0), (255, 255), grid)
+
+        # Edits stay in memory
+        mapped.set_cell(0, 0, 1)
+        assert map_io.open_compiled(path).passable(0, 0)
+
+        with open(path, "r+b") as f:
+            f.truncate(100)
+        try:
+            map_io.open_compiled(path)
+            assert False, "truncated map was accepted"
+        except ValueError:
+            pass
+
+
+#SCENARIO RUNNER TESTS
+
+SCEN_PATH = os.path.join(os.path.dirname(__file__), "Berlin_1_256.map.scen")
+
+def test_scenario_runner():
+    loaded = scenarios.parse_scen(SCEN_PATH)
+    assert loaded[0].start == (138, 160) and loaded[0].goal == (138, 165)
+    assert os.path.samefile(loaded[0].map_path, MAP_PATH)
+
+    rows = scenarios.run_scenarios(loaded[::10], workers=1)
+    assert len(rows) == 2 * len(loaded[::10])
+    assert all(row["status"] == "optimal" for row in rows)
+    assert all(row["expansions"] > 0 for row in rows)
+
+    summary = scenarios.summarize(rows)
+    assert sum(row["queries"] for row in summary) == len(rows)
+    assert summary[0]["buckets"] == f"1-{scenarios.BUCKET_GROUP}"
+    assert all(row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"] for row in summary)
+    assert percentile([4, 1, 3, 2], 50) == 2
+    assert scenarios.classify(11.0, 10.0) == "longer"
+    assert scenarios.classify(9.0, 10.0) == "shorter"
+    assert all(row["failures"] == 0 for row in summary)
+
+
+#SERVER TESTS
+
+def test_path_server():
+    async def run():
+        service = server.PathService({"berlin": MAP_PATH}, workers=0, max_queue=2)
+        query = {"map": "berlin", "start": [0, 0], "goal": [255, 255]}
+
+        # Before the batcher runs, a third queued request is turned away
+        queued = [asyncio.ensure_future(service.solve(query)) for _ in range(3)]
+        await asyncio.sleep(0)
+        assert isinstance(queued[2].exception(), server.Overloaded)
+
+        await service.start()
+        listener = await asyncio.start_server(service.handle, "127.0.0.1", 0)
+        reader, writer = await asyncio.open_connection(*listener.sockets[0].getsockname()[:2])
+        try:
+            for result in await asyncio.gather(*queued[:2]):
+                assert abs(result["cost"] - jps_path((0, 0), (255, 255), load_movingai_map(MAP_PATH)).cost) < 1e-9
+
+            status, body = await server.call(reader, writer, "POST", "/path",
+                                              dict(query, algorithm="astar"))
+            result = json.loads(body)
+            assert status == 200 and result["points"][0] == [0, 0] and result["points"][-1] == [255, 255]
+
+            assert (await server.call(reader, writer, "POST", "/path", dict(query, map="x")))[0] == 404
+            assert (await server.call(reader, writer, "POST", "/path", dict(query, goal=[0])))[0] == 400
+            assert (await server.call(reader, writer, "POST", "/path", dict(query, map=["x"])))[0] == 400
+            assert (await server.call(reader, writer, "POST", "/path", dict(query, map={})))[0] == 400
+            assert (await server.call(reader, writer, "POST", "/path", dict(query, deadline_ms=0)))[0] == 504
+            assert (await server.call(reader, writer, "GET", "/path"))[0] == 405
+
+            status, body = await server.call(reader, writer, "GET", "/metrics")
+            metrics = body.decode()
+            assert 'pathfinding_server_responses_total{status="200"} 1' in metrics
+            assert "pathfinding_server_queue_depth 0" in metrics
+            assert 'pathfinding_queries_total{algorithm="jps"} 2' in metrics
+        finally:
+            writer.close()
+            await writer.wait_closed()
+            listener.close()
+            await service.close()
+
+    asyncio.run(run())
+
+
+#BATCH CLI TESTS
+
+def test_batch_cli():
+    grid = load_movingai_map(MAP_PATH)
+    find_path = main._solver("jps", grid, "corner_cutting", None)
+    lines = ["# start goal", "0 0 255 255", "", "1,1,2,2", "0 0 oops", "0 0 999 0"]
+
+    out = io.StringIO()
+    assert main.run_batch(grid, main.parse_queries(lines), find_path, out) == 2
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [r["query"] for r in records] == [0, 1, 2, 3]
+    assert abs(records[0]["cost"] - a_star_path((0, 0), (255, 255), grid).cost) < 1e-9
+    assert records[0]["path"][0] == [0, 0] and records[0]["path"][-1] == [255, 255]
+    assert records[1]["path"] == [[1, 1], [2, 2]] and "error" not in records[1]
+    assert records[2]["error"] == "line 5: expected four integers"
+    assert records[3]["path"] is None and "outside" in records[3]["error"]
+
+    out = io.StringIO()
+    main.run_batch(grid, main.parse_queries(["0 0 0 3"]), find_path, out, fmt="csv", expand=True)
+    header, row = out.getvalue().splitlines()
+    assert header.split(",") == main.CSV_FIELDS
+    assert row == "0,0,0,0,3,3.000000,4," + row.split(",")[7] + ",0 0;0 1;0 2;0 3,"
+
+
+#RENDER TESTS
+
+def test_render_text_and_images():
+    grid = Grid.from_rows([
+        [0, 0, 0, 0],
+        [1, 1, 0, 1],
+        [0, 0, 0, 0],
+    ])
+    path_a = [(0, 0), (0, 1), (1, 2), (2, 3)]
+    path_b = [(2, 0), (2, 1), (1, 2)]
+
+    text = render.render_text(grid, [(path_a, "A"), (path_b, "B")], marks={(0, 0): "S"}, overlap="*")
+    assert text == "SA..\n##*#\nBB.A\n"
+    view = render.window(grid, [(2, 3)], radius=1)
+    assert view == (1, 3, 2, 4)
+    assert render.render_text(grid, view=view) == ".#\n..\n"
+
+    context = SearchContext(grid)
+    a_star_path((0, 0), (2, 3), grid, context=context)
+    width, height, pixels = render.render_image(grid, [path_a], explored=context, scale=2)
+    assert (width, height, len(pixels)) == (8, 6, 8 * 6 * 3)
+    def pixel(y, x):
+        return tuple(pixels[(y * width + x) * 3:(y * width + x) * 3 + 3])
+    assert pixel(0, 0) == pixel(1, 1) == render.PATH_COLOURS[0]
+    assert pixel(2, 0) == render.WALL_COLOUR
+    assert render.render_image(grid, explored=context)[2][:3] == bytes(render.EXPLORED_COLOUR)
+    assert render.render_image(grid)[2][:3] == bytes(render.FREE_COLOUR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        render.save_image(os.path.join(tmp, "map.ppm"), grid, [path_a])
+        with open(os.path.join(tmp, "map.ppm"), "rb") as f:
+            assert f.read() == b"P6\n4 3\n255\n" + render.render_image(grid, [path_a])[2]
+
+        render.save_image(os.path.join(tmp, "map.png"), grid, [path_a])
+        with open(os.path.join(tmp, "map.png"), "rb") as f:
+            data = f.read()
+        assert data.startswith(b"\x89PNG\r\n\x1a\n") and data.endswith(b"IEND\xaeB`\x82")
+
+
+#SEARCH STATS TESTS
+
+def test_search_stats_counts():
+    grid = load_movingai_map(MAP_PATH)
+    start, goal = (0, 0), (255, 255)
+
+    stats_a = SearchStats()
+    path_a = a_star_path(start, goal, grid, stats=stats_a)
+    assert path_a == a_star_path(start, goal, grid)
+    assert stats_a.queries == 1 and stats_a.expanded > 0
+    assert stats_a.pops == stats_a.expanded + stats_a.stale
+    assert stats_a.pushes >= stats_a.pops and stats_a.peak_open > 0
+    assert stats_a.jump_calls == 0
+
+    stats_j = SearchStats()
+    jps_path(start, goal, grid, stats=stats_j)
+    assert 0 < stats_j.expanded < stats_a.expanded
+    assert stats_j.jump_calls > 0 and stats_j.cells_scanned > stats_j.jump_calls
+
+    stats_p = SearchStats()
+    jps_plus.find_path(start, goal, grid, stats=stats_p)
+    assert stats_p.expanded == stats_j.expanded and stats_p.jump_calls == stats_j.jump_calls
+
+    # Unreachable queries exhaust the open list
+    stats = SearchStats()
+    assert a_star_path((0, 0), (1, 1), Grid.from_rows([[0, 1], [1, 1]]), stats=stats) is None
+    assert stats.pops == stats.pushes
+
+    total = SearchStats().merge(stats_a).merge(stats_j)
+    assert total.queries == 2 and total.peak_open == max(stats_a.peak_open, stats_j.peak_open)
+    text = format_prometheus([({"algorithm": "astar"}, stats_a), ({"algorithm": "jps"}, stats_j)])
+    assert "# TYPE pathfinding_expanded_total counter" in text
+    assert f'pathfinding_expanded_total{{algorithm="jps"}} {stats_j.expanded}' in text
+
+
+#JUMP ENGINE TESTS
+
+DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1)]
+
+def test_block_jumper_matches_stepwise_jump():
+    rng = random.Random(7)
+    rows = random_rows(rng, 15, 20)
+    grid = Grid.from_rows(rows)
+    jumper = BlockJumper(grid)
+    free = free_cells(rows)
+
+    for y, x in free:
+        goal = rng.choice(free)
+        for dy, dx in DIRECTIONS:
+            assert jumper.jump(y, x, dy, dx, goal) == jps_jump(grid, y, x, dy, dx, goal)
+
+
+def test_jps_on_wide_open_map():
+    # Wider than the default recursion limit
+    grid = Grid(3, 3000)
+    path = jps_path((0, 0), (2, 2999), grid)
+
+    assert path is not None
+    assert len(path) == 3000
+    assert jps_jumps((0, 0), (0, 2999), grid) == [(0, 0), (0, 2999)]
+
+
+#MOVEMENT RULE TESTS
+
+def test_neighbour_masks_and_valid_move():
+    grid = Grid.from_rows([
+        [0, 1],
+        [0, 0],
+    ])
+    masks = movement.neighbour_masks(grid)
+    # (0, 0) sees (1, 0) south and (1, 1) south-east
+    assert masks[grid.index(0, 0)] == (1 << 1) | (1 << 7)
+
+    # The diagonal (0, 0) -> (1, 1) passes the wall at (0, 1)
+    assert valid_move(grid, 0, 0, 1, 1)
+    assert valid_move(grid, 0, 0, 1, 1, "no_corner_cutting") is False
+    assert valid_move(grid, 0, 0, 1, 1, "four_connected") is False
+    assert valid_move(grid, 1, 0, 0, 1) is False
+
+    # List grids are probed directly and must agree with the masks
+    rng = random.Random(5)
+    for _ in range(10):
+        rows = random_rows(rng, 4, 5, 0.35)
+        grid = Grid.from_rows(rows)
+        for rule in movement.MOVEMENTS:
+            for y in range(-1, 5):
+                for x in range(-1, 6):
+                    for dy, dx in movement.DIRECTIONS + [(0, 0), (2, 0)]:
+                        assert valid_move(rows, y, x, y + dy, x + dx, rule) == \
+                            valid_move(grid, y, x, y + dy, x + dx, rule)
+
+
+def test_movement_rules_agree_between_searches():
+    rng = random.Random(21)
+    for _ in range(30):
+        rows = random_rows(rng, 8, 10)
+        grid = Grid.from_rows(rows)
+        free = free_cells(rows)
+        for _ in range(5):
+            start, goal = rng.choice(free), rng.choice(free)
+            for rule in movement.MOVEMENTS:
+                path_a = a_star_path(start, goal, grid, movement=rule)
+                path_j = jps_path(start, goal, grid, movement=rule)
+                assert (path_a is None) == (path_j is None)
+                if path_a is None:
+                    continue
+                assert path_a.steps == path_j.steps
+                for path in (path_a, path_j):
+                    cells = list(path)
+                    for (y, x), (ny, nx) in zip(cells, cells[1:]):
+                        assert valid_move(grid, y, x, ny, nx, rule)
+
+    # Corner cutting is never longer than the stricter rules
+    grid = load_movingai_map(MAP_PATH)
+    costs = [jps_path((0, 0), (255, 255), grid, movement=rule).cost for rule in movement.MOVEMENTS]
+    assert costs[0] <= costs[1] <= costs[2]
+
+
+#JPS+ TESTS
+
+def test_jps_plus_table_matches_block_jumper():
+    rng = random.Random(3)
+    rows = random_rows(rng, 14, 18)
+    grid = Grid.from_rows(rows)
+    table = jps_plus.build_table(grid)
+    jumper = BlockJumper(grid)
+    free = free_cells(rows)
+
+    for y, x in free:
+        for goal in (rng.choice(free), (y, rng.randrange(18)), (rng.randrange(14), x)):
+            for dy, dx in DIRECTIONS:
+                assert table.jump(y, x, dy, dx, goal) == jumper.jump(y, x, dy, dx, goal)
+
+
+def test_jps_plus_cache_roundtrip():
+    grid = load_movingai_map(MAP_PATH)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        built = jps_plus.load_or_build(grid, cache_dir)
+        loaded = jps_plus.load_or_build(grid, cache_dir)
+        assert loaded.digest == grid.digest()
+        assert loaded.distances == built.distances
+
+    start, goal = (0, 0), (255, 255)
+    assert jps_plus.find_path(start, goal, grid, loaded) == jps_path(start, goal, grid)
+
+
+def test_searches_agree_on_wall_start():
+    grid = Grid.from_rows([
+        [1, 0, 0],
+        [0, 0, 0],
+    ])
+    searches = [a_star_path, jps_path, jps_plus.find_path, bidirectional_path,
+                lambda s, g, grid: ara_star.find_path(s, g, grid).path]
+    for find in searches:
+        assert find((0, 0), (1, 2), grid) is None
+        assert find((1, 2), (0, 0), grid) is None
+        assert find((1, 0), (1, 2), grid).cost == 2
+
+
+#GOAL BOUNDING TESTS
+
+def test_goal_bounds_keep_paths_optimal():
+    rng = random.Random(11)
+    rows = random_rows(rng, 8, 9)
+    grid = Grid.from_rows(rows)
+    bounds = goal_bounds.build_bounds(grid, workers=1)
+    free = free_cells(rows)
+
+    for _ in range(60):
+        start, goal = rng.choice(free), rng.choice(free)
+        plain = a_star_path(start, goal, grid)
+        for path in (a_star_path(start, goal, grid, goal_bounds=bounds),
+                     jps_path(start, goal, grid, goal_bounds=bounds)):
+            assert (path is None) == (plain is None)
+            if plain is not None:
+                assert path_cost(path) == path_cost(plain)
+
+
+def test_goal_bounds_cache_roundtrip():
+    grid = Grid.from_rows([
+        [0, 0, 0, 0],
+        [0, 1, 1, 0],
+        [0, 0, 0, 0],
+    ])
+    with tempfile.TemporaryDirectory() as cache_dir:
+        built = goal_bounds.load_or_build(grid, cache_dir, workers=1)
+        loaded = goal_bounds.load_or_build(grid, cache_dir, workers=1)
+    assert loaded.boxes == built.boxes
+
+    # Everything east of (0, 0) is reached by first moving east, nothing by moving north
+    assert loaded.allows(0, 0, 0, 1, (0, 3))
+    assert not loaded.allows(0, 0, -1, 0, (0, 3))
+
+
+#LANDMARK TESTS
+
+def test_landmark_heuristic_is_admissible():
+    rng = random.Random(12)
+    rows = random_rows(rng, 10, 12)
+    grid = Grid.from_rows(rows)
+    table = landmarks.build_landmarks(grid, count=3)
+    free = free_cells(rows)
+
+    for goal in free[::7]:
+        h = table.heuristic(goal)
+        field = distance_field(goal, grid)
+        for y, x in free:
+            a, b = h(grid.index(y, x))
+            assert a + b * math.sqrt(2) <= field.cost(y, x) + 1e-9
+
+    for _ in range(40):
+        start, goal = rng.choice(free), rng.choice(free)
+        plain = a_star_path(start, goal, grid)
+        for path in (a_star_path(start, goal, grid, landmarks=table),
+                     jps_path(start, goal, grid, landmarks=table)):
+            assert (path is None) == (plain is None)
+            if plain is not None:
+                assert path.steps == plain.steps
+
+
+def test_landmarks_cache_roundtrip():
+    grid = Grid.from_rows([
+        [0, 0, 0, 0, 0],
+        [0, 1, 1, 1, 0],
+        [0, 0, 0, 1, 0],
+    ])
+    with tempfile.TemporaryDirectory() as cache_dir:
+        built = landmarks.load_or_build(grid, 2, cache_dir)
+        loaded = landmarks.load_or_build(grid, 2, cache_dir)
+    assert loaded.count == 2 and loaded.distances == built.distances
+
+    # The two landmarks are the far ends of the U-shaped corridor
+    ends = {(2, 2), (2, 4)}
+    for k in range(2):
+        assert [cell for cell in ends if loaded.steps(k, *cell) == (0, 0)]
+    assert loaded.steps(0, 1, 1) is None
+
+    explicit = landmarks.build_landmarks(grid, sources=[(0, 4)])
+    assert explicit.count == 1 and explicit.steps(0, 2, 2) == (4, 2)
+
+
+#SEARCH CONTEXT TESTS
+
+def test_search_context_reuse():
+    grid = load_movingai_map(MAP_PATH)
+    context = SearchContext(grid)
+    rng = random.Random(5)
+
+    for _ in range(5):
+        start, goal = random_free_cell(grid, rng), random_free_cell(grid, rng)
+        assert a_star_path(start, goal, grid, context=context) == a_star_path(start, goal, grid)
+        assert jps_path(start, goal, grid, context=context) == jps_path(start, goal, grid)
+
+    other = Grid(3, 3)
+    try:
+        a_star_path((0, 0), (2, 2), other, context=context)
+        assert False, "context for another grid size must be rejected"
+    except ValueError:
+        pass
+
+
+#BATCH TESTS
+
+def test_find_paths_matches_single_queries():
+    grid = load_movingai_map(MAP_PATH)
+    rng = random.Random(2)
+    queries = [(random_free_cell(grid, rng), random_free_cell(grid, rng)) for _ in range(20)]
+    expected = [jps_path(start, goal, grid) for start, goal in queries]
+
+    assert find_paths(queries, grid, "jps", workers=1) == expected
+    assert find_paths(queries, grid, "jps_plus", workers=2, chunksize=3) == expected
+
+    unordered = dict(iter_paths(queries, grid, "jps", workers=2, chunksize=4, ordered=False))
+    assert [unordered[i] for i in range(len(queries))] == expected
+
+
+#DISTANCE FIELD TESTS
+
+def test_distance_field_matches_a_star():
+    grid = [
+        [0, 0, 0, 0, 0],
+        [0, 1, 1, 1, 0],
+        [0, 1, 0, 1, 0],
+        [0, 1, 1, 1, 0],
+        [0, 0, 0, 0, 0],
+    ]
+    field = distance_field((0, 0), grid)
+
+    for y in range(5):
+        for x in range(5):
+            path = a_star_path((0, 0), (y, x), grid)
+            if path is None:
+                assert field.cost(y, x) == math.inf and field.path_to(y, x) is None
+                continue
+            back = field.path_to(y, x)
+            assert back[0] == (0, 0) and back[-1] == (y, x)
+            assert is_valid_path(back, grid)
+            assert round(field.cost(y, x), 6) == path_cost(path) == path_cost(back)
+
+    assert field.steps(4, 4) == (6, 1)
+
+
+#COMPONENT INDEX TESTS
+
+def test_component_index_rejects_and_updates():
+    grid = Grid.from_rows([
+        [0, 0, 1, 0, 0],
+        [0, 0, 1, 0, 0],
+        [0, 0, 1, 0, 0],
+    ])
+    components = ComponentIndex(grid)
+
+    assert not components.connected((0, 0), (0, 4))
+    assert a_star_path((0, 0), (0, 4), grid, components=components) is None
+    assert jps_path((0, 0), (0, 4), grid, components=components) is None
+
+    # Opening a gap merges both sides
+    components.set_cell(1, 2, 0)
+    assert components.connected((0, 0), (0, 4))
+    assert jps_path((0, 0), (0, 4), grid, components=components) is not None
+
+    # Closing it again splits them
+    components.set_cell(1, 2, 1)
+    assert not components.connected((0, 0), (2, 4))
+    assert components.connected((0, 0), (2, 1))
+
+
+#HPA* TESTS
+
+def test_hpa_finds_valid_paths():
+    rng = random.Random(8)
+    rows = random_rows(rng, 20, 20, 0.25)
+    grid = Grid.from_rows(rows)
+    hierarchy = HierarchicalMap(grid, cluster_size=5)
+    free = free_cells(rows)
+
+    for _ in range(40):
+        start, goal = rng.choice(free), rng.choice(free)
+        optimal = a_star_path(start, goal, grid)
+        path = hierarchy.find_path(start, goal)
+        assert (path is None) == (optimal is None)
+        if path is not None:
+            assert path[0] == start and path[-1] == goal
+            assert validate_steps(path, grid)
+            assert path_cost(path) >= path_cost(optimal)
+
+
+def test_hpa_diagonal_only_crossing():
+    # The two halves only touch through a diagonal step across the cluster corner
+    grid = [
+        [0, 0, 1, 1],
+        [0, 0, 1, 1],
+        [1, 1, 0, 0],
+        [1, 1, 0, 0],
+    ]
+    hierarchy = HierarchicalMap(grid, cluster_size=2)
+    assert hierarchy.find_path((0, 0), (3, 3)) == a_star_path((0, 0), (3, 3), grid)
+
+
+def validate_steps(path, grid):
+    for (y1, x1), (y2, x2) in zip(path, path[1:]):
+        if max(abs(y2 - y1), abs(x2 - x1)) != 1 or grid[y2][x2] != 0:
+            return False
+    return True
+
+
+#PATH CACHE TESTS
+
+def test_path_cache_hits_and_invalidation():
+    grid = Grid.from_rows([
+        [0, 0, 0, 0, 0],
+        [0, 1, 1, 1, 0],
+        [0, 0, 0, 0, 0],
+    ])
+    cached = PathCache(jps_path, maxsize=2)
+
+    first = cached((0, 0), (2, 4), grid)
+    assert cached((0, 0), (2, 4), grid) == first
+    assert cached.info().hits == 1 and cached.info().misses == 1
+
+    # LRU eviction
+    cached((0, 0), (0, 4), grid)
+    cached((2, 0), (2, 4), grid)
+    assert cached.info().size == 2
+    cached((0, 0), (2, 4), grid)
+    assert cached.info().misses == 4
+
+    # Editing the grid drops every entry
+    grid.set_cell(2, 2, 1)
+    path = cached((0, 0), (2, 4), grid)
+    assert (2, 2) not in path
+    assert cached.info().invalidations == 1
+
+
+def test_path_cache_subpaths():
+    grid = Grid(1, 10)
+    cached = PathCache(a_star_path, subpaths=True)
+
+    cached((0, 0), (0, 9), grid)
+    path = cached((0, 7), (0, 2), grid)
+    assert path == [(0, x) for x in range(7, 1, -1)]
+    assert isinstance(path, PathResult) and path.cost == 5
+    path = cached((0, 2), (0, 7), grid)
+    assert isinstance(path, PathResult) and path.points == [(0, 2), (0, 7)]
+    assert cached.info().subpath_hits == 2
+
+
+def test_path_cache_keys_search_options():
+    grid = Grid(5, 5)
+    cached = PathCache(a_star_path, subpaths=True)
+
+    assert abs(cached((0, 0), (4, 4), grid).cost - 4 * math.sqrt(2)) < 1e-9
+    assert cached((0, 0), (4, 4), grid, movement="four_connected").cost == 8
+    # The diagonal path must not answer four-connected subqueries either
+    assert cached((1, 1), (3, 3), grid, movement="four_connected").cost == 4
+    assert abs(cached((0, 0), (4, 4), grid).cost - 4 * math.sqrt(2)) < 1e-9
+    info = cached.info()
+    assert (info.hits, info.subpath_hits, info.misses) == (1, 0, 3)
+
+
+#D* LITE TESTS
+
+def test_dstar_lite_replans_after_edits():
+    rows = load_movingai_map(MAP_PATH).to_rows()
+    random.seed(3)
+    planner = DStarLite(rows, (10, 10), (200, 220))
+    grid = planner.grid
+
+    for _ in range(10):
+        path = planner.find_path()
+        expected = a_star_path(planner._coords(planner.start), (200, 220), grid)
+        assert (path is None) == (expected is None)
+        if path is None:
+            break
+        assert path_cost(path) == path_cost(expected)
+        assert all(grid[y][x] == 0 for y, x in path)
+
+        # Block a cell on the path, open a random wall, and step forward
+        y, x = path[len(path) // 2]
+        planner.set_cell(y, x, 1)
+        wy, wx = random.randrange(grid.height), random.randrange(grid.width)
+        planner.set_cell(wy, wx, 0)
+        planner.move_start(path[1])
+
+
+def test_dstar_lite_unreachable_and_reopened():
+    planner = DStarLite([
+        [0, 1, 0],
+        [0, 1, 0],
+        [0, 0, 0],
+    ], (0, 0), (0, 2))
+    path = planner.find_path()
+    assert isinstance(path, PathResult)
+    assert path == [(0, 0), (1, 0), (2, 1), (1, 2), (0, 2)]
+
+    planner.set_cell(2, 1, 1)
+    assert planner.find_path() is None
+
+    planner.set_cell(1, 1, 0)
+    assert planner.find_path() == [(0, 0), (1, 1), (0, 2)]
+
+
+#BIDIRECTIONAL A* TESTS
+
+def test_bidirectional_matches_a_star():
+    grid = load_movingai_map(MAP_PATH)
+    rng = random.Random(21)
+    forward, backward = SearchContext(grid), SearchContext(grid)
+
+    for _ in range(20):
+        start, goal = random_free_cell(grid, rng), random_free_cell(grid, rng)
+        expected = a_star_path(start, goal, grid)
+        path = bidirectional_path(start, goal, grid, forward, backward)
+        assert (path is None) == (expected is None)
+        if path is not None:
+            assert path[0] == start and path[-1] == goal
+            assert round(path_cost(path), 6) == round(path_cost(expected), 6)
+            assert all(grid[y][x] == 0 for y, x in path)
+
+    walled = Grid.from_rows([[0, 1, 0], [0, 1, 0], [0, 1, 0]])
+    assert bidirectional_path((0, 0), (2, 2), walled) is None
+    assert bidirectional_path((1, 0), (1, 0), walled) == [(1, 0)]
+
+
+#ARA* TESTS
+
+def test_ara_star_improves_to_optimal():
+    grid = load_movingai_map(MAP_PATH)
+    start, goal = (0, 0), (255, 255)
+    best = path_cost(a_star_path(start, goal, grid))
+
+    results = list(ara_star.iter_paths(start, goal, grid, weight=3))
+    assert results[-1].bound == 1.0
+    assert round(results[-1].cost, 6) == round(best, 6)
+    for result in results:
+        assert result.path[0] == start and result.path[-1] == goal
+        assert round(path_cost(result.path), 6) == round(result.cost, 6)
+        assert result.cost <= result.bound * best + 1e-6
+    assert [r.bound for r in results] == sorted((r.bound for r in results), reverse=True)
+
+
+def test_ara_star_budget():
+    grid = load_movingai_map(MAP_PATH)
+    start, goal = (0, 0), (255, 255)
+    best = path_cost(a_star_path(start, goal, grid))
+    full = ara_star.find_path(start, goal, grid, weight=3)
+
+    limited = ara_star.find_path(start, goal, grid, weight=3, max_expansions=full.expansions // 2)
+    assert limited.path is not None and limited.expansions <= full.expansions // 2
+    assert 1.0 <= limited.bound <= 3 and limited.cost <= limited.bound * best + 1e-6
+
+    none = ara_star.find_path(start, goal, grid, max_expansions=5)
+    assert none.path is None and none.bound == math.inf
+
+
+#PATH RESULT TESTS
+
+def test_path_result_is_lazy_and_list_like():
+    grid = load_movingai_map(MAP_PATH)
+    start, goal = (0, 0), (255, 255)
+    path = jps_path(start, goal, grid)
+    assert isinstance(path, PathResult)
+    assert path.jump_points == jps_jumps(start, goal, grid)
+
+    cells = list(path)
+    assert path == cells and len(path) == len(cells)
+    assert round(path.cost, 6) == path_cost(cells)
+    assert path[0] == start and path[-1] == goal and path[len(path) // 2] == cells[len(cells) // 2]
+    assert path[10:200] == cells[10:200] and path[::-7] == cells[::-7]
+    assert isinstance(path[10:200], PathResult)
+
+    astar = a_star_path(start, goal, grid)
+    assert isinstance(astar, PathResult) and len(astar.points) < len(astar)
+    assert round(astar.cost, 6) == round(path.cost, 6)
+
+    assert PathResult.from_cells([(0, 0), (0, 1), (0, 2), (1, 3)]).points == [(0, 0), (0, 2), (1, 3)]
+    assert PathResult([(3, 3)]) == [(3, 3)] and PathResult([(3, 3)]).steps == (0, 0)
+
+
+#OPEN LIST TESTS
+
+def test_bucket_queue_exact_keys_and_decrease_key():
+    # Equal costs reached through different step orders share one bucket
+    assert exact_key(3, 2) == exact_key(1, 0) + exact_key(2, 2)
+    assert exact_key(7, 0) < exact_key(0, 5) < exact_key(8, 0)
+
+    queue = BucketQueue()
+    assert queue.push("a", exact_key(2, 1))
+    assert queue.push("b", exact_key(2, 1))
+    assert queue.push("c", exact_key(5, 0))
+    assert not queue.push("c", exact_key(6, 0))
+    assert not queue.push("c", exact_key(1, 0))
+    assert len(queue) == 3 and len(queue.buckets) == 3
+
+    assert queue.pop() == (exact_key(1, 0), "c")
+    assert queue.pop() == (exact_key(2, 1), "b")
+    assert queue.pop() == (exact_key(2, 1), "a")
+    assert not queue
+
+
+def test_searches_report_exact_costs():
+    grid = load_movingai_map(MAP_PATH)
+    rng = random.Random(4)
+    context = SearchContext(grid)
+
+    for _ in range(20):
+        start, goal = random_free_cell(grid, rng), random_free_cell(grid, rng)
+        path_a = a_star_path(start, goal, grid, context=context)
+        path_j = jps_path(start, goal, grid, context=context)
+        assert (path_a is None) == (path_j is None)
+        if path_a is not None:
+            assert path_a.steps == path_j.steps
+
+
+def test_tie_break_policies():
+    # On an open grid every policy walks straight to the goal
+    open_grid = [[0] * 40 for _ in range(40)]
+    for tie_break in TIE_BREAKS:
+        stats = SearchStats()
+        path = a_star_path((0, 0), (39, 25), open_grid, stats=stats, tie_break=tie_break)
+        assert path.steps == (14, 25)
+        assert stats.expanded == len(path)
+
+    grid = load_movingai_map(MAP_PATH)
+    rng = random.Random(5)
+    context = SearchContext(grid)
+    for _ in range(10):
+        start, goal = random_free_cell(grid, rng), random_free_cell(grid, rng)
+        costs = set()
+        for tie_break in TIE_BREAKS:
+            for find in (a_star_path, jps_path):
+                path = find(start, goal, grid, context=context, tie_break=tie_break)
+                costs.add(None if path is None else path.steps)
+        assert len(costs) == 1
+
+    try:
+        a_star_path((0, 0), (1, 1), open_grid, tie_break="random")
+    except ValueError:
+        pass
+    else:
+        assert False, "unknown tie_break accepted"
+
+
 if __name__ == "__main__":
     test_octile_distance()
     small_grid_tests()
     test_forced_neighbor()
     test_jps_optimization()
     test_diagonal_jump()
-    test_jump_blocked_by_obstacle()
\ No newline at end of file
+    test_jump_blocked_by_obstacle()
+    test_grid_roundtrip_and_border()
+    test_grid_and_list_inputs_agree()
+    test_load_movingai_map()
+    test_movingai_header_validation()
+    test_compiled_map_roundtrip()
+    test_scenario_runner()
+    test_search_stats_counts()
+    test_block_jumper_matches_stepwise_jump()
+    test_jps_on_wide_open_map()
+    test_jps_plus_table_matches_block_jumper()
+    test_jps_plus_cache_roundtrip()
+    test_searches_agree_on_wall_start()
+    test_goal_bounds_keep_paths_optimal()
+    test_goal_bounds_cache_roundtrip()
+    test_search_context_reuse()
+    test_find_paths_matches_single_queries()
+    test_distance_field_matches_a_star()
+    test_component_index_rejects_and_updates()
+    test_hpa_finds_valid_paths()
+    test_hpa_diagonal_only_crossing()
+    test_path_cache_hits_and_invalidation()
+    test_path_cache_subpaths()
+    test_path_cache_keys_search_options()
+    test_dstar_lite_replans_after_edits()
+    test_dstar_lite_unreachable_and_reopened()
+    test_bidirectional_matches_a_star()
+    test_ara_star_improves_to_optimal()
+    test_ara_star_budget()
+    test_path_result_is_lazy_and_list_like()
+    test_bucket_queue_exact_keys_and_decrease_key()
+    test_searches_report_exact_costs()
+    test_tie_break_policies()
+    test_landmark_heuristic_is_admissible()
+    test_landmarks_cache_roundtrip()
+    test_neighbour_masks_and_valid_move()
+    test_movement_rules_agree_between_searches()
+    test_path_server()
+    test_batch_cli()
+    test_render_text_and_images()